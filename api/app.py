@@ -6,17 +6,24 @@ from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import os
+import threading
 import time
 import traceback
+from contextlib import ExitStack
 from datetime import datetime
 
 # Import utilities
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.model_loader import load_model, predict_audio
+from utils.model_loader import model_expects_waveform, predict_audio
+from utils.model_manager import ModelManager, REGISTRY_SCHEME
+from utils.shadow import ShadowEvaluator
+from utils.admission import AdmissionController, AdmissionRejected
 from utils.audio_processor import preprocess_audio_for_prediction
-from utils.database import PredictionLogger
+from utils.database import create_prediction_logger
+from utils.metrics import PREDICT_ERRORS, StageTimer, instrument_view, observe_stages, render_metrics
+from utils.profiling import MemorySnapshots, ProfilingGate
 
 # Get the project root directory (parent of api/)
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -29,9 +36,65 @@ app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', '/tmp/uploads')
 
 # Initialize components
 MODEL_PATH = os.getenv('MODEL_PATH', 'models/auralguard_model.h5')
-model = None
+MODEL_REGISTRY_URI = os.getenv('MODEL_REGISTRY_URI')  # e.g. models:/AuralGuard/latest
+MODEL_POLL_INTERVAL = float(os.getenv('MODEL_POLL_INTERVAL', '30'))
+MODEL_WARMUP = os.getenv('MODEL_WARMUP', 'True').lower() == 'true'
+WARMUP_BATCH_SIZES = [int(size) for size in os.getenv('WARMUP_BATCH_SIZES', '1').split(',')]
+model_manager = ModelManager(
+    model_path=MODEL_PATH,
+    registry_uri=MODEL_REGISTRY_URI,
+    poll_interval=MODEL_POLL_INTERVAL,
+    warmup=MODEL_WARMUP,
+    warmup_batch_sizes=WARMUP_BATCH_SIZES
+)
+
+# Shadow models: scored on the same mel-spectrogram as the primary model,
+# off the request path, and logged next to the primary prediction
+SHADOW_MODEL_SOURCES = [source.strip() for source in os.getenv('SHADOW_MODEL_PATHS', '').split(',')
+                        if source.strip()]
+SHADOW_MAX_QUEUE = int(os.getenv('SHADOW_MAX_QUEUE', '16'))
+SHADOW_SHED_IN_FLIGHT = int(os.getenv('SHADOW_SHED_IN_FLIGHT', '4'))
+shadow_managers = {
+    source: ModelManager(
+        model_path=None if source.startswith(REGISTRY_SCHEME) else source,
+        registry_uri=source if source.startswith(REGISTRY_SCHEME) else None,
+        poll_interval=MODEL_POLL_INTERVAL,
+        warmup=MODEL_WARMUP,
+        warmup_batch_sizes=WARMUP_BATCH_SIZES
+    )
+    for source in SHADOW_MODEL_SOURCES
+}
+shadow_evaluator = None
 db_logger = None
 
+# On-demand profiling (/predict with X-Profile: cpu, /debug/memory/*): opt-in,
+# and only for callers sending PROFILING_TOKEN in X-Profiling-Token
+profiling = ProfilingGate(
+    enabled=os.getenv('PROFILING_ENABLED', 'False').lower() == 'true',
+    token=os.getenv('PROFILING_TOKEN'),
+    interval=float(os.getenv('PROFILING_INTERVAL_MS', '5')) / 1000
+)
+memory_snapshots = MemorySnapshots(max_snapshots=int(os.getenv('PROFILING_MAX_SNAPSHOTS', '4')))
+
+# Admission control: PREDICT_MAX_CONCURRENCY requests are processed at once,
+# others wait in a bounded queue per lane (interactive ahead of batch) and
+# get 429 when it is full; requests past their deadline are dropped
+PREDICT_MAX_CONCURRENCY = int(os.getenv('PREDICT_MAX_CONCURRENCY', '2'))
+PREDICT_MAX_QUEUE_INTERACTIVE = int(os.getenv('PREDICT_MAX_QUEUE_INTERACTIVE', '4'))
+PREDICT_MAX_QUEUE_BATCH = int(os.getenv('PREDICT_MAX_QUEUE_BATCH', '8'))
+PREDICT_BATCH_CONCURRENCY = os.getenv('PREDICT_BATCH_CONCURRENCY')  # default: all slots
+PREDICT_DEFAULT_DEADLINE = float(os.getenv('PREDICT_DEFAULT_DEADLINE', '30'))
+admission = AdmissionController(
+    max_concurrency=PREDICT_MAX_CONCURRENCY,
+    max_queue={'interactive': PREDICT_MAX_QUEUE_INTERACTIVE, 'batch': PREDICT_MAX_QUEUE_BATCH},
+    batch_concurrency=int(PREDICT_BATCH_CONCURRENCY) if PREDICT_BATCH_CONCURRENCY else None,
+    default_timeout=PREDICT_DEFAULT_DEADLINE
+)
+
+# Number of admitted /predict requests currently being processed
+in_flight_requests = 0
+in_flight_lock = threading.Lock()
+
 # Allowed audio extensions
 ALLOWED_EXTENSIONS = {'wav', 'mp3', 'flac', 'ogg', 'm4a'}
 
@@ -42,27 +105,70 @@ def allowed_file(filename):
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def rejection_response(rejected):
+    """Response for a request refused by admission control."""
+    return jsonify({
+        'error': rejected.message,
+        'reason': rejected.reason
+    }), rejected.status, {'Retry-After': str(rejected.retry_after)}
+
+
+def server_timing(stages):
+    """Server-Timing header value for stage durations in seconds."""
+    return ', '.join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in stages.items())
+
+
 def initialize_model():
-    """Load the model on startup."""
-    global model
+    """Load and warm up the model, then watch its source for new versions."""
     try:
-        if os.path.exists(MODEL_PATH):
-            model = load_model(MODEL_PATH)
-            print(f"Model loaded successfully from {MODEL_PATH}")
+        if model_manager.source_available():
+            model_manager.reload_if_changed()
+            print(f"Model loaded successfully from {model_manager.source} "
+                  f"(version {model_manager.current.version})")
         else:
             print(f"Warning: Model file not found at {MODEL_PATH}")
             print("Please train and save the model first.")
     except Exception as e:
         print(f"Error loading model: {e}")
         traceback.print_exc()
+    # Keep watching even if the first load failed, so a model deployed
+    # later is picked up without a restart
+    model_manager.start()
+
+
+def initialize_shadow_models():
+    """Load shadow models and start the background shadow evaluator."""
+    global shadow_evaluator
+    if not shadow_managers:
+        return
+    for source, manager in shadow_managers.items():
+        try:
+            manager.reload_if_changed()
+            print(f"Shadow model loaded from {source} (version {manager.current.version})")
+        except Exception as e:
+            print(f"Warning: Could not load shadow model {source}: {e}")
+        manager.start()
+    shadow_evaluator = ShadowEvaluator(
+        shadow_managers,
+        db_logger=db_logger,
+        max_queue=SHADOW_MAX_QUEUE,
+        # Shadow work is shed first when primary traffic backs up
+        is_overloaded=lambda: in_flight_requests >= SHADOW_SHED_IN_FLIGHT or admission.queued() > 0
+    )
+
+
+def initialize_models():
+    """Load the primary model, then any shadow models."""
+    initialize_model()
+    initialize_shadow_models()
 
 
 def initialize_database():
-    """Initialize MongoDB connection."""
+    """Initialize MongoDB connection (or the in-memory stand-in if MONGODB_URI=memory://)."""
     global db_logger
     try:
-        db_logger = PredictionLogger()
-        print("MongoDB connection initialized")
+        db_logger = create_prediction_logger()
+        print(f"Prediction logging initialized ({type(db_logger).__name__})")
     except Exception as e:
         print(f"Warning: Database initialization failed: {e}")
 
@@ -85,8 +191,12 @@ def root():
             'version': '1.0.0',
             'endpoints': {
                 'health': '/health',
+                'liveness': '/health/live',
+                'readiness': '/health/ready',
                 'predict': '/predict',
                 'statistics': '/statistics',
+                'shadow': '/shadow',
+                'metrics': '/metrics',
                 'predictions': '/predictions?limit=N'
             },
             'status': 'running',
@@ -101,13 +211,40 @@ def health_check():
     """Health check endpoint."""
     return jsonify({
         'status': 'healthy',
-        'model_loaded': model is not None,
+        'model_loaded': model_manager.ready,
+        'model_ready': model_manager.ready,
+        'model_version': model_manager.current.version if model_manager.ready else None,
         'database_connected': db_logger is not None and db_logger.client is not None,
+        'admission': admission.stats(),
         'timestamp': datetime.utcnow().isoformat()
     }), 200
 
 
+@app.route('/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: the process is up and serving HTTP."""
+    return jsonify({'status': 'alive'}), 200
+
+
+@app.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: the model is loaded and warmed up."""
+    current = model_manager.current
+    if current is None:
+        return jsonify({
+            'status': 'not_ready',
+            'model_source': model_manager.source,
+            'last_error': model_manager.last_error
+        }), 503
+    return jsonify({
+        'status': 'ready',
+        'model_version': current.version
+    }), 200
+
+
 @app.route('/predict', methods=['POST'])
+@instrument_view
+@profiling.profile_requests
 def predict():
     """
     Predict endpoint for audio authenticity detection.
@@ -116,18 +253,59 @@ def predict():
         - multipart/form-data with 'audio' file field
         - OR JSON with 'audio_path' field pointing to file
     
+    Headers:
+        X-Request-Priority: 'interactive' (web UI) or 'batch' (default)
+        X-Request-Deadline-Ms: time budget; the request is dropped with 503
+                               if it runs out before inference starts
+    
+    With profiling enabled, an `X-Profile: cpu` header (plus the profiling
+    token) adds a sampling CPU profile of the call to the JSON as 'profile'.
+    
     Returns:
-        JSON with prediction results
+        JSON with prediction results, or 429/503 with Retry-After when
+        shed; the Server-Timing header has the stage durations in ms
+        (queue, upload, decode, resample, mel, preprocess (total of the
+        three), inference and log)
     """
-    if model is None:
+    if not model_manager.ready:
+        if model_manager.source_available():
+            return jsonify({
+                'error': 'Model is loading. Please retry shortly.'
+            }), 503
         return jsonify({
             'error': 'Model not loaded. Please ensure model file exists.'
         }), 500
     
+    global in_flight_requests
     start_time = time.time()
+    arrival = time.monotonic()
+    try:
+        lane = admission.lane_for(request.headers)
+        deadline = admission.deadline_for(request.headers, arrival)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    timer = StageTimer()
+    timer.start('queue')
+    try:
+        ticket = admission.admit(lane, deadline, arrival)
+    except AdmissionRejected as rejected:
+        return rejection_response(rejected)
+    timer.stop()
+    with in_flight_lock:
+        in_flight_requests += 1
     
+    pinned = ExitStack()
     try:
+        # Pin one model version for preprocessing and inference alike, so a
+        # hot-swap in between cannot hand a mel spectrogram to a waveform
+        # model (or the reverse)
+        handle = pinned.enter_context(model_manager.acquire())
+        # Models exported with the in-graph mel frontend take the raw waveform
+        waveform_input = model_expects_waveform(handle.model)
+        
         # Handle file upload
+        timer.start('upload')
         if 'audio' in request.files:
             file = request.files['audio']
             if file.filename == '':
@@ -141,9 +319,12 @@ def predict():
             # Read file bytes
             audio_bytes = file.read()
             filename = secure_filename(file.filename)
+            timer.stop()
             
             # Preprocess audio
-            mel_spectrogram = preprocess_audio_for_prediction(audio_bytes)
+            timer.start('preprocess')
+            model_input, waveform = preprocess_audio_for_prediction(audio_bytes, waveform=waveform_input,
+                                                                    timings=timer.stages, return_waveform=True)
             
         # Handle file path
         elif 'audio_path' in request.json:
@@ -152,49 +333,150 @@ def predict():
                 return jsonify({'error': 'File not found'}), 404
             
             filename = os.path.basename(audio_path)
-            mel_spectrogram = preprocess_audio_for_prediction(audio_path)
+            timer.stop()
+            timer.start('preprocess')
+            model_input, waveform = preprocess_audio_for_prediction(audio_path, waveform=waveform_input,
+                                                                    timings=timer.stages, return_waveform=True)
         
         else:
             return jsonify({
                 'error': 'Please provide either "audio" file or "audio_path" in request'
             }), 400
+        timer.stop()
+        
+        # The client has given up: don't spend inference on it
+        if ticket.expired():
+            return rejection_response(admission.expired(ticket))
         
-        # Make prediction
-        probability, label = predict_audio(model, mel_spectrogram)
+        # Make prediction with the version pinned above, even if a swap happened
+        timer.start('inference')
+        probability, label = predict_audio(handle.model, model_input)
+        model_version = handle.version
+        timer.stop()
         
         processing_time = time.time() - start_time
         
         # Log to database
+        timer.start('log')
+        prediction_id = None
         if db_logger:
-            db_logger.log_prediction(
+            prediction_id = db_logger.log_prediction(
                 audio_filename=filename,
                 prediction=probability,
                 label=label,
                 processing_time=processing_time,
                 metadata={
                     'confidence': abs(probability - 0.5) * 2  # Convert to 0-1 confidence
-                }
+                },
+                model_version=model_version
             )
         
+        if shadow_evaluator:
+            shadow_evaluator.submit(prediction_id, waveform, None if waveform_input else model_input,
+                                    probability, label, primary_version=model_version)
+        timer.stop()
+        
         response = {
             'prediction': label,
             'probability': round(probability, 4),
             'confidence': round(abs(probability - 0.5) * 2, 4),
             'filename': filename,
+            'model_version': model_version,
             'processing_time_seconds': round(processing_time, 4),
             'timestamp': datetime.utcnow().isoformat()
         }
         
-        return jsonify(response), 200
+        return jsonify(response), 200, {'Server-Timing': server_timing(timer.stages)}
         
     except Exception as e:
         error_msg = str(e)
-        print(f"Error in prediction: {error_msg}")
+        current = model_manager.current
+        PREDICT_ERRORS.labels(timer.current or 'unknown').inc()
+        print(f"Error in prediction (model {current.version if current else None}): {error_msg}")
         traceback.print_exc()
         return jsonify({
             'error': 'Prediction failed',
             'message': error_msg
         }), 500
+    finally:
+        pinned.close()
+        admission.release(ticket)
+        observe_stages(timer.stages)
+        with in_flight_lock:
+            in_flight_requests -= 1
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics (stage latencies, request and error counts, in-flight requests)."""
+    body, content_type = render_metrics()
+    return body, 200, {'Content-Type': content_type}
+
+
+def memory_query_args():
+    """key_type, limit and include query parameters of the memory endpoints."""
+    return {
+        'key_type': request.args.get('key_type', 'lineno'),
+        'limit': request.args.get('limit', default=25, type=int),
+        'include': request.args.get('include')
+    }
+
+
+@app.route('/debug/memory/snapshots', methods=['POST'])
+@profiling.protect
+def take_memory_snapshot():
+    """Take a tracemalloc snapshot of this process and return its top allocation sites."""
+    try:
+        snapshot = memory_snapshots.take()
+        snapshot['top'] = memory_snapshots.top(snapshot['id'], **memory_query_args())
+        return jsonify(snapshot), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/debug/memory/snapshots/<int:snapshot_id>', methods=['GET'])
+@profiling.protect
+def get_memory_snapshot(snapshot_id):
+    """Top allocation sites of a stored snapshot."""
+    try:
+        return jsonify({
+            'id': snapshot_id,
+            'pid': os.getpid(),
+            'top': memory_snapshots.top(snapshot_id, **memory_query_args())
+        }), 200
+    except KeyError as e:
+        return jsonify({'error': e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/debug/memory/diff', methods=['GET'])
+@profiling.protect
+def diff_memory_snapshots():
+    """Allocation sites that changed most between snapshots ?from=<id>&to=<id>."""
+    from_id = request.args.get('from', type=int)
+    to_id = request.args.get('to', type=int)
+    if from_id is None or to_id is None:
+        return jsonify({'error': 'Please provide "from" and "to" snapshot ids'}), 400
+    try:
+        return jsonify({
+            'from': from_id,
+            'to': to_id,
+            'pid': os.getpid(),
+            'diff': memory_snapshots.diff(from_id, to_id, **memory_query_args())
+        }), 200
+    except KeyError as e:
+        return jsonify({'error': e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/debug/memory/snapshots', methods=['DELETE'])
+@profiling.protect
+def clear_memory_snapshots():
+    """Stop memory tracing and drop the stored snapshots."""
+    memory_snapshots.clear()
+    return jsonify({'status': 'cleared', 'pid': os.getpid()}), 200
 
 
 @app.route('/predictions', methods=['GET'])
@@ -237,6 +519,21 @@ def get_statistics():
         }), 500
 
 
+@app.route('/shadow', methods=['GET'])
+def get_shadow_statistics():
+    """Get shadow model agreement with the primary model."""
+    if shadow_evaluator is None:
+        return jsonify({
+            'error': 'No shadow models configured'
+        }), 404
+    
+    summary = shadow_evaluator.summary()
+    summary['primary_model_version'] = model_manager.current.version if model_manager.ready else None
+    if db_logger is not None:
+        summary['logged_agreement'] = db_logger.get_shadow_agreement()
+    return jsonify(summary), 200
+
+
 @app.errorhandler(413)
 def request_entity_too_large(error):
     """Handle file too large error."""
@@ -245,11 +542,18 @@ def request_entity_too_large(error):
     }), 413
 
 
-if __name__ == '__main__':
-    # Initialize on startup
+def startup():
+    """Connect the database and start loading models (per server process)."""
     print("Initializing AuralGuard API...")
-    initialize_model()
     initialize_database()
+    # Load and warm the model in the background so liveness probes are
+    # answered immediately; /health/ready turns 200 once warmup is done.
+    threading.Thread(target=initialize_models, daemon=True).start()
+
+
+if __name__ == '__main__':
+    # Initialize on startup
+    startup()
     
     # Run Flask app
     port = int(os.getenv('PORT', 5000))  # Default port 5000 (matches docker-compose)
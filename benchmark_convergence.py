@@ -0,0 +1,226 @@
+"""
+Convergence benchmark for the AuralGuard training input pipeline.
+Trains the same model with each class-balancing mode of build_dataset() and
+reports how many epochs it takes to reach a target validation accuracy,
+along with how balanced the training batches actually were.
+
+Usage:
+    python benchmark_convergence.py                            # uses chunk_manifest.json
+    python benchmark_convergence.py --synthetic 60 --shuffle-buffer 16 --output convergence.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(PROJECT_ROOT)
+
+import complete_training as training  # noqa: E402
+from utils.audio_processor import synthesize_wav_bytes  # noqa: E402
+from utils.chunk_index import build_chunk_index, probe_source  # noqa: E402
+from utils.dataset_manifest import assign_splits, diff_sources, load_manifest, scan_sources  # noqa: E402
+from utils.feature_store import FeatureStore  # noqa: E402
+
+
+def synthesize_dataset(directory, files_per_class=40, duration=15.0, seed=0):
+    """
+    Write a synthetic two-class dataset of WAV files.
+
+    Real and fake clips are tones from overlapping frequency ranges with
+    noise, so the task is learnable but takes a few epochs.
+
+    Args:
+        directory: Output directory (gets 'real' and 'fake' subdirectories)
+        files_per_class: Number of clips per class
+        duration: Length of each clip in seconds
+        seed: Seed for frequencies and noise
+
+    Returns:
+        Mapping of label to class directory
+    """
+    rng = np.random.default_rng(seed)
+    ranges = {'real': (200.0, 420.0), 'fake': (380.0, 600.0)}
+    class_dirs = {}
+    for label, (low, high) in ranges.items():
+        class_dir = os.path.join(directory, label)
+        os.makedirs(class_dir, exist_ok=True)
+        for i in range(files_per_class):
+            wav_bytes = synthesize_wav_bytes(
+                duration=duration,
+                seed=int(rng.integers(1 << 31)),
+                frequency=float(rng.uniform(low, high)),
+                noise=0.2
+            )
+            with open(os.path.join(class_dir, f"{label}_{i:04d}.wav"), 'wb') as f:
+                f.write(wav_bytes)
+        class_dirs[label] = class_dir
+    return class_dirs
+
+
+def index_dataset(class_dirs, test_fraction=0.3, seed=42):
+    """Build a split chunk index for a directory per class (no manifest file is written)."""
+    manifest = {'sources': {}}
+    for source in diff_sources(scan_sources(class_dirs), manifest)['added']:
+        manifest['sources'][source['path']] = {**source, **probe_source(source['path'])}
+    assign_splits(manifest, test_fraction=test_fraction, seed=seed)
+    return build_chunk_index(manifest['sources'].values())
+
+
+def batch_balance(dataset, steps):
+    """Fraction of real examples per batch over the first `steps` batches."""
+    fractions = [float(np.mean(labels)) for _, labels in dataset.take(steps)]
+    return {
+        'mean_real_fraction': float(np.mean(fractions)),
+        'std_real_fraction': float(np.std(fractions)),
+        'single_class_batches': sum(1 for f in fractions if f in (0.0, 1.0)) / max(len(fractions), 1)
+    }
+
+
+def run_trial(chunk_index, feature_store, balance, seed, target_accuracy, max_epochs,
+              batch_size=None, shuffle_buffer=None):
+    """
+    Train one model and record when validation accuracy first reaches the target.
+
+    Returns:
+        Dictionary with epochs_to_target (None if never reached), accuracy
+        history, batch balance and wall time
+    """
+    import tensorflow as tf
+
+    train_chunks = [chunk for chunk in chunk_index if chunk['split'] == 'train']
+    test_chunks = [chunk for chunk in chunk_index if chunk['split'] == 'test']
+    batch_size = batch_size or training.choose_batch_size(len(chunk_index))
+    steps_per_epoch = int(np.ceil(len(train_chunks) / batch_size))
+
+    train = training.build_dataset(train_chunks, batch_size, feature_store, training=True,
+                                   seed=seed, balance=balance, shuffle_buffer=shuffle_buffer)
+    test = training.build_dataset(test_chunks, batch_size, feature_store, training=False)
+
+    tf.keras.utils.set_random_seed(seed)
+    model = training.create_model(input_shape=(128, 469, 1))
+
+    class StopAtTarget(tf.keras.callbacks.Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            if (logs or {}).get('val_accuracy', 0.0) >= target_accuracy:
+                self.model.stop_training = True
+
+    start = time.perf_counter()
+    history = model.fit(train, validation_data=test, epochs=max_epochs,
+                        steps_per_epoch=steps_per_epoch, callbacks=[StopAtTarget()], verbose=0)
+    elapsed = time.perf_counter() - start
+
+    val_accuracy = [float(value) for value in history.history['val_accuracy']]
+    reached = [epoch for epoch, value in enumerate(val_accuracy, start=1) if value >= target_accuracy]
+    return {
+        'balance': balance,
+        'seed': seed,
+        'epochs_to_target': reached[0] if reached else None,
+        'val_accuracy': val_accuracy,
+        'seconds': elapsed,
+        'batch_balance': batch_balance(train, steps_per_epoch)
+    }
+
+
+def summarize(trials, max_epochs):
+    """Per-mode summary; runs that never reach the target count as max_epochs + 1."""
+    summary = {}
+    for balance in dict.fromkeys(trial['balance'] for trial in trials):
+        runs = [trial for trial in trials if trial['balance'] == balance]
+        epochs = [trial['epochs_to_target'] or max_epochs + 1 for trial in runs]
+        summary[balance] = {
+            'runs': len(runs),
+            'reached_target': sum(1 for trial in runs if trial['epochs_to_target']),
+            'mean_epochs_to_target': float(np.mean(epochs)),
+            'median_epochs_to_target': float(np.median(epochs)),
+            'mean_seconds': float(np.mean([trial['seconds'] for trial in runs])),
+            'mean_single_class_batches': float(np.mean(
+                [trial['batch_balance']['single_class_batches'] for trial in runs]))
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark epochs-to-target-accuracy per balancing mode')
+    parser.add_argument('--manifest', type=str, default=training.CHUNK_MANIFEST_PATH,
+                        help='Chunk manifest of the dataset to train on')
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help='Train on this many synthetic clips per class instead of the manifest')
+    parser.add_argument('--feature-store', type=str, default='feature_store',
+                        help='Directory of the persistent mel-spectrogram store')
+    parser.add_argument('--modes', nargs='+', choices=training.BALANCE_MODES,
+                        default=['none', 'interleave'], help='Balancing modes to compare')
+    parser.add_argument('--seeds', type=int, nargs='+', default=[1, 2, 3],
+                        help='Training seeds (one run per mode and seed)')
+    parser.add_argument('--target-accuracy', type=float, default=0.9,
+                        help='Validation accuracy to reach (default: 0.9)')
+    parser.add_argument('--max-epochs', type=int, default=15,
+                        help='Epoch limit per run (default: 15)')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='Batch size (default: same rule as complete_training.py)')
+    parser.add_argument('--shuffle-buffer', type=int, default=None,
+                        help='Shuffle buffer size; set it well below the dataset size to '
+                             'reproduce the behaviour of a large dataset')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Write the results as JSON to this path')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='auralguard_convergence_') as tmp_dir:
+        if args.synthetic:
+            print(f"Synthesizing {args.synthetic} clips per class...")
+            chunk_index = index_dataset(synthesize_dataset(tmp_dir, args.synthetic))
+            feature_store = FeatureStore(os.path.join(tmp_dir, 'feature_store'))
+        else:
+            manifest = load_manifest(args.manifest)
+            if not manifest['sources']:
+                print(f"ERROR: No chunk manifest found at {args.manifest}; run complete_training.py "
+                      f"first or pass --synthetic")
+                return 1
+            chunk_index = build_chunk_index(manifest['sources'].values())
+            feature_store = FeatureStore(args.feature_store)
+        feature_store.featurize(chunk_index)
+
+        trials = []
+        for balance in args.modes:
+            for seed in args.seeds:
+                print(f"Training with balance={balance}, seed={seed}...")
+                trial = run_trial(chunk_index, feature_store, balance, seed,
+                                  args.target_accuracy, args.max_epochs,
+                                  batch_size=args.batch_size, shuffle_buffer=args.shuffle_buffer)
+                print(f"  epochs to {args.target_accuracy:.0%}: {trial['epochs_to_target']}, "
+                      f"single-class batches: {trial['batch_balance']['single_class_batches']:.0%}")
+                trials.append(trial)
+
+    report = {
+        'target_accuracy': args.target_accuracy,
+        'max_epochs': args.max_epochs,
+        'shuffle_buffer': args.shuffle_buffer,
+        'examples': len(chunk_index),
+        'trials': trials,
+        'summary': summarize(trials, args.max_epochs)
+    }
+
+    print("=" * 60)
+    print("AuralGuard Convergence Benchmark")
+    print("=" * 60)
+    print(f"{'balance':12s} {'reached':>8s} {'mean epochs':>12s} {'single-class':>13s} {'seconds':>8s}")
+    for balance, row in report['summary'].items():
+        print(f"{balance:12s} {row['reached_target']:>5d}/{row['runs']:<2d} "
+              f"{row['mean_epochs_to_target']:12.2f} {row['mean_single_class_batches']:12.0%} "
+              f"{row['mean_seconds']:8.1f}")
+    print(f"(runs that never reach {args.target_accuracy:.0%} count as {args.max_epochs + 1} epochs)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,317 @@
+"""
+Microbenchmarks of the AuralGuard serving hot path.
+Times audio_to_mel_spectrogram, preprocess_audio_for_prediction,
+predict_audio and PredictionLogger.log_prediction on standard inputs
+(synthetic WAV/MP3/FLAC clips at several sample rates and durations,
+inference batch sizes 1-64), and measures the Python memory each call
+allocates at its peak and retains afterwards (tracemalloc; memory allocated
+inside TensorFlow kernels is not traced).
+
+Results are compared against a committed baseline; any case slower (best
+of the timed calls, as with timeit) or larger (peak memory) than the baseline by more than the tolerance
+is a regression and makes the command exit with status 1. Baselines are
+machine-specific: regenerate them with --update-baseline on the machine
+that runs the comparison. When the baseline's environment (Python version,
+architecture, CPU count) differs from this machine's, the comparison is
+skipped unless --ignore-environment is given. A skipped comparison (no
+baseline, or a different environment) exits with status 2 when
+--require-baseline is given or the CI environment variable is set, so a
+check cannot pass without comparing anything.
+
+Usage:
+    python benchmark_hotpath.py                                   # compare with the committed baseline
+    python benchmark_hotpath.py --time-tolerance 0.5 --output hotpath.json
+    python benchmark_hotpath.py --update-baseline                 # record a new baseline
+    python benchmark_hotpath.py --ignore-environment              # compare with a baseline from another machine
+    python benchmark_hotpath.py --require-baseline                # fail if nothing was compared
+    python benchmark_hotpath.py --functions predict_audio --batch-sizes 1 64
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(PROJECT_ROOT)
+
+from utils.audio_processor import (  # noqa: E402
+    audio_to_mel_spectrogram,
+    preprocess_audio_for_prediction,
+    synthesize_audio_bytes,
+)
+from utils.database import InMemoryPredictionLogger, PredictionLogger  # noqa: E402
+from utils.model_loader import load_model, predict_audio  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(PROJECT_ROOT, 'benchmarks', 'hotpath_baseline.json')
+FUNCTIONS = ('audio_to_mel_spectrogram', 'preprocess_audio_for_prediction', 'predict_audio', 'log_prediction')
+
+
+def measure(fn, repeats=7, warmup=1):
+    """
+    Time a call and trace its Python allocations.
+
+    Args:
+        fn: Zero-argument callable
+        repeats: Timed calls
+        warmup: Untimed calls first (caches, lazy imports, graph tracing)
+
+    Returns:
+        Dict with median/mean/min/max time in ms, peak traced KiB and
+        KiB still allocated after the call
+    """
+    for _ in range(warmup):
+        fn()
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - start)
+
+    # A separate, untimed call: tracing slows allocation-heavy code down
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = fn()
+        after, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+
+    seconds = np.array(seconds) * 1000
+    return {
+        'repeats': repeats,
+        'median_ms': float(np.median(seconds)),
+        'mean_ms': float(seconds.mean()),
+        'min_ms': float(seconds.min()),
+        'max_ms': float(seconds.max()),
+        'peak_kb': (peak - before) / 1024,
+        'retained_kb': (after - before) / 1024
+    }
+
+
+def audio_cases(formats, sample_rates, durations, directory):
+    """Synthetic clips for every format, sample rate and duration, as bytes and as files."""
+    cases = []
+    for audio_format in formats:
+        for sample_rate in sample_rates:
+            for duration in durations:
+                data = synthesize_audio_bytes(audio_format, duration=duration, sample_rate=sample_rate,
+                                              seed=sample_rate + int(duration), frequency=330.0)
+                path = os.path.join(directory, f"{sample_rate}_{duration:g}.{audio_format}")
+                with open(path, 'wb') as f:
+                    f.write(data)
+                cases.append({'name': f"{audio_format}/{sample_rate}Hz/{duration:g}s",
+                              'path': path, 'data': data})
+    return cases
+
+
+def benchmark_model(model_path=None):
+    """The model to benchmark inference with: model_path, or the default architecture untrained."""
+    if model_path and os.path.exists(model_path):
+        return load_model(model_path), model_path
+    import tensorflow as tf
+    from complete_training import create_model
+
+    tf.keras.utils.set_random_seed(0)
+    return create_model(input_shape=(128, 469, 1)), 'create_model() (untrained)'
+
+
+def run_benchmarks(functions, formats, sample_rates, durations, batch_sizes, repeats=7,
+                   model_path=None, mongodb_uri=None, log_repeats=200):
+    """
+    Run the selected microbenchmarks.
+
+    Returns:
+        (results, info): result dicts keyed by 'function[case]', and the model
+        and prediction logger used
+    """
+    results = {}
+    info = {}
+
+    def record(function, case, stats):
+        key = f"{function}[{case}]"
+        results[key] = {'function': function, 'case': case, **stats}
+        print(f"  {key:58s} {stats['min_ms']:9.3f} ms  peak {stats['peak_kb']:9.1f} KiB")
+
+    with tempfile.TemporaryDirectory(prefix='auralguard_hotpath_') as tmp_dir:
+        if {'audio_to_mel_spectrogram', 'preprocess_audio_for_prediction'} & set(functions):
+            cases = audio_cases(formats, sample_rates, durations, tmp_dir)
+            if 'audio_to_mel_spectrogram' in functions:
+                print("audio_to_mel_spectrogram (file path):")
+                for case in cases:
+                    record('audio_to_mel_spectrogram', case['name'],
+                           measure(lambda: audio_to_mel_spectrogram(case['path']), repeats))
+            if 'preprocess_audio_for_prediction' in functions:
+                print("preprocess_audio_for_prediction (uploaded bytes):")
+                for case in cases:
+                    record('preprocess_audio_for_prediction', case['name'],
+                           measure(lambda: preprocess_audio_for_prediction(case['data']), repeats))
+
+    if 'predict_audio' in functions:
+        import tensorflow as tf
+
+        model, info['model'] = benchmark_model(model_path)
+        print(f"predict_audio ({info['model']}):")
+        rng = np.random.default_rng(0)
+        for batch_size in batch_sizes:
+            batch = tf.constant(rng.random((batch_size, 128, 469, 1), dtype=np.float32))
+            record('predict_audio', f"batch={batch_size}",
+                   measure(lambda: predict_audio(model, batch), repeats))
+
+    if 'log_prediction' in functions:
+        logger = PredictionLogger(mongodb_uri) if mongodb_uri else None
+        if logger is None or logger.collection is None:
+            logger = InMemoryPredictionLogger()
+        info['prediction_logger'] = type(logger).__name__
+        print(f"log_prediction ({info['prediction_logger']}):")
+        stats = measure(lambda: [logger.log_prediction('bench.wav', 0.75, 'real', 0.1,
+                                                       metadata={'confidence': 0.5}, model_version='bench')
+                                 for _ in range(log_repeats)], repeats)
+        # Per call
+        for name in ('median_ms', 'mean_ms', 'min_ms', 'max_ms', 'peak_kb', 'retained_kb'):
+            stats[name] /= log_repeats
+        record('log_prediction', info['prediction_logger'], stats)
+    return results, info
+
+
+def compare_to_baseline(results, baseline, time_tolerance, memory_tolerance, min_peak_kb=64.0):
+    """
+    Compare results with a baseline.
+
+    A case regresses when its fastest call is slower than the baseline's by more than
+    time_tolerance, or its peak memory exceeds both min_peak_kb and the
+    baseline by more than memory_tolerance.
+
+    Returns:
+        One row per case found in both
+    """
+    rows = []
+    for key, result in results.items():
+        previous = baseline.get('results', {}).get(key)
+        if previous is None:
+            continue
+        time_ratio = result['min_ms'] / previous['min_ms'] if previous['min_ms'] else None
+        memory_ratio = result['peak_kb'] / previous['peak_kb'] if previous['peak_kb'] > 0 else None
+        slower = time_ratio is not None and time_ratio > 1.0 + time_tolerance
+        larger = (memory_ratio is not None and memory_ratio > 1.0 + memory_tolerance
+                  and result['peak_kb'] > min_peak_kb)
+        rows.append({
+            'key': key,
+            'time_ratio': time_ratio,
+            'memory_ratio': memory_ratio,
+            'regression': slower or larger,
+            'reasons': [reason for reason, flag in (('time', slower), ('memory', larger)) if flag]
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmark the serving hot path against a baseline')
+    parser.add_argument('--functions', nargs='+', choices=FUNCTIONS, default=list(FUNCTIONS),
+                        help='Functions to benchmark (default: all)')
+    parser.add_argument('--formats', nargs='+', choices=('wav', 'mp3', 'flac'), default=['wav', 'mp3', 'flac'],
+                        help='Audio formats (default: wav mp3 flac)')
+    parser.add_argument('--sample-rates', type=int, nargs='+', default=[16000, 44100],
+                        help='Sample rates of the clips (default: 16000 44100)')
+    parser.add_argument('--durations', type=float, nargs='+', default=[5.0, 15.0],
+                        help='Clip lengths in seconds (default: 5 15)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32, 64],
+                        help='predict_audio batch sizes (default: 1 8 32 64)')
+    parser.add_argument('--repeats', type=int, default=7,
+                        help='Timed calls per case (default: 7)')
+    parser.add_argument('--model-path', type=str, default=os.getenv('MODEL_PATH', 'models/auralguard_model.h5'),
+                        help='Model for predict_audio (default: MODEL_PATH; untrained default '
+                             'architecture if missing)')
+    parser.add_argument('--mongodb-uri', type=str, default=None,
+                        help='Benchmark log_prediction against this MongoDB (default: in-memory stand-in)')
+    parser.add_argument('--baseline', type=str, default=DEFAULT_BASELINE,
+                        help='Baseline results file (default: benchmarks/hotpath_baseline.json)')
+    parser.add_argument('--time-tolerance', type=float, default=0.25,
+                        help='Allowed increase of the fastest call time (default: 0.25 = 25%%)')
+    parser.add_argument('--memory-tolerance', type=float, default=0.1,
+                        help='Allowed peak memory increase (default: 0.1 = 10%%)')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Write the results to the baseline file instead of comparing')
+    parser.add_argument('--ignore-environment', action='store_true',
+                        help='Compare even if the baseline was recorded on a different environment')
+    parser.add_argument('--require-baseline', action='store_true', default=bool(os.getenv('CI')),
+                        help='Exit with status 2 if the comparison is skipped '
+                             '(default: on when the CI environment variable is set)')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Write the results as JSON to this path')
+    args = parser.parse_args()
+
+    results, info = run_benchmarks(args.functions, args.formats, args.sample_rates, args.durations,
+                                   args.batch_sizes, repeats=args.repeats, model_path=args.model_path,
+                                   mongodb_uri=args.mongodb_uri)
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count()
+        },
+        **info,
+        'results': results
+    }
+
+    status = 0
+    baseline = None
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report['baseline'] = args.baseline
+        if baseline.get('environment') != report['environment']:
+            print(f"Warning: {args.baseline} was recorded on a different environment "
+                  f"({baseline.get('environment')}, this machine: {report['environment']})")
+            if not args.ignore_environment:
+                print("  Timings are not comparable: skipping the comparison. Record a baseline "
+                      "here with --update-baseline, or pass --ignore-environment to compare anyway")
+                baseline = None
+                report['comparison_skipped'] = 'environment mismatch'
+    else:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        report['comparison_skipped'] = 'no baseline'
+
+    if 'comparison_skipped' in report and args.require_baseline:
+        print(f"ERROR: comparison skipped ({report['comparison_skipped']}) but a baseline is required")
+        status = 2
+
+    if baseline is not None:
+        report['comparison'] = compare_to_baseline(results, baseline, args.time_tolerance,
+                                                   args.memory_tolerance)
+        regressions = [row for row in report['comparison'] if row['regression']]
+        print("=" * 60)
+        print(f"Compared {len(report['comparison'])} cases with {args.baseline} "
+              f"(time +{args.time_tolerance:.0%}, memory +{args.memory_tolerance:.0%} allowed)")
+        for row in regressions:
+            memory = f"{row['memory_ratio']:.2f}x" if row['memory_ratio'] is not None else '-'
+            elapsed = f"{row['time_ratio']:.2f}x" if row['time_ratio'] is not None else '-'
+            print(f"  REGRESSION {row['key']}: time {elapsed}, memory {memory}")
+        if regressions:
+            status = 1
+        else:
+            print("  No regressions")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Data-parallel scaling benchmark for AuralGuard training.
+Runs complete_training.py with 1..N local workers on the existing chunk
+manifest and feature store, and reports training throughput and scaling
+efficiency (throughput with n workers / (n x single-worker throughput)).
+
+The per-worker batch size is fixed, so the global batch grows with the
+number of workers (weak scaling).
+
+Usage:
+    python benchmark_scaling.py --max-workers 4 --epochs 3 --output scaling.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+TRAINING_SCRIPT = os.path.join(PROJECT_ROOT, 'complete_training.py')
+
+
+def run_training(num_workers, epochs, work_dir, extra_args=()):
+    """
+    Train with `num_workers` local workers and return the chief's summary.
+
+    Args:
+        num_workers: Number of worker processes
+        epochs: Epochs to train (the first is excluded from throughput when > 1)
+        work_dir: Directory for the model, summary and worker logs
+        extra_args: Additional complete_training.py arguments
+
+    Returns:
+        Summary dict written by complete_training.py --summary-output
+    """
+    summary_path = os.path.join(work_dir, f"summary_{num_workers}.json")
+    command = [
+        sys.executable, TRAINING_SCRIPT,
+        '--epochs', str(epochs),
+        '--skip-chunks',
+        '--no-mlflow',
+        '--no-checkpoints',
+        '--model-path', os.path.join(work_dir, f"model_{num_workers}.h5"),
+        '--summary-output', summary_path,
+        '--distributed', str(num_workers)
+    ] + list(extra_args)
+    log_path = os.path.join(work_dir, f"training_{num_workers}.log")
+    with open(log_path, 'w') as log:
+        result = subprocess.run(command, stdout=log, stderr=subprocess.STDOUT)
+    if result.returncode != 0 or not os.path.exists(summary_path):
+        raise RuntimeError(f"Training with {num_workers} worker(s) failed, see {log_path}")
+    with open(summary_path) as f:
+        return json.load(f)
+
+
+def scaling_report(summaries):
+    """Throughput, speedup and efficiency per worker count, relative to one worker."""
+    baseline = summaries[0]['examples_per_second']
+    rows = []
+    for summary in summaries:
+        speedup = summary['examples_per_second'] / baseline if baseline else 0.0
+        rows.append({
+            'num_workers': summary['num_workers'],
+            'global_batch_size': summary['global_batch_size'],
+            'examples_per_second': summary['examples_per_second'],
+            'speedup': speedup,
+            'efficiency': speedup / summary['num_workers']
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure data-parallel training scaling efficiency')
+    parser.add_argument('--max-workers', type=int, default=min(4, os.cpu_count() or 1),
+                        help='Largest number of local workers to run')
+    parser.add_argument('--workers', type=int, nargs='+', default=None,
+                        help='Explicit worker counts (default: 1..max-workers)')
+    parser.add_argument('--epochs', type=int, default=3,
+                        help='Epochs per run (default: 3)')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Write the report as JSON to this path')
+    args, extra_args = parser.parse_known_args()
+
+    worker_counts = sorted(set(args.workers or range(1, args.max_workers + 1)) | {1})
+
+    with tempfile.TemporaryDirectory(prefix='auralguard_scaling_') as work_dir:
+        summaries = []
+        for num_workers in worker_counts:
+            print(f"Training with {num_workers} worker(s)...")
+            summary = run_training(num_workers, args.epochs, work_dir, extra_args)
+            print(f"  {summary['examples_per_second']:.1f} examples/sec")
+            summaries.append(summary)
+
+    report = {
+        'epochs': args.epochs,
+        'cpu_count': os.cpu_count(),
+        'runs': summaries,
+        'scaling': scaling_report(summaries)
+    }
+
+    print("=" * 60)
+    print("AuralGuard Training Scaling")
+    print("=" * 60)
+    print(f"{'workers':>8s} {'global batch':>13s} {'examples/s':>11s} {'speedup':>8s} {'efficiency':>11s}")
+    for row in report['scaling']:
+        print(f"{row['num_workers']:8d} {row['global_batch_size']:13d} {row['examples_per_second']:11.1f} "
+              f"{row['speedup']:8.2f} {row['efficiency']:10.0%}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""
+Training throughput benchmark for AuralGuard.
+Generates a synthetic real/fake dataset, then trains on it with every
+combination of batch size, cache mode, input pipeline parallelism and model
+architecture, and reports end-to-end training throughput (examples/sec,
+step time, input wait) plus the per-stage throughput of the input pipeline.
+
+Cache modes:
+    feature_store       spectrograms precomputed into a float32 feature store
+    feature_store_fp16  the same, stored as float16
+    memory              decoded on the fly, cached in memory after the first epoch
+
+Parallelism is the size of the tf.data thread pool (0 = TensorFlow default).
+Throughput excludes the first epoch (tracing, cache fill).
+
+The JSON results can be compared against a baseline recorded earlier on
+the same machine (no training baseline is committed: throughput depends on
+the host); the command exits with status 1 when any configuration is slower
+than the baseline by more than the tolerance, so CI can fail on regressions.
+
+Usage:
+    python benchmark_training.py --output training_benchmark.json
+    python benchmark_training.py --files-per-class 32 --batch-sizes 8 16 --cache-modes feature_store memory
+    python benchmark_training.py --output training_baseline.json     # record a baseline on this machine
+    python benchmark_training.py --baseline training_baseline.json --tolerance 0.15
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(PROJECT_ROOT)
+
+import complete_training as training  # noqa: E402
+from benchmark_convergence import index_dataset, synthesize_dataset  # noqa: E402
+from utils.feature_store import FeatureStore  # noqa: E402
+from utils.pipeline_profiler import StepProfiler, profile_input_stages  # noqa: E402
+
+CACHE_MODES = ('feature_store', 'feature_store_fp16', 'memory')
+
+# Name -> create_model() keyword arguments
+ARCHITECTURES = {
+    'default': {'filters': 16, 'dense_units': (32, 16)},
+    'small': {'filters': 8, 'dense_units': (16,)},
+    'tiny': {'filters': 4, 'dense_units': (8,)}
+}
+
+
+def config_key(config):
+    """Stable identifier of a benchmark configuration (matches results to the baseline)."""
+    return (f"batch={config['batch_size']},cache={config['cache_mode']},"
+            f"parallelism={config['parallelism']},arch={config['architecture']}")
+
+
+def run_config(chunk_index, feature_stores, config, epochs=2, stage_examples=64, seed=42):
+    """
+    Benchmark one configuration.
+
+    Args:
+        chunk_index: Split chunk index of the synthetic dataset
+        feature_stores: Featurized FeatureStore per cache mode (None for 'memory')
+        config: batch_size, cache_mode, parallelism and architecture
+        epochs: Epochs to train (the first is excluded from throughput)
+        stage_examples: Examples timed per input pipeline stage
+        seed: Shuffling and weight-initialization seed
+
+    Returns:
+        Result dict with end-to-end 'training' and per-stage 'stages' throughput
+    """
+    import tensorflow as tf
+
+    feature_store = feature_stores[config['cache_mode']]
+    train_chunks = [chunk for chunk in chunk_index if chunk['split'] == 'train']
+    batch_size = config['batch_size']
+    steps_per_epoch = int(np.ceil(len(train_chunks) / batch_size))
+
+    options = tf.data.Options()
+    if config['parallelism']:
+        options.threading.private_threadpool_size = config['parallelism']
+
+    stages = profile_input_stages(
+        [(name, dataset.with_options(options), examples)
+         for name, dataset, examples in training.input_stage_datasets(
+             train_chunks, batch_size, feature_store, seed=seed)],
+        max_examples=stage_examples
+    )
+
+    tf.keras.backend.clear_session()
+    tf.keras.utils.set_random_seed(seed)
+    model = training.create_model(input_shape=(128, 469, 1), **ARCHITECTURES[config['architecture']])
+    profiler = StepProfiler(skip_steps=steps_per_epoch if epochs > 1 else 1)
+    train = training.build_dataset(train_chunks, batch_size, feature_store, training=True, seed=seed)
+    train = profiler.wrap_dataset(train.with_options(options))
+
+    start = time.perf_counter()
+    model.fit(train, epochs=epochs, steps_per_epoch=steps_per_epoch, callbacks=[profiler], verbose=0)
+    seconds = time.perf_counter() - start
+
+    steps = profiler.summary()
+    return {
+        **config,
+        'key': config_key(config),
+        'parameters': model.count_params(),
+        'seconds': seconds,
+        'training': {
+            **steps,
+            'examples_per_second': batch_size * 1000.0 / steps['step_ms_mean'] if steps.get('steps') else 0.0
+        },
+        'stages': stages
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Compare training throughput per configuration with a baseline run.
+
+    Args:
+        results: Result dicts from run_config()
+        baseline: Report previously written by this script
+        tolerance: Allowed fractional slowdown (0.1 = 10% fewer examples/sec)
+
+    Returns:
+        One row per configuration found in both, with 'ratio' (current /
+        baseline throughput) and 'regression'
+    """
+    previous = {result['key']: result for result in baseline.get('results', [])}
+    rows = []
+    for result in results:
+        if result['key'] not in previous:
+            continue
+        before = previous[result['key']]['training']['examples_per_second']
+        after = result['training']['examples_per_second']
+        ratio = after / before if before else None
+        rows.append({
+            'key': result['key'],
+            'baseline_examples_per_second': before,
+            'examples_per_second': after,
+            'ratio': ratio,
+            'regression': ratio is not None and ratio < 1.0 - tolerance
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark training throughput across pipeline configurations')
+    parser.add_argument('--files-per-class', type=int, default=24,
+                        help='Synthetic clips per class (default: 24)')
+    parser.add_argument('--duration', type=float, default=15.0,
+                        help='Length of each synthetic clip in seconds (default: 15)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[8, 16],
+                        help='Batch sizes to benchmark (default: 8 16)')
+    parser.add_argument('--cache-modes', nargs='+', choices=CACHE_MODES, default=['feature_store', 'memory'],
+                        help='Input caching modes to benchmark (default: feature_store memory)')
+    parser.add_argument('--parallelism', type=int, nargs='+', default=[0],
+                        help='tf.data thread pool sizes, 0 = TensorFlow default (default: 0)')
+    parser.add_argument('--architectures', nargs='+', choices=sorted(ARCHITECTURES), default=['default'],
+                        help='Model architectures to benchmark (default: default)')
+    parser.add_argument('--epochs', type=int, default=2,
+                        help='Epochs per configuration; the first is excluded (default: 2)')
+    parser.add_argument('--stage-examples', type=int, default=64,
+                        help='Examples timed per input pipeline stage (default: 64)')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='Dataset, shuffling and initialization seed (default: 42)')
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='Compare against this earlier results file')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Allowed throughput drop against the baseline (default: 0.1 = 10%%)')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Write the results as JSON to this path')
+    args = parser.parse_args()
+
+    import tensorflow as tf
+
+    configs = [
+        {'batch_size': batch_size, 'cache_mode': cache_mode,
+         'parallelism': parallelism, 'architecture': architecture}
+        for batch_size, cache_mode, parallelism, architecture in itertools.product(
+            args.batch_sizes, args.cache_modes, args.parallelism, args.architectures)
+    ]
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='auralguard_training_benchmark_') as tmp_dir:
+        print(f"Synthesizing {args.files_per_class} clips per class...")
+        class_dirs = synthesize_dataset(os.path.join(tmp_dir, 'data'), args.files_per_class,
+                                        duration=args.duration, seed=args.seed)
+        chunk_index = index_dataset(class_dirs, seed=args.seed)
+
+        feature_stores = {'memory': None}
+        for cache_mode in set(args.cache_modes) - {'memory'}:
+            dtype = 'float16' if cache_mode == 'feature_store_fp16' else 'float32'
+            feature_stores[cache_mode] = FeatureStore(os.path.join(tmp_dir, 'feature_store'), dtype=dtype)
+            feature_stores[cache_mode].featurize(chunk_index)
+
+        for config in configs:
+            print(f"Benchmarking {config_key(config)}...")
+            result = run_config(chunk_index, feature_stores, config, epochs=args.epochs,
+                                stage_examples=args.stage_examples, seed=args.seed)
+            print(f"  {result['training']['examples_per_second']:.1f} examples/sec, "
+                  f"input wait {result['training'].get('input_wait_fraction', 0.0):.0%}")
+            results.append(result)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': {
+            'python': platform.python_version(),
+            'tensorflow': tf.__version__,
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'gpus': len(tf.config.list_physical_devices('GPU'))
+        },
+        'dataset': {
+            'files_per_class': args.files_per_class,
+            'duration': args.duration,
+            'train_chunks': sum(1 for chunk in chunk_index if chunk['split'] == 'train'),
+            'test_chunks': sum(1 for chunk in chunk_index if chunk['split'] == 'test')
+        },
+        'epochs': args.epochs,
+        'results': results
+    }
+
+    print("=" * 60)
+    print("AuralGuard Training Throughput")
+    print("=" * 60)
+    print(f"{'configuration':58s} {'examples/s':>11s} {'step ms':>8s} {'input wait':>11s}")
+    for result in results:
+        training_stats = result['training']
+        print(f"{result['key']:58s} {training_stats['examples_per_second']:11.1f} "
+              f"{training_stats.get('step_ms_mean', 0.0):8.1f} "
+              f"{training_stats.get('input_wait_fraction', 0.0):10.0%}")
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report['baseline'] = args.baseline
+        report['comparison'] = compare_to_baseline(results, baseline, args.tolerance)
+        print(f"Against {args.baseline} (tolerance {args.tolerance:.0%}):")
+        for row in report['comparison']:
+            flag = 'REGRESSION' if row['regression'] else 'ok'
+            ratio = f"{row['ratio']:.2f}x" if row['ratio'] is not None else '-'
+            print(f"  {row['key']:58s} {ratio:>7s}  {flag}")
+        if not report['comparison']:
+            print("  No configurations in common with the baseline")
+        if any(row['regression'] for row in report['comparison']):
+            status = 1
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,17 +7,41 @@ Run this instead of running notebook cells manually.
 import tensorflow as tf
 from keras import Sequential
 from keras.layers import Dense, Conv2D, Flatten, Input
-import librosa
-import soundfile as sf
-import tensorflow_io as tfio
+import json
 import numpy as np
 import os
+import random
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 # Add utils to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from mlflow_tracking import MLflowTracker
+from utils.checkpointing import TrainingCheckpointer, run_directory
+from utils.chunk_index import build_chunk_index, probe_source, read_chunk, split_validation
+from utils.distributed import (
+    cluster_from_env,
+    fit_distributed,
+    launch_local_workers,
+    shard_chunks,
+)
+from utils.evaluation import evaluate_streaming
+from utils.mlflow_logging import AsyncMLflowLogger, MLflowMetricsCallback
+from utils.pipeline_profiler import StepProfiler, bottleneck_report, format_report, profile_input_stages
+from utils.feature_store import FeatureStore
+from utils.tf_mel import mel_spectrogram as tf_mel_spectrogram
+from utils.dataset_manifest import (
+    assign_splits,
+    diff_sources,
+    load_manifest,
+    manifest_fingerprint,
+    record_training,
+    save_manifest,
+    scan_sources,
+    untrained_sources,
+)
 
 print("=" * 60)
 print("AuralGuard - Complete Training Script")
@@ -25,41 +49,39 @@ print("=" * 60)
 print()
 
 # ============================================================================
-# STEP 1: Data Preparation - Create Audio Chunks
+# STEP 1: Data Preparation - Build Chunk Index
 # ============================================================================
 
-def convert_audio_to_chunks(path, filename, output_dir):
-    """Convert large audio files to 15-second chunks. Pads short files."""
-    wav, sr = librosa.load(path, sr=None)
-    chunk_size = 15  # 15 seconds chunks
-    
-    chunk_samples = sr * chunk_size
-    os.makedirs(output_dir, exist_ok=True)
-
-    # If file is shorter than 15 seconds, pad it with zeros
-    if len(wav) < chunk_samples:
-        # Pad with zeros to make it exactly 15 seconds
-        padding = np.zeros(chunk_samples - len(wav))
-        wav = np.concatenate([wav, padding])
-        file = f"chunk_0_{filename}"
-        sf.write(os.path.join(output_dir, file), wav, sr)
-        return None
-    
-    # For longer files, create chunks
-    for i, start_sample in enumerate(range(0, len(wav), chunk_samples)):
-        chunk = wav[start_sample:start_sample + chunk_samples]
-        if len(chunk) < chunk_samples:
-            # Pad the last chunk if it's shorter
-            padding = np.zeros(chunk_samples - len(chunk))
-            chunk = np.concatenate([chunk, padding])
-        file = f"chunk_{i}_{filename}"
-        sf.write(os.path.join(output_dir, file), chunk, sr)
-    return None
+CHUNK_MANIFEST_PATH = 'chunk_manifest.json'
+
 
+def _probe(source):
+    """Process-pool worker: read one source's sample rate and length."""
+    return source['path'], probe_source(source['path'])
 
-def prepare_audio_chunks():
-    """Prepare audio chunks from original dataset."""
-    print("Step 1: Preparing audio chunks...")
+
+def prepare_chunk_index(workers=None, manifest_path=CHUNK_MANIFEST_PATH, rescan=True,
+                        test_fraction=0.3, seed=42):
+    """Build the virtual chunk index from the original dataset.
+    
+    Each 15-second chunk is described as (source file, sample offset, length,
+    label) and decoded on demand during training, so no chunk files are
+    written. A manifest records each source's path, size, mtime, content hash
+    and audio header, so only new or changed sources are probed again. The
+    manifest also assigns each source file to the train or test split.
+    """
+    print("Step 1: Building chunk index...")
+    
+    manifest = load_manifest(manifest_path)
+    if not rescan:
+        if not manifest['sources']:
+            print(f"ERROR: No chunk manifest found at {manifest_path}")
+            return None
+        print(f"  Using existing manifest {manifest_path} without rescanning")
+        split_counts = assign_splits(manifest, test_fraction=test_fraction, seed=seed)
+        save_manifest(manifest, manifest_path)
+        print(f"  Split: {split_counts['train']} train files, {split_counts['test']} test files")
+        return build_chunk_index(manifest['sources'].values())
     
     real_path = os.path.join('Audio Dataset', 'KAGGLE', 'AUDIO', 'REAL')
     fake_path = os.path.join('Audio Dataset', 'KAGGLE', 'AUDIO', 'FAKE')
@@ -68,84 +90,77 @@ def prepare_audio_chunks():
     if not os.path.exists(real_path):
         print(f"ERROR: Real audio path not found: {real_path}")
         print("Please ensure your audio dataset is in the correct location.")
-        return False
+        return None
     
     if not os.path.exists(fake_path):
         print(f"ERROR: Fake audio path not found: {fake_path}")
         print("Please ensure your audio dataset is in the correct location.")
-        return False
-    
-    # Create chunks
-    print("  Creating chunks from real audio files...")
-    real_files = os.listdir(real_path)
-    for file in real_files:
-        if file.endswith(('.wav', '.mp3', '.flac')):
-            convert_audio_to_chunks(
-                os.path.join(real_path, file), 
-                file, 
-                'real_audio_chunks'
-            )
+        return None
     
-    print("  Creating chunks from fake audio files...")
-    fake_files = os.listdir(fake_path)
-    for file in fake_files:
-        if file.endswith(('.wav', '.mp3', '.flac')):
-            convert_audio_to_chunks(
-                os.path.join(fake_path, file), 
-                file, 
-                'fake_audio_chunks'
-            )
+    diff = diff_sources(scan_sources({'real': real_path, 'fake': fake_path}), manifest)
+    
+    # Entries written before the index existed have no audio header yet
+    unprobed = [source for source in diff['unchanged'] if 'frames' not in source]
+    unchanged = [source for source in diff['unchanged'] if 'frames' in source]
+    to_probe = diff['added'] + diff['changed'] + unprobed
+    
+    print(f"  Sources: {len(diff['unchanged'])} unchanged, {len(diff['added'])} new, "
+          f"{len(diff['changed'])} changed, {len(diff['removed'])} removed")
     
-    print("  ✅ Audio chunks created successfully!")
-    return True
+    sources = {source['path']: source for source in unchanged}
+    if to_probe:
+        print(f"  Probing {len(to_probe)} files with {workers or os.cpu_count()} workers...")
+        by_path = {source['path']: source for source in to_probe}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for path, header in executor.map(_probe, to_probe, chunksize=16):
+                entry = {**by_path[path], **header}
+                entry.pop('chunks', None)
+                sources[path] = entry
+    
+    manifest['sources'] = sources
+    split_counts = assign_splits(manifest, test_fraction=test_fraction, seed=seed)
+    save_manifest(manifest, manifest_path)
+    
+    chunk_index = build_chunk_index(sources.values())
+    print(f"  Data version: {manifest_fingerprint(manifest)}")
+    print(f"  Split: {split_counts['train']} train files, {split_counts['test']} test files")
+    print(f"  ✅ Indexed {len(chunk_index)} chunks from {len(sources)} source files")
+    return chunk_index
 
 
 # ============================================================================
 # STEP 2: Load and Preprocess Audio
 # ============================================================================
 
-def load_wav_16k_mono(filename):
-    """Load audio file and convert to 16kHz mono."""
-    wav = tf.io.read_file(filename)
-    wav, sr = tf.audio.decode_wav(wav, desired_channels=1)
-    wav = tf.squeeze(wav, axis=1)
-    sr = tf.cast(sr, dtype=tf.int64)
-    wav = tfio.audio.resample(wav, rate_in=sr, rate_out=16000)
-    return wav
-
-
-def file_to_mel_spectrogram_by_lib(filename, label):
-    """Convert file to mel-spectrogram."""
-    def numpy_func(filename_tensor):
-        wav, samp_rate = librosa.load(
-            filename_tensor.numpy().decode('utf-8'), 
-            sr=16000, 
-            mono=True
-        )
-        # Ensure audio is exactly 15 seconds (240000 samples at 16kHz)
-        target_length = 16000 * 15
-        if len(wav) > target_length:
-            wav = wav[:target_length]
-        elif len(wav) < target_length:
-            padding = np.zeros(target_length - len(wav))
-            wav = np.concatenate([wav, padding])
-        
-        mel_spectrogram_numpy = librosa.feature.melspectrogram(
-            y=wav, sr=samp_rate, n_mels=128, fmax=8000
-        )
-        mel_spectrogram_tf = tf.convert_to_tensor(
-            mel_spectrogram_numpy, 
-            dtype=tf.float32
+def chunk_to_waveform(path, offset, length, sample_rate, label):
+    """Decode one indexed chunk from its source file as a 16kHz waveform."""
+    def numpy_func(path_tensor, offset_tensor, length_tensor, sample_rate_tensor):
+        # Seek-based read of just this chunk, resampled to 16kHz and
+        # padded to exactly 15 seconds (240000 samples) in memory
+        return read_chunk(
+            path_tensor.numpy().decode('utf-8'),
+            int(offset_tensor.numpy()),
+            int(length_tensor.numpy()),
+            int(sample_rate_tensor.numpy())
         )
-        return mel_spectrogram_tf
 
-    mel_spectrogram = tf.py_function(
+    wav = tf.py_function(
         numpy_func, 
-        inp=[filename], 
+        inp=[path, offset, length, sample_rate], 
         Tout=tf.float32
     )
     # Set explicit shape to avoid unknown rank issues
-    mel_spectrogram.set_shape([128, 469])
+    wav.set_shape([240000])
+    return wav, label
+
+
+def waveform_to_mel_spectrogram(wav, label):
+    """Convert a 16kHz waveform to a mel-spectrogram with native TF ops.
+    
+    Matches librosa.feature.melspectrogram(sr=16000, n_mels=128, fmax=8000)
+    but runs in the graph, so the map parallelizes without holding the GIL.
+    """
+    mel_spectrogram = tf_mel_spectrogram(wav)
     mel_spectrogram = tf.expand_dims(mel_spectrogram, axis=2)
     return mel_spectrogram, label
 
@@ -154,31 +169,163 @@ def file_to_mel_spectrogram_by_lib(filename, label):
 # STEP 3: Prepare Dataset
 # ============================================================================
 
-def prepare_dataset(real_chunks_path='real_audio_chunks', 
-                   fake_chunks_path='fake_audio_chunks'):
-    """Prepare TensorFlow dataset from audio chunks."""
-    print("Step 2: Preparing dataset...")
+def choose_batch_size(total_samples):
+    """Pick the batch size for a dataset size (smaller batches for tiny datasets)."""
+    if total_samples < 20:
+        return 1  # Use batch size 1 for very small datasets
+    elif total_samples < 50:
+        return 4
+    return 16
+
+
+BALANCE_MODES = ('interleave', 'rejection', 'none')
+
+
+def _chunk_examples(chunks, feature_store=None):
+    """Unbatched (mel-spectrogram, label) dataset for a list of chunks."""
+    labels = np.array([1.0 if chunk['label'] == 'real' else 0.0 for chunk in chunks],
+                      dtype=np.float32)
     
-    # Check if chunks exist
-    if not os.path.exists(real_chunks_path):
-        print(f"ERROR: {real_chunks_path} not found!")
-        return None
+    if feature_store is not None:
+        return feature_store.as_dataset(chunks, labels)
     
-    if not os.path.exists(fake_chunks_path):
-        print(f"ERROR: {fake_chunks_path} not found!")
-        return None
+    data = tf.data.Dataset.from_tensor_slices((
+        [chunk['path'] for chunk in chunks],
+        np.array([chunk['offset'] for chunk in chunks], dtype=np.int64),
+        np.array([chunk['length'] for chunk in chunks], dtype=np.int64),
+        np.array([chunk['sample_rate'] for chunk in chunks], dtype=np.int64),
+        labels
+    ))
+    data = data.map(chunk_to_waveform, num_parallel_calls=tf.data.AUTOTUNE)
+    data = data.map(waveform_to_mel_spectrogram, num_parallel_calls=tf.data.AUTOTUNE)
+    return data.cache()
+
+
+def build_dataset(chunks, batch_size, feature_store=None, training=False, seed=42,
+                  balance='interleave', real_fraction=0.5, shuffle_buffer=None):
+    """Build the input pipeline for one split.
     
-    # Create datasets
-    real_chunks_examples = tf.data.Dataset.list_files(
-        os.path.join(real_chunks_path, '*.wav')
-    )
-    fake_chunks_examples = tf.data.Dataset.list_files(
-        os.path.join(fake_chunks_path, '*.wav')
-    )
+    Cardinality is known from the index (no pass over the data is needed).
+    The training pipeline is shuffled with a fixed seed and, by default,
+    class-balanced so batch composition does not depend on how the index
+    is ordered or how large the dataset is relative to the shuffle buffer:
+    
+        interleave - one shuffled, repeated stream per class, sampled with
+                     weights (real_fraction, 1 - real_fraction)
+        rejection  - one shuffled stream, rejection-resampled to the target
+                     class distribution
+        none       - one shuffled stream (class mix follows the buffer)
     
-    # Get dataset sizes
-    real_count = len(list(real_chunks_examples))
-    fake_count = len(list(fake_chunks_examples))
+    Balanced training pipelines repeat indefinitely; train for
+    ceil(len(chunks) / batch_size) steps per epoch.
+    """
+    if balance not in BALANCE_MODES:
+        raise ValueError(f"Unknown balance mode '{balance}', expected one of {BALANCE_MODES}")
+    if shuffle_buffer is None:
+        shuffle_buffer = min(2100, len(chunks) * 2)
+    
+    by_class = {
+        label: [chunk for chunk in chunks if chunk['label'] == label]
+        for label in ('real', 'fake')
+    }
+    weights = [real_fraction, 1.0 - real_fraction]
+    
+    if training and balance == 'interleave' and all(by_class.values()):
+        streams = [
+            _chunk_examples(by_class[label], feature_store)
+            .shuffle(buffer_size=min(shuffle_buffer, len(by_class[label])), seed=seed,
+                     reshuffle_each_iteration=True)
+            .repeat()
+            for label in ('real', 'fake')
+        ]
+        data = tf.data.Dataset.sample_from_datasets(streams, weights=weights, seed=seed)
+    elif training and balance == 'rejection' and all(by_class.values()):
+        # Class 1 = real, class 0 = fake
+        initial = [len(by_class['fake']) / len(chunks), len(by_class['real']) / len(chunks)]
+        data = _chunk_examples(chunks, feature_store)
+        data = data.shuffle(buffer_size=shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+        data = data.repeat().rejection_resample(
+            class_func=lambda x, y: tf.cast(y, tf.int32),
+            target_dist=[weights[1], weights[0]],
+            initial_dist=initial,
+            seed=seed
+        )
+        data = data.map(lambda label, example: example)
+    else:
+        data = _chunk_examples(chunks, feature_store)
+        if training:
+            data = data.shuffle(buffer_size=shuffle_buffer, seed=seed,
+                                reshuffle_each_iteration=True)
+        data = data.batch(batch_size=batch_size)
+        data = data.apply(tf.data.experimental.assert_cardinality(
+            int(np.ceil(len(chunks) / batch_size))))
+        return data.prefetch(buffer_size=8)
+    
+    data = data.batch(batch_size=batch_size)
+    return data.prefetch(buffer_size=8)
+
+
+def select_incremental_chunks(chunk_index, new_paths, replay_ratio=1.0, seed=42):
+    """Restrict the training split to new source files plus a replay sample.
+    
+    Training chunks of new (added or changed) source files are all kept; of
+    the other training chunks, a random sample of replay_ratio times as many
+    is replayed so fine-tuning does not forget the old data. Test chunks are
+    kept as they are, so evaluation stays comparable across runs.
+    
+    Returns (chunk_index, counts), or (None, counts) when no new source file
+    is in the training split.
+    """
+    new_paths = set(new_paths)
+    test = [chunk for chunk in chunk_index if chunk['split'] == 'test']
+    new = [chunk for chunk in chunk_index if chunk['split'] == 'train' and chunk['path'] in new_paths]
+    old = [chunk for chunk in chunk_index if chunk['split'] == 'train' and chunk['path'] not in new_paths]
+    replay = random.Random(seed).sample(old, min(len(old), int(round(len(new) * replay_ratio))))
+    counts = {
+        'new_files': len(new_paths),
+        'new_train_files': len({chunk['path'] for chunk in new}),
+        'new_chunks': len(new),
+        'replay_chunks': len(replay),
+        'old_chunks': len(old)
+    }
+    if not new:
+        return None, counts
+    return new + replay + test, counts
+
+
+def prepare_dataset(chunk_index, feature_store=None, workers=None, seed=42,
+                    balance='interleave', real_fraction=0.5, num_workers=1, worker_index=0,
+                    batch_size=None, validation_fraction=0.0):
+    """Prepare train, validation and test TensorFlow datasets from the chunk index.
+    
+    The split comes from the manifest at the source-file level, so chunks
+    of one recording never land in both. With a FeatureStore, missing
+    spectrograms are computed once and both pipelines stream from its
+    memory-mapped shards; otherwise chunks are decoded on the fly. The
+    training pipeline is class-balanced according to `balance` (see
+    build_dataset); the test pipeline is left as is.
+    
+    With several workers, each worker trains on its own shard of the source
+    files (see utils.distributed.shard_chunks) with batches of the global
+    batch size (per-worker batch size x workers), which the strategy splits
+    across workers. Training and validation pipelines repeat so every worker
+    runs the same number of steps.
+    
+    batch_size is the per-worker batch size (chosen from the dataset size
+    if None).
+    
+    Validation runs on the test split unless validation_fraction is set;
+    then that fraction of the training source files is held out for
+    validation instead (see split_validation), so model selection never
+    sees the test split.
+    
+    Returns (train, validation, test, info) or None. `test` is the full,
+    unsharded test split used for the final evaluation.
+    """
+    print("Step 2: Preparing dataset...")
+    
+    real_count = sum(1 for chunk in chunk_index if chunk['label'] == 'real')
+    fake_count = sum(1 for chunk in chunk_index if chunk['label'] == 'fake')
     
     print(f"  Found {real_count} real audio chunks")
     print(f"  Found {fake_count} fake audio chunks")
@@ -187,122 +334,318 @@ def prepare_dataset(real_chunks_path='real_audio_chunks',
         print("ERROR: No audio chunks found!")
         return None
     
-    # Create labels
-    real_labels = tf.data.Dataset.from_tensor_slices(tf.ones(real_count))
-    fake_labels = tf.data.Dataset.from_tensor_slices(tf.zeros(fake_count))
-    
-    # Zip with labels
-    real_data = tf.data.Dataset.zip((real_chunks_examples, real_labels))
-    fake_data = tf.data.Dataset.zip((fake_chunks_examples, fake_labels))
-    
-    # Concatenate
-    data = real_data.concatenate(fake_data)
+    train_chunks = [chunk for chunk in chunk_index if chunk['split'] == 'train']
+    test_chunks = [chunk for chunk in chunk_index if chunk['split'] == 'test']
+    if not train_chunks or not test_chunks:
+        print("ERROR: Need at least one source file in each of the train and test splits!")
+        return None
+    validation_chunks = test_chunks
+    separate_validation = validation_fraction > 0
+    if separate_validation:
+        train_chunks, validation_chunks = split_validation(train_chunks, validation_fraction, seed)
+        if not validation_chunks:
+            print("ERROR: Need at least two training files per class to hold out validation files!")
+            return None
     
-    # Map to mel-spectrograms
-    print("  Converting to mel-spectrograms (this may take a while)...")
-    data = data.map(file_to_mel_spectrogram_by_lib)
-    data = data.cache()
+    train_shard = shard_chunks(train_chunks, num_workers, worker_index)
+    validation_shards = [shard_chunks(validation_chunks, num_workers, i) for i in range(num_workers)]
+    if not train_shard:
+        print(f"ERROR: Worker {worker_index} has no training files; use fewer workers!")
+        return None
     
-    # Adjust batch size for small datasets
-    total_samples = real_count + fake_count
-    if total_samples < 20:
-        batch_size = 1  # Use batch size 1 for very small datasets
-    elif total_samples < 50:
-        batch_size = 4
+    if feature_store is not None:
+        extra = validation_chunks if separate_validation else []
+        feature_store.featurize(train_shard + extra + test_chunks, workers=workers)
+        print(f"  Streaming mel-spectrograms from {feature_store.directory}")
     else:
-        batch_size = 16
+        print("  Converting to mel-spectrograms on the fly (this may take a while)...")
     
-    data = data.shuffle(buffer_size=min(2100, total_samples * 2))
-    data = data.batch(batch_size=batch_size)
-    data = data.prefetch(buffer_size=8)
+    batch_size = batch_size or choose_batch_size(real_count + fake_count)
+    global_batch_size = batch_size * num_workers
+    train = build_dataset(train_shard, global_batch_size, feature_store, training=True, seed=seed,
+                          balance=balance, real_fraction=real_fraction)
+    test = build_dataset(test_chunks, batch_size, feature_store, training=False)
+    validation = build_dataset(validation_chunks, batch_size, feature_store, training=False) \
+        if separate_validation else test
+    validation_steps = None
+    
+    if num_workers > 1:
+        options = tf.data.Options()
+        # Already sharded by source file above
+        options.experimental_distribute.auto_shard_policy = tf.data.experimental.AutoShardPolicy.OFF
+        if train.cardinality() != tf.data.INFINITE_CARDINALITY:
+            train = train.repeat()
+        train = train.with_options(options)
+        # Validate on per-worker validation shards when every worker has one
+        if all(validation_shards):
+            validation = build_dataset(validation_shards[worker_index], global_batch_size, feature_store)
+            validation = validation.repeat().with_options(options)
+            validation_steps = int(np.ceil(len(validation_chunks) / global_batch_size))
+        else:
+            print("  Fewer validation files than workers: skipping validation during training")
+            validation = None
     
+    info = {
+        'batch_size': batch_size,
+        'global_batch_size': global_batch_size,
+        'num_workers': num_workers,
+        'steps_per_epoch': int(np.ceil(len(train_chunks) / global_batch_size)),
+        'validation_steps': validation_steps,
+        'balance': balance,
+        'real_fraction': real_fraction,
+        'train_chunks': len(train_chunks),
+        'validation_chunks': len(validation_chunks) if separate_validation else 0,
+        'test_chunks': len(test_chunks),
+        'train_files': len({chunk['path'] for chunk in train_chunks}),
+        'test_files': len({chunk['path'] for chunk in test_chunks}),
+        'seed': seed
+    }
+    print(f"  Train: {info['train_chunks']} chunks from {info['train_files']} files")
+    if separate_validation:
+        print(f"  Validation: {len(validation_chunks)} chunks from "
+              f"{len({chunk['path'] for chunk in validation_chunks})} training files")
+    print(f"  Test: {info['test_chunks']} chunks from {info['test_files']} files")
+    if num_workers > 1:
+        print(f"  Worker {worker_index}/{num_workers}: {len(train_shard)} training chunks, "
+              f"global batch size {global_batch_size}")
     print("  ✅ Dataset prepared successfully!")
-    return data
+    return train, validation, test, info
+
+
+def input_stage_datasets(chunks, batch_size, feature_store=None, seed=42,
+                         balance='interleave', real_fraction=0.5):
+    """Cumulative prefixes of the training input pipeline, for profiling.
+    
+    Returns [(stage name, dataset, examples per element)]: reading from the
+    feature store (or decoding and computing mel-spectrograms on the fly),
+    then the full shuffled, balanced, batched pipeline. Prefixes are built
+    fresh, so no stage benefits from another's cache, and are iterated in
+    batches like the full pipeline, so per-element iteration overhead does
+    not count against the early stages. On-the-fly pipelines cache decoded
+    spectrograms, so the full pipeline shows its throughput after the
+    first epoch.
+    """
+    stages = []
+    if feature_store is not None:
+        labels = np.zeros(len(chunks), dtype=np.float32)
+        stages.append(('read (feature store)', feature_store.as_dataset(chunks, labels)
+                       .repeat().batch(batch_size), batch_size))
+    else:
+        data = tf.data.Dataset.from_tensor_slices((
+            [chunk['path'] for chunk in chunks],
+            np.array([chunk['offset'] for chunk in chunks], dtype=np.int64),
+            np.array([chunk['length'] for chunk in chunks], dtype=np.int64),
+            np.array([chunk['sample_rate'] for chunk in chunks], dtype=np.int64),
+            np.zeros(len(chunks), dtype=np.float32)
+        ))
+        decoded = data.map(chunk_to_waveform, num_parallel_calls=tf.data.AUTOTUNE)
+        mel = decoded.map(waveform_to_mel_spectrogram, num_parallel_calls=tf.data.AUTOTUNE)
+        stages.append(('decode + resample', decoded.repeat().batch(batch_size), batch_size))
+        stages.append(('mel-spectrogram', mel.repeat().batch(batch_size), batch_size))
+    stages.append(('full pipeline', build_dataset(
+        chunks, batch_size, feature_store, training=True, seed=seed,
+        balance=balance, real_fraction=real_fraction).repeat(), batch_size))
+    return stages
 
 
 # ============================================================================
 # STEP 4: Create Model
 # ============================================================================
 
-def create_model(input_shape=(128, 469, 1)):
-    """Create the CNN model."""
+def create_model(input_shape=(128, 469, 1), filters=16, dense_units=(32, 16), learning_rate=0.001):
+    """Create the CNN model.
+    
+    Args:
+        input_shape: Mel-spectrogram input shape
+        filters: Filters in each of the two Conv2D layers
+        dense_units: Units of the hidden Dense layers
+        learning_rate: Adam learning rate
+    """
     print("Step 3: Creating model...")
     
     # Use Input layer to properly define input shape
     model = Sequential([
         Input(shape=input_shape),
-        Conv2D(filters=16, kernel_size=(3, 3), strides=(1, 1), 
+        Conv2D(filters=filters, kernel_size=(3, 3), strides=(1, 1), 
                padding='same', activation='relu'),
-        Conv2D(filters=16, kernel_size=(3, 3), strides=(1, 1), 
+        Conv2D(filters=filters, kernel_size=(3, 3), strides=(1, 1), 
                padding='same', activation='relu'),
         tf.keras.layers.MaxPooling2D(pool_size=(2, 2), strides=(1, 1), 
                                      padding='valid'),
-        Flatten(),
-        Dense(units=32, activation='relu', use_bias=True),
-        Dense(units=16, activation='relu', use_bias=True),
+        Flatten()
+    ] + [
+        Dense(units=units, activation='relu', use_bias=True) for units in dense_units
+    ] + [
         Dense(units=1, activation='sigmoid', use_bias=True)
     ])
     
+    compile_model(model, learning_rate=learning_rate)
+    
+    print("  ✅ Model created successfully!")
+    model.summary()
+    return model
+
+
+def compile_model(model, learning_rate=0.001):
+    """Compile a model with the training optimizer, loss and metrics."""
     model.compile(
-        optimizer=tf.keras.optimizers.Adam(),
+        optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
         loss=tf.keras.losses.BinaryCrossentropy(),
         metrics=['accuracy', 
                 tf.keras.metrics.Precision(), 
                 tf.keras.metrics.Recall()]
     )
-    
-    print("  ✅ Model created successfully!")
-    model.summary()
     return model
 
 
+def load_base_model(uri='models:/AuralGuard/latest', learning_rate=1e-4):
+    """Load a registered model to fine-tune, recompiled with a fresh optimizer.
+    
+    Args:
+        uri: Model registry URI (see utils.model_manager.parse_registry_uri)
+        learning_rate: Adam learning rate for fine-tuning
+    
+    Returns:
+        (model, version): the compiled model and its registered version
+    """
+    import mlflow.keras
+    from utils.model_manager import parse_registry_uri, resolve_registry_version
+    
+    print(f"  Loading base model {uri}...")
+    MLflowTracker()  # tracking URI and experiment
+    name, _ = parse_registry_uri(uri)
+    version = resolve_registry_version(uri)
+    model = mlflow.keras.load_model(f"models:/{name}/{version}")
+    compile_model(model, learning_rate=learning_rate)
+    print(f"  ✅ Loaded {name} version {version}")
+    return model, version
+
+
 # ============================================================================
 # STEP 5: Train Model
 # ============================================================================
 
-def train_model(data, epochs=10):
-    """Train the model."""
-    print("Step 4: Training model...")
+class EpochTimer(tf.keras.callbacks.Callback):
+    """Adds each epoch's wall time to the logs (and so to history) as epoch_seconds."""
+    
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = time.perf_counter()
+    
+    def on_epoch_end(self, epoch, logs=None):
+        if logs is not None:
+            logs['epoch_seconds'] = time.perf_counter() - self._start
+
+
+def train_model(train, validation, epochs=10, steps_per_epoch=None, validation_steps=None,
+                strategy=None, checkpointer=None, model_params=None, model_fn=None, callbacks=None):
+    """Train the model on pre-split train and validation datasets.
     
-    # Split data (70% train, 30% test)
-    data_list = list(data)
-    data_size = len(data_list)
-    train_size = int(data_size * 0.7)
+    steps_per_epoch is required when the training dataset repeats
+    indefinitely (class-balanced and multi-worker pipelines). With a
+    distribution strategy the model is built in its scope.
     
-    train = data.take(train_size)
-    test = data.skip(train_size)
+    With a TrainingCheckpointer, training resumes from its latest
+    checkpoint, and when early stopping is enabled the best weights are
+    restored at the end. model_params are passed to create_model();
+    model_fn, if given, returns the compiled model to train instead (e.g.
+    a registered model to fine-tune). callbacks are added after the
+    built-in ones.
+    """
+    print("Step 4: Training model...")
+    model_params = model_params or {}
+    if model_fn is None:
+        model_fn = lambda: create_model(input_shape=(128, 469, 1), **model_params)
     
-    print(f"  Training samples: {train_size}")
-    print(f"  Test samples: {data_size - train_size}")
+    if steps_per_epoch is None:
+        steps_per_epoch = int(train.cardinality())
+    print(f"  Training batches: {steps_per_epoch}")
+    if validation is not None:
+        print(f"  Validation batches: {validation_steps or int(validation.cardinality())}")
     
-    # Create model
-    model = create_model(input_shape=(128, 469, 1))
+    # Create model (and restore the latest checkpoint, if any)
+    initial_epoch = 0
+    if strategy is not None:
+        with strategy.scope():
+            model = model_fn()
+            if checkpointer is not None:
+                initial_epoch = checkpointer.restore(model)
+    else:
+        model = model_fn()
+        if checkpointer is not None:
+            initial_epoch = checkpointer.restore(model)
+    
+    callbacks = [EpochTimer()] + list(callbacks or [])
+    if checkpointer is not None:
+        callbacks.append(checkpointer)
+        if checkpointer.stopped_early:
+            print("  Previous run already stopped early; skipping training")
+            initial_epoch = epochs
     
     # Train
     print("  Starting training (this will take a while)...")
     print("  Epochs:", epochs)
-    history = model.fit(
-        train, 
-        validation_data=test, 
-        epochs=epochs,
-        verbose=1
-    )
+    if initial_epoch:
+        print(f"  Resuming at epoch {initial_epoch + 1}")
+    if strategy is not None:
+        history = fit_distributed(
+            model, strategy, train,
+            epochs=epochs,
+            steps_per_epoch=steps_per_epoch,
+            validation=validation,
+            validation_steps=validation_steps,
+            callbacks=callbacks,
+            initial_epoch=initial_epoch
+        )
+    else:
+        history = model.fit(
+            train, 
+            validation_data=validation, 
+            epochs=epochs,
+            initial_epoch=initial_epoch,
+            steps_per_epoch=steps_per_epoch,
+            validation_steps=validation_steps,
+            callbacks=callbacks,
+            verbose=1
+        )
     
-    # Evaluate
-    print("Step 5: Evaluating model...")
-    X_tests = []
-    y = []
-    for x_test, y_true in test.as_numpy_iterator():
-        X_tests.append(x_test)
-        y.append(y_true)
+    if checkpointer is not None:
+        checkpointer.wait()
+        # Include epochs trained before a resume
+        history.history = checkpointer.history()
+        if checkpointer.patience is not None:
+            checkpointer.restore_best(model)
     
-    X_tests = np.concatenate([X_tests[i][0:] for i in range(len(X_tests))], axis=0)
-    y_test = np.concatenate([y[i][0:] for i in range(len(y))], axis=0)
+    return model, history
+
+
+def evaluate_model(model, test):
+    """Evaluate on the test set batch by batch in constant memory.
     
-    test_results = model.evaluate(X_tests, y_test, return_dict=True, verbose=0)
+    Returns (test_results, evaluation_report).
+    """
+    print("Step 5: Evaluating model...")
+    evaluator = evaluate_streaming(model, test)
+    evaluation_report = evaluator.report()
+    test_results = evaluation_report['metrics']
     print("  Test Results:", test_results)
+    print("  Latency:", evaluation_report['latency'])
     
-    return model, history, test_results
+    return test_results, evaluation_report
+
+
+def throughput_summary(history, data_info):
+    """Training throughput from epoch times, excluding the first (tracing) epoch when possible."""
+    epoch_seconds = history.history.get('epoch_seconds', [])
+    steady = epoch_seconds[1:] or epoch_seconds
+    examples_per_epoch = data_info['steps_per_epoch'] * data_info['global_batch_size']
+    return {
+        'num_workers': data_info['num_workers'],
+        'batch_size': data_info['batch_size'],
+        'global_batch_size': data_info['global_batch_size'],
+        'steps_per_epoch': data_info['steps_per_epoch'],
+        'epoch_seconds': epoch_seconds,
+        'examples_per_second': examples_per_epoch * len(steady) / sum(steady) if steady else 0.0
+    }
 
 
 # ============================================================================
@@ -324,53 +667,300 @@ def save_model(model, model_path='models/auralguard_model.h5'):
 # MAIN EXECUTION
 # ============================================================================
 
-def main(epochs=10, skip_chunks=False):
-    """Main training pipeline."""
+def launch_distributed(num_workers, worker_argv, skip_chunks=False, workers=None,
+                       feature_store_dir='feature_store', feature_dtype='float32',
+                       test_fraction=0.3, seed=42):
+    """Run training as `num_workers` local worker processes.
     
-    # Step 1: Prepare audio chunks (if needed)
-    if not skip_chunks:
-        if not prepare_audio_chunks():
-            print("\n❌ Failed to prepare audio chunks. Exiting.")
-            return None
-    else:
-        print("Skipping chunk preparation (using existing chunks)...")
+    The chunk index and feature store are prepared once here, then every
+    worker starts from the shared manifest (with --skip-chunks).
+    
+    Returns the exit code of the workers.
+    """
+    chunk_index = prepare_chunk_index(workers=workers, rescan=not skip_chunks,
+                                      test_fraction=test_fraction, seed=seed)
+    if chunk_index is None:
+        print("\n❌ Failed to build chunk index. Exiting.")
+        return 1
+    if feature_store_dir:
+        FeatureStore(feature_store_dir, dtype=feature_dtype).featurize(chunk_index, workers=workers)
+    
+    print(f"Launching {num_workers} local training workers...")
+    return launch_local_workers(num_workers, [os.path.abspath(__file__)] + worker_argv + ['--skip-chunks'])
+
+
+def main(epochs=10, skip_chunks=False, workers=None,
+         feature_store_dir='feature_store', feature_dtype='float32',
+         test_fraction=0.3, seed=42, balance='interleave', real_fraction=0.5,
+         validation_fraction=0.0,
+         model_path='models/auralguard_model.h5', log_to_mlflow=True, summary_path=None,
+         checkpoint_dir='checkpoints', checkpoint_every_steps=None, keep_best=3,
+         patience=None, resume=True, batch_size=None, filters=16, dense_units=(32, 16),
+         learning_rate=0.001, incremental=False, base_model_uri='models:/AuralGuard/latest',
+         replay_ratio=1.0, mlflow_log_every_steps=None, profile_dir=None,
+         profile_start_step=3, profile_steps=10, profile_examples=64):
+    """Main training pipeline.
+    
+    When TF_CONFIG describes several workers, trains data-parallel with
+    MultiWorkerMirroredStrategy. Only the chief (worker 0) evaluates,
+    saves the model, writes checkpoints and logs to MLflow.
+    
+    Training checkpoints (model and optimizer state) go to a subdirectory
+    of checkpoint_dir named by the data version and a hash of the model and
+    training parameters, at the end of every epoch and optionally every
+    checkpoint_every_steps steps. An interrupted run with the same data and
+    parameters resumes from the latest one unless resume is False; once
+    the model is saved, the run's checkpoints are deleted.
+    
+    With validation_fraction, that fraction of the training source files is
+    held out for validation (val_loss); otherwise validation runs on the
+    test split. Early stopping (patience) picks the model by val_loss, so
+    it requires validation_fraction: the test metrics would otherwise be
+    measured on the split the model was selected on.
+    
+    With incremental, only source files added or changed since the last
+    recorded training run (see utils.dataset_manifest.record_training) are
+    featurized, and the registered model base_model_uri is fine-tuned with
+    learning_rate on them plus a replay sample of replay_ratio times as many
+    old training chunks. Without a recorded run or a registered model, it
+    falls back to full training.
+    
+    With log_to_mlflow, the chief creates the MLflow run before training
+    and streams per-epoch metrics (and batch metrics every
+    mlflow_log_every_steps steps) from a background thread; the model is
+    uploaded in the background while the run is finished.
+    
+    With profile_dir, the chief times each input pipeline stage on up to
+    profile_examples training examples before training, times every
+    training step and its input wait, and records a TF profiler trace of
+    profile_steps steps from step profile_start_step. The bottleneck
+    report (summary.json) and trace go to profile_dir/<timestamp>/ and to
+    the MLflow run under profile/.
+    """
+    if patience is not None and not validation_fraction > 0:
+        print("ERROR: --patience selects the model by val_loss; set --validation-fraction "
+              "so validation does not run on the test split")
+        return None
+    
+    cluster = cluster_from_env()
+    strategy = None
+    if cluster['num_workers'] > 1:
+        # Must be created before any other TensorFlow op runs
+        strategy = tf.distribute.MultiWorkerMirroredStrategy()
+        print(f"Worker {cluster['worker_index']} of {cluster['num_workers']}"
+              f"{' (chief)' if cluster['is_chief'] else ''}")
+        if not skip_chunks:
+            print("  Multi-worker training reuses the existing chunk manifest")
+            skip_chunks = True
+    
+    # Step 1: Index audio chunks (rescanning the dataset unless skipped)
+    chunk_index = prepare_chunk_index(workers=workers, rescan=not skip_chunks,
+                                      test_fraction=test_fraction, seed=seed)
+    if chunk_index is None:
+        print("\n❌ Failed to build chunk index. Exiting.")
+        return None
+    manifest = load_manifest(CHUNK_MANIFEST_PATH)
+    data_version = manifest_fingerprint(manifest)
+    previous_version = (manifest.get('last_training') or {}).get('fingerprint')
+    
+    model_fn = None
+    lineage = {'training_mode': 'full'}
+    if incremental:
+        new_paths = untrained_sources(manifest)
+        if new_paths is None:
+            print("  No previous training run recorded; running full training")
+        else:
+            print(f"  {len(new_paths)} source files new or changed since the last training run")
+            incremental_index, counts = select_incremental_chunks(chunk_index, new_paths,
+                                                                  replay_ratio=replay_ratio, seed=seed)
+            if incremental_index is None:
+                print("  No new training data since the last training run; nothing to do")
+                return None
+            try:
+                base_model, base_version = load_base_model(base_model_uri, learning_rate=learning_rate)
+            except Exception as e:
+                print(f"  ⚠️  Could not load {base_model_uri} ({e}); running full training")
+            else:
+                if strategy is not None:
+                    # Variables must be created in the strategy's scope
+                    weights = base_model.get_weights()
+                    def model_fn():
+                        model = tf.keras.models.clone_model(base_model)
+                        model.set_weights(weights)
+                        return compile_model(model, learning_rate=learning_rate)
+                else:
+                    model_fn = lambda: base_model
+                chunk_index = incremental_index
+                lineage = {'training_mode': 'incremental', 'base_model_uri': base_model_uri,
+                           'base_model_version': base_version, 'replay_ratio': replay_ratio, **counts}
+                print(f"  Fine-tuning on {counts['new_chunks']} new and "
+                      f"{counts['replay_chunks']} replayed chunks")
     
     # Step 2: Prepare dataset
-    data = prepare_dataset()
-    if data is None:
+    feature_store = None
+    if feature_store_dir:
+        feature_store = FeatureStore(feature_store_dir, dtype=feature_dtype)
+    datasets = prepare_dataset(chunk_index, feature_store=feature_store, workers=workers, seed=seed,
+                               balance=balance, real_fraction=real_fraction,
+                               num_workers=cluster['num_workers'],
+                               worker_index=cluster['worker_index'],
+                               batch_size=batch_size, validation_fraction=validation_fraction)
+    if datasets is None:
         print("\n❌ Failed to prepare dataset. Exiting.")
         return None
+    train, validation, test, data_info = datasets
     
-    # Step 3 & 4: Create and train model
-    model, history, test_results = train_model(data, epochs=epochs)
+    # Metrics stream to MLflow during training; the run is finished in Step 7
+    run_id = None
+    mlflow_logger = None
+    callbacks = []
+    if log_to_mlflow and cluster['is_chief']:
+        run_params = {
+            'epochs': epochs,
+            'batch_size': data_info['batch_size'],
+            'global_batch_size': data_info['global_batch_size'],
+            'num_workers': data_info['num_workers'],
+            'test_fraction': test_fraction,
+            'validation_fraction': validation_fraction,
+            'split_seed': seed,
+            'balance': balance,
+            'real_fraction': real_fraction,
+            'train_files': data_info['train_files'],
+            'validation_chunks': data_info['validation_chunks'],
+            'test_files': data_info['test_files'],
+            'input_shape': '(128, 469, 1)',
+            'optimizer': 'Adam',
+            'learning_rate': learning_rate,
+            'filters': filters,
+            'dense_units': ','.join(str(units) for units in dense_units),
+            'loss': 'BinaryCrossentropy',
+            'patience': patience,
+            **{key: value for key, value in lineage.items() if key != 'base_model_uri'}
+        }
+        run_tags = {
+            'model_type': 'CNN',
+            'task': 'audio_authenticity_detection',
+            # Data version lineage
+            'data_version': data_version,
+            'parent_data_version': previous_version or '',
+            **({'base_model_uri': lineage['base_model_uri']} if 'base_model_uri' in lineage else {})
+        }
+        tracker = MLflowTracker()
+        run_id = tracker.start_run(params=run_params, tags=run_tags)
+        if run_id:
+            mlflow_logger = AsyncMLflowLogger(run_id)
+            metrics_callback = MLflowMetricsCallback(mlflow_logger, batch_size=data_info['global_batch_size'],
+                                                     log_every_steps=mlflow_log_every_steps)
+            train = metrics_callback.wrap_dataset(train)
+            callbacks.append(metrics_callback)
+            print(f"  Streaming metrics to MLflow run {run_id}")
     
-    # Step 5: Save model
-    model_path = save_model(model)
+    profiler = None
+    if profile_dir and cluster['is_chief']:
+        profile_dir = os.path.join(profile_dir, time.strftime('%Y%m%d-%H%M%S'))
+        print(f"Profiling the input pipeline into {profile_dir}...")
+        train_chunks = shard_chunks([chunk for chunk in chunk_index if chunk['split'] == 'train'],
+                                    cluster['num_workers'], cluster['worker_index'])
+        stage_timings = profile_input_stages(
+            input_stage_datasets(train_chunks, data_info['global_batch_size'], feature_store,
+                                 seed=seed, balance=balance, real_fraction=real_fraction),
+            max_examples=profile_examples
+        )
+        profiler = StepProfiler(os.path.join(profile_dir, 'trace'),
+                                trace_start_step=profile_start_step, trace_steps=profile_steps)
+        train = profiler.wrap_dataset(train)
+        callbacks.append(profiler)
     
-    # Step 6: Log to MLflow (optional)
-    try:
-        print("Step 7: Logging to MLflow...")
-        tracker = MLflowTracker()
-        tracker.log_training_run(
-            model=model,
-            history=history,
-            test_metrics=test_results,
-            model_path=model_path,
-            params={
-                'epochs': epochs,
-                'batch_size': 16,
-                'input_shape': '(128, 469, 1)',
-                'optimizer': 'Adam',
-                'loss': 'BinaryCrossentropy'
-            },
-            tags={
-                'model_type': 'CNN',
-                'task': 'audio_authenticity_detection'
-            }
+    # Step 3 & 4: Create and train model
+    checkpointer = None
+    if checkpoint_dir:
+        # Only resume checkpoints of the same data, model and training setup
+        # (a full run's checkpoints must not be resumed into a fine-tune)
+        checkpoint_dir = run_directory(checkpoint_dir, data_version, {
+            'filters': filters, 'dense_units': list(dense_units), 'learning_rate': learning_rate,
+            'batch_size': data_info['global_batch_size'], 'num_workers': data_info['num_workers'],
+            'balance': balance, 'real_fraction': real_fraction, 'seed': seed,
+            'test_fraction': test_fraction, 'validation_fraction': validation_fraction,
+            'patience': patience, **lineage
+        })
+        checkpointer = TrainingCheckpointer(
+            checkpoint_dir,
+            save_every_steps=checkpoint_every_steps,
+            keep_best=keep_best,
+            monitor='val_loss' if validation is not None else 'loss',
+            patience=patience,
+            is_chief=cluster['is_chief']
         )
-        print("  ✅ Logged to MLflow successfully!")
-    except Exception as e:
-        print(f"  ⚠️  Warning: MLflow logging failed: {e}")
+        if not resume:
+            checkpointer.clear()
+    model, history = train_model(
+        train, validation, epochs=epochs,
+        steps_per_epoch=data_info['steps_per_epoch'],
+        validation_steps=data_info['validation_steps'],
+        strategy=strategy,
+        checkpointer=checkpointer,
+        model_params={'filters': filters, 'dense_units': dense_units, 'learning_rate': learning_rate},
+        model_fn=model_fn,
+        callbacks=callbacks
+    )
+    throughput = throughput_summary(history, data_info)
+    print(f"  Throughput: {throughput['examples_per_second']:.1f} examples/sec "
+          f"with {throughput['num_workers']} worker(s)")
+    
+    if profiler is not None:
+        report = bottleneck_report(stage_timings, profiler.summary(), data_info['global_batch_size'])
+        with open(os.path.join(profile_dir, 'summary.json'), 'w') as f:
+            json.dump(report, f, indent=2)
+        print(format_report(report))
+        print(f"  Profile written to {profile_dir} "
+              f"(trace: tensorboard --logdir {os.path.join(profile_dir, 'trace')})")
+        if mlflow_logger is not None:
+            mlflow_logger.log_metrics({f'profile_{name}': value for name, value in report['steps'].items()})
+            mlflow_logger.submit(mlflow_logger.client.log_artifacts, run_id, profile_dir, 'profile')
+    
+    if not cluster['is_chief']:
+        print(f"Worker {cluster['worker_index']} finished training")
+        return model, history, None
+    
+    # Step 5: Evaluate on the full test split
+    test_results, evaluation_report = evaluate_model(model, test)
+    
+    # Step 6: Save model
+    model_path = save_model(model, model_path)
+    if checkpointer is not None:
+        # The run is complete: a rerun must train again, not resume from it
+        checkpointer.clear()
+    
+    if summary_path:
+        with open(summary_path, 'w') as f:
+            json.dump({**throughput, 'epochs': epochs, 'test_metrics': test_results}, f, indent=2)
+    
+    # Step 7: Log to MLflow (optional)
+    if run_id:
+        try:
+            print("Step 7: Logging to MLflow...")
+            tracker.log_training_run(
+                model=model,
+                history=history,
+                test_metrics=test_results,
+                model_path=model_path,
+                evaluation_report=evaluation_report,
+                params=run_params,
+                tags=run_tags,
+                dicts={'data/manifest_sources.json': {
+                    path: {'sha256': entry['sha256'], 'label': entry['label'], 'split': entry['split']}
+                    for path, entry in manifest['sources'].items()
+                }},
+                run_id=run_id,
+                async_logger=mlflow_logger
+            )
+            print("  Uploading model to MLflow in the background...")
+        except Exception as e:
+            print(f"  ⚠️  Warning: MLflow logging failed: {e}")
+    
+    # Later incremental runs treat everything in this manifest as trained on
+    record_training(manifest, run_id=run_id, model_path=model_path, **lineage)
+    save_manifest(manifest, CHUNK_MANIFEST_PATH)
     
     print()
     print("=" * 60)
@@ -380,6 +970,13 @@ def main(epochs=10, skip_chunks=False):
     print("You can now deploy with: docker-compose up -d")
     print()
     
+    if mlflow_logger is not None:
+        mlflow_logger.close()
+        if mlflow_logger.errors:
+            print(f"  ⚠️  Warning: {mlflow_logger.errors} MLflow logging call(s) failed")
+        else:
+            print("  ✅ Logged to MLflow successfully!")
+    
     return model, history, test_results
 
 
@@ -390,7 +987,75 @@ if __name__ == '__main__':
     parser.add_argument('--epochs', type=int, default=10, 
                        help='Number of training epochs (default: 10)')
     parser.add_argument('--skip-chunks', action='store_true',
-                       help='Skip chunk creation if chunks already exist')
+                       help='Reuse the existing chunk manifest without rescanning the dataset')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Processes used for probing and featurizing (default: all CPU cores)')
+    parser.add_argument('--feature-store', type=str, default='feature_store',
+                       help='Directory of the persistent mel-spectrogram store')
+    parser.add_argument('--no-feature-store', action='store_true',
+                       help='Decode audio on the fly instead of using the feature store')
+    parser.add_argument('--feature-dtype', choices=['float32', 'float16'], default='float32',
+                       help='Storage precision of the feature store')
+    parser.add_argument('--test-fraction', type=float, default=0.3,
+                       help='Fraction of source files held out for testing (default: 0.3)')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Seed for the file-level split and shuffling (default: 42)')
+    parser.add_argument('--balance', choices=BALANCE_MODES, default='interleave',
+                       help='Class balancing of training batches (default: interleave)')
+    parser.add_argument('--real-fraction', type=float, default=0.5,
+                       help='Target fraction of real examples per training batch (default: 0.5)')
+    parser.add_argument('--distributed', type=int, default=1,
+                       help='Train data-parallel with this many local worker processes (default: 1)')
+    parser.add_argument('--model-path', type=str, default='models/auralguard_model.h5',
+                       help='Where to save the trained model')
+    parser.add_argument('--no-mlflow', action='store_true',
+                       help='Do not log the run to MLflow')
+    parser.add_argument('--mlflow-log-every-steps', type=int, default=None,
+                       help='Also stream batch loss and step time to MLflow every N steps')
+    parser.add_argument('--summary-output', type=str, default=None,
+                       help='Write throughput and test metrics as JSON to this path')
+    parser.add_argument('--checkpoint-dir', type=str, default='checkpoints',
+                       help='Directory for resumable training checkpoints')
+    parser.add_argument('--no-checkpoints', action='store_true',
+                       help='Do not write or resume from training checkpoints')
+    parser.add_argument('--checkpoint-every-steps', type=int, default=None,
+                       help='Also checkpoint every N training steps (default: epoch ends only)')
+    parser.add_argument('--keep-best', type=int, default=3,
+                       help='Number of best checkpoints (by val_loss) to keep (default: 3)')
+    parser.add_argument('--patience', type=int, default=None,
+                       help='Stop after N epochs without val_loss improvement and '
+                            'restore the best weights; requires --validation-fraction '
+                            '(default: no early stopping)')
+    parser.add_argument('--validation-fraction', type=float, default=0.0,
+                       help='Fraction of training source files held out for validation '
+                            '(default: 0 = validate on the test split)')
+    parser.add_argument('--no-resume', action='store_true',
+                       help='Delete existing checkpoints and train from scratch')
+    parser.add_argument('--batch-size', type=int, default=None,
+                       help='Per-worker batch size (default: chosen from the dataset size)')
+    parser.add_argument('--filters', type=int, default=16,
+                       help='Filters per Conv2D layer (default: 16)')
+    parser.add_argument('--dense-units', type=int, nargs='+', default=[32, 16],
+                       help='Units of the hidden Dense layers (default: 32 16)')
+    parser.add_argument('--learning-rate', type=float, default=None,
+                       help='Adam learning rate (default: 0.001, or 0.0001 with --incremental)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Fine-tune the registered model on data added since the last run')
+    parser.add_argument('--base-model', type=str, default='models:/AuralGuard/latest',
+                       help='Registered model to fine-tune with --incremental '
+                            '(default: models:/AuralGuard/latest)')
+    parser.add_argument('--replay-ratio', type=float, default=1.0,
+                       help='Old training chunks replayed per new chunk with --incremental (default: 1.0)')
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile input pipeline stages and training steps, and report the bottleneck')
+    parser.add_argument('--profile-dir', type=str, default='profiles',
+                       help='Directory for profiling reports and traces (default: profiles)')
+    parser.add_argument('--profile-start', type=int, default=3,
+                       help='Training step at which the TF profiler trace starts (default: 3)')
+    parser.add_argument('--profile-steps', type=int, default=10,
+                       help='Training steps captured in the TF profiler trace (default: 10)')
+    parser.add_argument('--profile-examples', type=int, default=64,
+                       help='Examples timed per input pipeline stage (default: 64)')
     
     args = parser.parse_args()
     
@@ -399,5 +1064,59 @@ if __name__ == '__main__':
     print(f"  Skip chunks: {args.skip_chunks}")
     print()
     
-    main(epochs=args.epochs, skip_chunks=args.skip_chunks)
-
+    feature_store_dir = None if args.no_feature_store else args.feature_store
+    
+    if args.distributed > 1 and 'TF_CONFIG' not in os.environ:
+        # Workers get the same arguments minus --distributed
+        worker_argv = []
+        skip_next = False
+        for arg in sys.argv[1:]:
+            if skip_next:
+                skip_next = False
+            elif arg == '--distributed':
+                skip_next = True
+            elif not arg.startswith('--distributed='):
+                worker_argv.append(arg)
+        sys.exit(launch_distributed(
+            args.distributed,
+            worker_argv,
+            skip_chunks=args.skip_chunks,
+            workers=args.workers,
+            feature_store_dir=feature_store_dir,
+            feature_dtype=args.feature_dtype,
+            test_fraction=args.test_fraction,
+            seed=args.seed
+        ))
+    
+    main(
+        epochs=args.epochs,
+        skip_chunks=args.skip_chunks,
+        workers=args.workers,
+        feature_store_dir=feature_store_dir,
+        feature_dtype=args.feature_dtype,
+        test_fraction=args.test_fraction,
+        seed=args.seed,
+        balance=args.balance,
+        real_fraction=args.real_fraction,
+        validation_fraction=args.validation_fraction,
+        model_path=args.model_path,
+        log_to_mlflow=not args.no_mlflow,
+        summary_path=args.summary_output,
+        checkpoint_dir=None if args.no_checkpoints else args.checkpoint_dir,
+        checkpoint_every_steps=args.checkpoint_every_steps,
+        keep_best=args.keep_best,
+        patience=args.patience,
+        resume=not args.no_resume,
+        batch_size=args.batch_size,
+        filters=args.filters,
+        dense_units=tuple(args.dense_units),
+        learning_rate=args.learning_rate or (1e-4 if args.incremental else 0.001),
+        incremental=args.incremental,
+        base_model_uri=args.base_model,
+        replay_ratio=args.replay_ratio,
+        mlflow_log_every_steps=args.mlflow_log_every_steps,
+        profile_dir=args.profile_dir if args.profile else None,
+        profile_start_step=args.profile_start,
+        profile_steps=args.profile_steps,
+        profile_examples=args.profile_examples
+    )
@@ -0,0 +1,64 @@
+"""
+Export a trained model as a memory-mappable serving artifact.
+
+The artifact (manifest.json + weights.bin) can be used anywhere a model path
+is accepted, e.g. MODEL_PATH=models/auralguard_serving python api/app.py
+
+Usage:
+    python export_serving_model.py models/auralguard_model.h5 models/auralguard_serving
+    python export_serving_model.py models/auralguard_model.h5 models/auralguard_serving --version v3
+"""
+
+import argparse
+import os
+import sys
+
+# Add utils to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.model_loader import load_model
+from utils.weight_store import export_serving_weights, load_serving_weights
+
+
+def export_serving_model(model_path, output_dir, model_version=None, with_frontend=False):
+    """
+    Load a saved model and export it as a serving artifact.
+    
+    Args:
+        model_path: Path to the saved Keras model (h5 or SavedModel)
+        output_dir: Directory to write the artifact into
+        model_version: Optional version label (defaults to checksum prefix)
+        with_frontend: Bake the TF mel-spectrogram frontend into the model so
+                       it takes raw 16kHz waveforms
+    
+    Returns:
+        manifest: Manifest of the exported artifact
+    """
+    model = load_model(model_path)
+    if with_frontend:
+        from utils.tf_mel import build_waveform_model
+        model = build_waveform_model(model)
+    manifest = export_serving_weights(model, output_dir, model_version=model_version)
+    
+    # Round-trip check: the artifact must load and match the checksum
+    load_serving_weights(output_dir, verify_checksum=True)
+    
+    print(f"✅ Exported {model_path} to {output_dir}")
+    print(f"  Model version: {manifest['model_version']}")
+    print(f"  Checksum: {manifest['checksum']}")
+    print(f"  Tensors: {len(manifest['tensors'])} ({manifest['total_bytes'] / (1024 * 1024):.1f} MB)")
+    return manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export AuralGuard serving weights')
+    parser.add_argument('model_path', type=str, help='Saved model to export')
+    parser.add_argument('output_dir', type=str, help='Artifact output directory')
+    parser.add_argument('--version', type=str, default=None,
+                        help='Model version label stored in the manifest')
+    parser.add_argument('--with-frontend', action='store_true',
+                        help='Include the in-graph mel frontend (model takes waveforms)')
+    
+    args = parser.parse_args()
+    export_serving_model(args.model_path, args.output_dir, model_version=args.version,
+                         with_frontend=args.with_frontend)
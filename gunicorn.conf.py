@@ -0,0 +1,82 @@
+"""
+Gunicorn configuration for serving the AuralGuard API with several workers.
+
+Usage:
+    gunicorn -c gunicorn.conf.py api.app:app
+
+Environment: PORT (default 5000), WEB_CONCURRENCY (workers, default 2),
+GUNICORN_THREADS (per worker, default 16), GUNICORN_TIMEOUT (seconds,
+default 120) and PROMETHEUS_MULTIPROC_DIR (metrics files shared by the
+workers; a fresh temporary directory, removed on exit, if unset).
+
+Keep GUNICORN_THREADS above PREDICT_MAX_CONCURRENCY plus the admission
+queue limits, so that excess requests reach admission control and get a
+fast 429 instead of waiting inside gunicorn.
+"""
+
+import glob
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(PROJECT_ROOT)
+
+# Must be set before any worker imports prometheus_client. A directory the
+# operator set is theirs: only prometheus_client's files in it are ever deleted.
+created_metrics_dir = None
+if not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+    created_metrics_dir = tempfile.mkdtemp(prefix='auralguard_metrics_')
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = created_metrics_dir
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '16'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+
+# Files prometheus_client writes in multiprocess mode, e.g. counter_123.db
+# or gauge_livesum_123.db
+METRICS_FILE = re.compile(r'^(counter|gauge_[a-z]+|histogram|summary)_\d+\.db$')
+
+
+def on_starting(server):
+    """
+    Delete metrics files left by a previous run (they would be aggregated too).
+
+    Other .db files are left alone, but refuse to start while there are
+    any: /metrics reads every .db file in the directory.
+    """
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    os.makedirs(directory, exist_ok=True)
+    foreign = []
+    for path in glob.glob(os.path.join(directory, '*.db')):
+        if METRICS_FILE.match(os.path.basename(path)):
+            os.remove(path)
+        else:
+            foreign.append(os.path.basename(path))
+    if foreign:
+        raise RuntimeError(f"PROMETHEUS_MULTIPROC_DIR={directory} contains files that are not "
+                           f"Prometheus metrics ({', '.join(sorted(foreign))}); "
+                           f"use a directory of its own")
+
+
+def on_exit(server):
+    """Remove the metrics directory if this config created it."""
+    if created_metrics_dir:
+        shutil.rmtree(created_metrics_dir, ignore_errors=True)
+
+
+def post_fork(server, worker):
+    """Connect the database and load the models in each worker."""
+    from api.app import startup
+
+    startup()
+
+
+def child_exit(server, worker):
+    """Drop an exited worker's in-flight and queue-depth gauges."""
+    from utils.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
@@ -0,0 +1,285 @@
+"""
+Parallel hyperparameter sweep for the AuralGuard CNN.
+
+Samples configurations from a search space (Conv2D filters, Dense units,
+batch size, learning rate by default; see utils.sweep) and trains them in
+parallel worker processes. Spectrograms are computed once into the feature
+store before the sweep, and every trial streams from the same shards.
+Trials are validated on source files held out from the training split
+(--validation-fraction), never on the test split. Trials whose validation
+loss falls behind the median of the other trials are pruned after each
+epoch.
+
+With MLflow enabled, the sweep is a parent run and every trial a nested
+run under it; the parent run gets the best configuration and a table of
+all trials.
+
+Usage:
+    python hyperparameter_sweep.py --trials 12 --parallel 4 --epochs 5 --skip-chunks
+    python hyperparameter_sweep.py --space space.json --output sweep.json
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(PROJECT_ROOT)
+
+from utils.sweep import DEFAULT_SEARCH_SPACE, MedianPruner, PruningCallback, sample_trials  # noqa: E402
+
+MODEL_PARAMS = ('filters', 'dense_units', 'learning_rate')
+DATA_PARAMS = ('batch_size', 'balance', 'real_fraction')
+
+
+def _init_worker(threads):
+    """Process-pool initializer: limit TensorFlow threads so trials share the CPU."""
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(max(1, min(threads, 2)))
+
+
+def run_trial(trial_id, params, config):
+    """
+    Process-pool worker: train one configuration.
+
+    Output goes to <log_dir>/trial-<id>.log. Exceptions are reported as a
+    failed trial rather than raised, so one bad configuration does not stop
+    the sweep.
+
+    Returns:
+        Trial result dict (params, status, best objective value, history)
+    """
+    os.makedirs(config['log_dir'], exist_ok=True)
+    log_path = os.path.join(config['log_dir'], f"trial-{trial_id}.log")
+    result = {'trial': trial_id, 'params': params, 'status': 'failed', 'value': None,
+              'epochs': 0, 'seconds': 0.0, 'history': {}, 'log': log_path}
+    start = time.perf_counter()
+
+    with open(log_path, 'w') as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            import tensorflow as tf
+            import complete_training as training
+            from utils.chunk_index import build_chunk_index
+            from utils.dataset_manifest import load_manifest
+            from utils.feature_store import FeatureStore
+
+            tf.keras.utils.set_random_seed(config['seed'] + trial_id)
+            chunk_index = build_chunk_index(load_manifest(config['manifest_path'])['sources'].values())
+            feature_store = FeatureStore(config['feature_store_dir'], dtype=config['feature_dtype'])
+            data_params = {name: params[name] for name in DATA_PARAMS if name in params}
+            data_params.setdefault('balance', config['balance'])
+            datasets = training.prepare_dataset(chunk_index, feature_store=feature_store,
+                                                seed=config['seed'],
+                                                validation_fraction=config['validation_fraction'],
+                                                **data_params)
+            if datasets is None:
+                raise RuntimeError("Could not prepare the dataset")
+            train, validation, _, data_info = datasets
+
+            model = training.create_model(
+                input_shape=(128, 469, 1),
+                **{name: tuple(params[name]) if name == 'dense_units' else params[name]
+                   for name in MODEL_PARAMS if name in params}
+            )
+            pruner = MedianPruner(config['pruning_dir'], warmup_epochs=config['warmup_epochs'],
+                                  min_trials=config['min_trials'], mode=config['mode'])
+            pruning = PruningCallback(pruner, trial_id, monitor=config['objective'])
+            history = model.fit(
+                train,
+                validation_data=validation,
+                epochs=config['epochs'],
+                steps_per_epoch=data_info['steps_per_epoch'],
+                callbacks=[training.EpochTimer(), pruning],
+                verbose=2
+            )
+
+            values = history.history.get(config['objective'])
+            if not values:
+                raise RuntimeError(f"Objective {config['objective']} was not logged")
+            result['history'] = {name: [float(v) for v in series]
+                                 for name, series in history.history.items()}
+            result['value'] = min(values) if config['mode'] == 'min' else max(values)
+            result['epochs'] = len(values)
+            result['status'] = 'pruned' if pruning.pruned else 'completed'
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            result['error'] = str(e)
+        result['seconds'] = time.perf_counter() - start
+
+        if config['parent_run_id']:
+            from mlflow_tracking import MLflowTracker
+            MLflowTracker().log_sweep_trial(
+                config['parent_run_id'], trial_id, params, result['history'], result['status'],
+                config['objective'], value=result['value'],
+                metrics={'trial_seconds': result['seconds'], 'epochs_run': result['epochs']}
+            )
+    return result
+
+
+def summarize(trials, objective, mode):
+    """Sweep summary with trials ranked by objective (failed trials last)."""
+    finished = [trial for trial in trials if trial['value'] is not None]
+    ranked = sorted(finished, key=lambda trial: trial['value'], reverse=mode == 'max')
+    ranked += [trial for trial in trials if trial['value'] is None]
+    return {
+        'objective': objective,
+        'mode': mode,
+        'best': ranked[0] if finished else None,
+        'trials': ranked
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel hyperparameter sweep with median pruning')
+    parser.add_argument('--trials', type=int, default=8,
+                        help='Number of configurations to try (default: 8)')
+    parser.add_argument('--parallel', type=int, default=min(4, os.cpu_count() or 1),
+                        help='Trials trained at the same time (default: min(4, CPU cores))')
+    parser.add_argument('--epochs', type=int, default=5,
+                        help='Maximum epochs per trial (default: 5)')
+    parser.add_argument('--space', type=str, default=None,
+                        help='JSON search space (default: filters, dense units, batch size, learning rate)')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='Sampling, split and weight-initialization seed (default: 42)')
+    parser.add_argument('--objective', type=str, default='val_loss',
+                        help='Metric used for pruning and ranking (default: val_loss)')
+    parser.add_argument('--mode', choices=('min', 'max'), default='min',
+                        help='Whether the objective is minimized or maximized (default: min)')
+    parser.add_argument('--warmup-epochs', type=int, default=1,
+                        help='Epochs before a trial can be pruned (default: 1)')
+    parser.add_argument('--min-trials', type=int, default=2,
+                        help='Other trials needed at an epoch before pruning there (default: 2)')
+    parser.add_argument('--skip-chunks', action='store_true',
+                        help='Use the existing chunk manifest without rescanning the dataset')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for indexing and featurizing (default: all CPU cores)')
+    parser.add_argument('--feature-store', type=str, default='feature_store',
+                        help='Directory of the precomputed spectrogram cache (default: feature_store)')
+    parser.add_argument('--feature-dtype', choices=('float32', 'float16'), default='float32',
+                        help='Storage dtype of cached spectrograms (default: float32)')
+    parser.add_argument('--test-fraction', type=float, default=0.3,
+                        help='Fraction of source files in the test split, which the sweep never uses (default: 0.3)')
+    parser.add_argument('--validation-fraction', type=float, default=0.2,
+                        help='Fraction of training source files held out for validation (default: 0.2)')
+    parser.add_argument('--balance', choices=('interleave', 'rejection', 'none'), default='interleave',
+                        help='Class balancing of training batches unless in the space (default: interleave)')
+    parser.add_argument('--log-dir', type=str, default='sweep_logs',
+                        help='Directory for per-trial logs (default: sweep_logs)')
+    parser.add_argument('--no-mlflow', action='store_true',
+                        help='Do not log the sweep to MLflow')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Write the sweep results as JSON to this path')
+    args = parser.parse_args()
+
+    import complete_training as training
+    from utils.feature_store import FeatureStore
+
+    space = DEFAULT_SEARCH_SPACE
+    if args.space:
+        with open(args.space) as f:
+            space = json.load(f)
+    if not 0 < args.validation_fraction < 1:
+        print("ERROR: --validation-fraction must be between 0 and 1")
+        return 1
+    unknown = set(space) - set(MODEL_PARAMS) - set(DATA_PARAMS)
+    if unknown:
+        print(f"ERROR: Unsupported search space parameters: {', '.join(sorted(unknown))}")
+        return 1
+
+    # Index and featurize once; every trial streams from the same cache
+    chunk_index = training.prepare_chunk_index(workers=args.workers, rescan=not args.skip_chunks,
+                                               test_fraction=args.test_fraction, seed=args.seed)
+    if chunk_index is None:
+        print("\n❌ Failed to build chunk index. Exiting.")
+        return 1
+    FeatureStore(args.feature_store, dtype=args.feature_dtype).featurize(chunk_index, workers=args.workers)
+
+    trials = sample_trials(space, args.trials, seed=args.seed)
+    parallel = max(1, min(args.parallel, len(trials)))
+    threads = max(1, (os.cpu_count() or 1) // parallel)
+
+    parent_run_id = None
+    tracker = None
+    if not args.no_mlflow:
+        from mlflow_tracking import MLflowTracker
+        tracker = MLflowTracker()
+        parent_run_id = tracker.start_sweep_run(
+            params={'trials': len(trials), 'parallel': parallel, 'max_epochs': args.epochs,
+                    'objective': args.objective, 'mode': args.mode, 'seed': args.seed,
+                    'warmup_epochs': args.warmup_epochs, 'min_trials': args.min_trials,
+                    'validation_fraction': args.validation_fraction,
+                    'search_space': json.dumps(space, sort_keys=True)}
+        )
+
+    print(f"Running {len(trials)} trials, {parallel} at a time ({threads} threads each)...")
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix='auralguard_sweep_') as pruning_dir:
+            config = {
+                'manifest_path': os.path.abspath(training.CHUNK_MANIFEST_PATH),
+                'feature_store_dir': os.path.abspath(args.feature_store),
+                'feature_dtype': args.feature_dtype,
+                'balance': args.balance,
+                'validation_fraction': args.validation_fraction,
+                'seed': args.seed,
+                'epochs': args.epochs,
+                'objective': args.objective,
+                'mode': args.mode,
+                'warmup_epochs': args.warmup_epochs,
+                'min_trials': args.min_trials,
+                'pruning_dir': pruning_dir,
+                'log_dir': os.path.abspath(args.log_dir),
+                'parent_run_id': parent_run_id
+            }
+            # TensorFlow is not fork-safe
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=parallel, mp_context=context,
+                                     initializer=_init_worker, initargs=(threads,)) as executor:
+                futures = [executor.submit(run_trial, trial_id, params, config)
+                           for trial_id, params in enumerate(trials)]
+                for future in as_completed(futures):
+                    result = future.result()
+                    value = f"{result['value']:.4f}" if result['value'] is not None else '-'
+                    print(f"  Trial {result['trial']}: {result['status']} after {result['epochs']} epoch(s), "
+                          f"{args.objective}={value} ({result['seconds']:.0f}s)")
+                    results.append(result)
+    except BaseException:
+        if tracker is not None and parent_run_id:
+            tracker.finish_sweep_run(parent_run_id, status='FAILED')
+        raise
+
+    summary = summarize(results, args.objective, args.mode)
+    if tracker is not None and parent_run_id:
+        tracker.finish_sweep_run(parent_run_id, summary)
+
+    print("=" * 60)
+    print("AuralGuard Hyperparameter Sweep")
+    print("=" * 60)
+    names = sorted(space)
+    print(f"{'trial':>5s} {'status':>9s} {'epochs':>6s} {args.objective:>10s}  " + "  ".join(names))
+    for trial in summary['trials']:
+        value = f"{trial['value']:.4f}" if trial['value'] is not None else '-'
+        print(f"{trial['trial']:5d} {trial['status']:>9s} {trial['epochs']:6d} {value:>10s}  "
+              + "  ".join(str(trial['params'].get(name)) for name in names))
+    if summary['best']:
+        print(f"Best: trial {summary['best']['trial']} with {args.objective}="
+              f"{summary['best']['value']:.4f}: {summary['best']['params']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0 if summary['best'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -17,7 +17,6 @@ REQUIRED_PACKAGES = {
     'librosa': 'librosa>=0.10.0',
     'soundfile': 'soundfile>=0.12.0',
     'tensorflow': 'tensorflow>=2.13.0',
-    'tensorflow_io': 'tensorflow-io>=0.31.0',
     'keras': 'keras>=2.13.0',
     'flask': 'flask>=2.3.0',
     'werkzeug': 'werkzeug>=2.3.0',
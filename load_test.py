@@ -0,0 +1,402 @@
+"""
+Load test for the AuralGuard API.
+Sends synthetic audio clips (configurable formats and durations) to
+/predict, either with a fixed number of concurrent clients (closed loop) or
+at a fixed arrival rate (open loop), over pooled keep-alive connections, and
+reports throughput, latency percentiles, error rates and the server-side
+stage breakdown from the Server-Timing header.
+
+In open-loop mode latency is measured from each request's scheduled send
+time, so a server that falls behind shows up as queueing delay instead of
+silently lowering the offered rate.
+
+With --start-server, the API is started locally with MONGODB_URI=memory://
+(predictions are logged to an in-memory stand-in instead of MongoDB).
+
+Usage:
+    python load_test.py --start-server --model-path models/auralguard_model.h5 --concurrency 4 --duration 30
+    python load_test.py --url http://localhost:5000 --rate 5 --duration 60 --formats wav flac mp3
+    python load_test.py --start-server --rate 2 --max-p99-ms 300 --output load_test.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(PROJECT_ROOT)
+
+from utils.audio_processor import AUDIO_FORMATS, synthesize_audio_bytes  # noqa: E402
+
+MIME_TYPES = {'wav': 'audio/wav', 'flac': 'audio/flac', 'mp3': 'audio/mpeg', 'ogg': 'audio/ogg'}
+
+
+def synthesize_payloads(formats, durations, sample_rate=16000, variants=4, seed=0):
+    """
+    Synthesize the clips to send, `variants` per format and duration.
+
+    Returns:
+        List of dicts with format, duration, filename and audio bytes
+    """
+    rng = np.random.default_rng(seed)
+    payloads = []
+    for audio_format in formats:
+        for duration in durations:
+            for variant in range(variants):
+                payloads.append({
+                    'format': audio_format,
+                    'duration': duration,
+                    'filename': f"load_{duration:g}s_{variant}.{audio_format}",
+                    'data': synthesize_audio_bytes(audio_format, duration=duration, sample_rate=sample_rate,
+                                                   seed=int(rng.integers(1 << 31)),
+                                                   frequency=float(rng.uniform(200.0, 600.0)), noise=0.1)
+                })
+    return payloads
+
+
+def parse_server_timing(header):
+    """Stage durations in ms from a Server-Timing header ('name;dur=1.2, ...')."""
+    stages = {}
+    for entry in (header or '').split(','):
+        name, _, params = entry.strip().partition(';')
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'dur' and name:
+                try:
+                    stages[name] = float(value)
+                except ValueError:
+                    pass
+    return stages
+
+
+class LoadClient:
+    """Sends /predict requests over a pooled, keep-alive HTTP session per thread."""
+
+    def __init__(self, url, endpoint='/predict', pool_size=10, timeout=60.0, priority=None, deadline_ms=None):
+        self.url = url.rstrip('/') + endpoint
+        self.pool_size = pool_size
+        self.timeout = timeout
+        # Admission-control lane and time budget sent with every request
+        self.headers = {}
+        if priority:
+            self.headers['X-Request-Priority'] = priority
+        if deadline_ms:
+            self.headers['X-Request-Deadline-Ms'] = f"{deadline_ms:g}"
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+        return session
+
+    def send(self, payload, scheduled=None):
+        """
+        Send one clip.
+
+        Args:
+            payload: Entry from synthesize_payloads()
+            scheduled: perf_counter() time the request was due (open loop);
+                       latency is measured from it
+
+        Returns:
+            Result dict with status, latency_ms, format, duration and server stages
+        """
+        start = time.perf_counter()
+        files = {'audio': (payload['filename'], payload['data'], MIME_TYPES[payload['format']])}
+        result = {'format': payload['format'], 'duration': payload['duration'], 'stages': {}}
+        try:
+            response = self._session().post(self.url, files=files, headers=self.headers, timeout=self.timeout)
+            result['status'] = response.status_code
+            result['stages'] = parse_server_timing(response.headers.get('Server-Timing'))
+        except requests.RequestException as e:
+            result['status'] = 'error'
+            result['error'] = type(e).__name__
+        end = time.perf_counter()
+        result['latency_ms'] = (end - (scheduled if scheduled is not None else start)) * 1000
+        result['service_ms'] = (end - start) * 1000
+        result['finished'] = end
+        return result
+
+
+def run_closed_loop(client, payloads, concurrency, duration=None, requests_total=None):
+    """
+    Keep `concurrency` requests in flight until the duration or request count is reached.
+
+    Returns:
+        List of per-request results
+    """
+    results = []
+    lock = threading.Lock()
+    counter = iter(range(requests_total) if requests_total else iter(int, 1))
+    deadline = time.perf_counter() + duration if duration else None
+
+    def worker(worker_id):
+        rng = np.random.default_rng(worker_id)
+        while deadline is None or time.perf_counter() < deadline:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            result = client.send(payloads[int(rng.integers(len(payloads)))])
+            with lock:
+                results.append(result)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    return results
+
+
+def run_open_loop(client, payloads, rate, duration=None, requests_total=None, max_in_flight=64,
+                  poisson=True, seed=0):
+    """
+    Send requests at `rate` per second (Poisson or evenly spaced arrivals).
+
+    At most max_in_flight requests are outstanding; arrivals beyond that wait
+    for a free client thread, and the wait counts towards their latency.
+
+    Returns:
+        List of per-request results
+    """
+    rng = np.random.default_rng(seed)
+    requests_total = requests_total or int(np.ceil(rate * duration))
+    gaps = rng.exponential(1.0 / rate, requests_total) if poisson else np.full(requests_total, 1.0 / rate)
+    start = time.perf_counter()
+    schedule = start + np.cumsum(gaps) - gaps[0]
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for due in schedule:
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            payload = payloads[int(rng.integers(len(payloads)))]
+            futures.append(executor.submit(client.send, payload, scheduled=due))
+    return [future.result() for future in futures]
+
+
+def _percentiles(values):
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return {}
+    return {
+        'mean': float(values.mean()),
+        'p50': float(np.percentile(values, 50)),
+        'p95': float(np.percentile(values, 95)),
+        'p99': float(np.percentile(values, 99)),
+        'max': float(values.max())
+    }
+
+
+def summarize(results, elapsed, server_cores=None):
+    """
+    Throughput, latency percentiles, error rates and stage breakdown.
+
+    Args:
+        results: Per-request results
+        elapsed: Wall time of the test in seconds
+        server_cores: CPU cores of the server, for requests/sec per core
+
+    Returns:
+        Summary dict (overall and per format/duration)
+    """
+    ok = [result for result in results if result['status'] == 200]
+    statuses = {}
+    for result in results:
+        statuses[str(result['status'])] = statuses.get(str(result['status']), 0) + 1
+    stage_names = sorted({name for result in ok for name in result['stages']})
+    summary = {
+        'requests': len(results),
+        'succeeded': len(ok),
+        'error_rate': 1.0 - len(ok) / len(results) if results else 0.0,
+        'statuses': statuses,
+        'seconds': elapsed,
+        'throughput_rps': len(ok) / elapsed if elapsed else 0.0,
+        'latency_ms': _percentiles([result['latency_ms'] for result in ok]),
+        'server_stages_ms': {name: _percentiles([result['stages'][name] for result in ok
+                                                 if name in result['stages']])
+                             for name in stage_names}
+    }
+    if server_cores:
+        summary['server_cores'] = server_cores
+        summary['throughput_rps_per_core'] = summary['throughput_rps'] / server_cores
+
+    groups = {}
+    for result in results:
+        groups.setdefault(f"{result['format']}/{result['duration']:g}s", []).append(result)
+    summary['by_payload'] = {
+        key: {
+            'requests': len(group),
+            'error_rate': sum(1 for result in group if result['status'] != 200) / len(group),
+            'latency_ms': _percentiles([result['latency_ms'] for result in group if result['status'] == 200])
+        }
+        for key, group in sorted(groups.items())
+    }
+    return summary
+
+
+def start_server(port, model_path=None, ready_timeout=300.0, log_path='load_test_server.log'):
+    """
+    Start api/app.py locally with the in-memory prediction logger and wait until it is ready.
+
+    Returns:
+        The server process
+    """
+    env = {**os.environ, 'PORT': str(port), 'MONGODB_URI': 'memory://', 'FLASK_DEBUG': 'False'}
+    if model_path:
+        env['MODEL_PATH'] = os.path.abspath(model_path)
+    log = open(log_path, 'w')
+    process = subprocess.Popen([sys.executable, os.path.join(PROJECT_ROOT, 'api', 'app.py')],
+                               cwd=PROJECT_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + ready_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited with status {process.returncode}, see {log_path}")
+        try:
+            if requests.get(f"http://localhost:{port}/health/ready", timeout=2).status_code == 200:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"API server was not ready after {ready_timeout:.0f}s, see {log_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the AuralGuard /predict endpoint')
+    parser.add_argument('--url', type=str, default=os.getenv('API_URL', 'http://localhost:5000'),
+                        help='API base URL (default: API_URL or http://localhost:5000)')
+    parser.add_argument('--endpoint', type=str, default='/predict',
+                        help='Endpoint accepting an "audio" file upload (default: /predict)')
+    parser.add_argument('--start-server', action='store_true',
+                        help='Start the API locally with an in-memory database for the test')
+    parser.add_argument('--port', type=int, default=5055,
+                        help='Port for --start-server (default: 5055)')
+    parser.add_argument('--model-path', type=str, default=None,
+                        help='MODEL_PATH for --start-server (default: the API default)')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--concurrency', type=int, default=None,
+                      help='Closed loop: requests kept in flight (default mode, 4)')
+    mode.add_argument('--rate', type=float, default=None,
+                      help='Open loop: arrivals per second')
+    parser.add_argument('--constant-arrivals', action='store_true',
+                        help='Evenly spaced arrivals with --rate (default: Poisson)')
+    parser.add_argument('--max-in-flight', type=int, default=64,
+                        help='Outstanding request limit with --rate (default: 64)')
+    parser.add_argument('--duration', type=float, default=30.0,
+                        help='Test length in seconds (default: 30)')
+    parser.add_argument('--requests', type=int, default=None,
+                        help='Send this many requests instead of running for --duration')
+    parser.add_argument('--warmup-requests', type=int, default=2,
+                        help='Requests sent before measuring (default: 2)')
+    parser.add_argument('--formats', nargs='+', choices=sorted(AUDIO_FORMATS), default=['wav'],
+                        help='Audio formats to send (default: wav)')
+    parser.add_argument('--durations', type=float, nargs='+', default=[15.0],
+                        help='Clip lengths in seconds (default: 15)')
+    parser.add_argument('--sample-rate', type=int, default=16000,
+                        help='Sample rate of the synthetic clips (default: 16000)')
+    parser.add_argument('--server-cores', type=int, default=None,
+                        help='Server CPU cores for requests/sec per core (default: local cores with --start-server)')
+    parser.add_argument('--priority', choices=('interactive', 'batch'), default=None,
+                        help='Admission lane to request (default: none, i.e. the server default, batch)')
+    parser.add_argument('--deadline-ms', type=float, default=None,
+                        help='Per-request time budget sent as X-Request-Deadline-Ms')
+    parser.add_argument('--max-p99-ms', type=float, default=None,
+                        help='Exit with status 1 if p99 latency is above this')
+    parser.add_argument('--max-error-rate', type=float, default=None,
+                        help='Exit with status 1 if the error rate is above this')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Write the summary as JSON to this path')
+    args = parser.parse_args()
+
+    print("Synthesizing payloads...")
+    payloads = synthesize_payloads(args.formats, args.durations, sample_rate=args.sample_rate)
+
+    server = None
+    url = args.url
+    server_cores = args.server_cores
+    if args.start_server:
+        print(f"Starting the API on port {args.port} (MONGODB_URI=memory://)...")
+        server = start_server(args.port, args.model_path)
+        url = f"http://localhost:{args.port}"
+        server_cores = server_cores or os.cpu_count()
+
+    try:
+        concurrency = args.concurrency or 4
+        client = LoadClient(url, endpoint=args.endpoint,
+                            pool_size=args.max_in_flight if args.rate else concurrency,
+                            priority=args.priority, deadline_ms=args.deadline_ms)
+        for payload in payloads[:args.warmup_requests]:
+            client.send(payload)
+
+        start = time.perf_counter()
+        if args.rate:
+            print(f"Sending {args.rate:g} requests/sec to {client.url}...")
+            results = run_open_loop(client, payloads, args.rate, duration=args.duration,
+                                    requests_total=args.requests, max_in_flight=args.max_in_flight,
+                                    poisson=not args.constant_arrivals)
+        else:
+            print(f"Sending requests to {client.url} with concurrency {concurrency}...")
+            results = run_closed_loop(client, payloads, concurrency,
+                                      duration=None if args.requests else args.duration,
+                                      requests_total=args.requests)
+        elapsed = max(result['finished'] for result in results) - start if results else 0.0
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    summary = summarize(results, elapsed, server_cores)
+    summary['config'] = {
+        'url': url, 'endpoint': args.endpoint,
+        'mode': 'open' if args.rate else 'closed',
+        'rate': args.rate, 'concurrency': None if args.rate else concurrency,
+        'formats': args.formats, 'durations': args.durations, 'sample_rate': args.sample_rate,
+        'priority': args.priority, 'deadline_ms': args.deadline_ms
+    }
+
+    print("=" * 60)
+    print("AuralGuard Load Test")
+    print("=" * 60)
+    latency = summary['latency_ms']
+    print(f"Requests: {summary['requests']} ({summary['error_rate']:.1%} errors: {summary['statuses']})")
+    print(f"Throughput: {summary['throughput_rps']:.2f} requests/sec"
+          + (f" ({summary['throughput_rps_per_core']:.2f} per core)" if 'throughput_rps_per_core' in summary else ""))
+    if latency:
+        print(f"Latency ms: p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  "
+              f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}")
+    for name, stage in summary['server_stages_ms'].items():
+        print(f"  server {name:<12s} p50 {stage['p50']:8.1f}  p95 {stage['p95']:8.1f}  p99 {stage['p99']:8.1f}")
+    for key, group in summary['by_payload'].items():
+        p99 = f"{group['latency_ms']['p99']:.1f}" if group['latency_ms'] else '-'
+        print(f"  {key:<12s} {group['requests']:6d} requests, {group['error_rate']:.1%} errors, p99 {p99} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Summary written to {args.output}")
+
+    failed = False
+    if args.max_p99_ms is not None and (not latency or latency['p99'] > args.max_p99_ms):
+        print(f"FAILED: p99 latency above {args.max_p99_ms:g} ms")
+        failed = True
+    if args.max_error_rate is not None and summary['error_rate'] > args.max_error_rate:
+        print(f"FAILED: error rate above {args.max_error_rate:.1%}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
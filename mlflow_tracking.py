@@ -5,8 +5,28 @@ MLflow integration for experiment tracking and model versioning.
 import mlflow
 import mlflow.keras
 import os
+import time
 from datetime import datetime
 
+from mlflow.entities import Metric, Param
+from mlflow.tracking import MlflowClient
+
+
+def _log_metric_batch(run_id: str, series: dict):
+    """
+    Log metrics with one log_batch call per 1000 values.
+
+    Args:
+        run_id: Run to log to
+        series: {name: [(step, value), ...]}
+    """
+    timestamp = int(time.time() * 1000)
+    metrics = [Metric(name, float(value), timestamp, step)
+               for name, values in series.items() for step, value in values]
+    client = MlflowClient()
+    for start in range(0, len(metrics), 1000):
+        client.log_batch(run_id, metrics=metrics[start:start + 1000])
+
 
 class MLflowTracker:
     """Handles MLflow experiment tracking."""
@@ -35,6 +55,34 @@ class MLflowTracker:
         
         mlflow.set_experiment(experiment_name)
         self.experiment_name = experiment_name
+        self.experiment_id = experiment_id
+    
+    def start_run(self, params: dict = None, tags: dict = None, run_name: str = None):
+        """
+        Create a run for logging while training (e.g. with AsyncMLflowLogger).
+
+        The run is not made active in this process; pass its ID to
+        log_training_run() to finish it.
+
+        Args:
+            params: Hyperparameters to log
+            tags: Tags to set
+            run_name: Display name of the run
+
+        Returns:
+            The run ID, or None if MLflow is unavailable
+        """
+        try:
+            client = MlflowClient()
+            run = client.create_run(self.experiment_id, run_name=run_name,
+                                    tags={key: str(value) for key, value in (tags or {}).items()})
+            if params:
+                client.log_batch(run.info.run_id,
+                                 params=[Param(key, str(value)) for key, value in params.items()])
+            return run.info.run_id
+        except Exception as e:
+            print(f"Warning: Could not start MLflow run: {e}")
+            return None
     
     def log_training_run(self,
                         model,
@@ -42,7 +90,11 @@ class MLflowTracker:
                         test_metrics: dict,
                         model_path: str = None,
                         params: dict = None,
-                        tags: dict = None):
+                        tags: dict = None,
+                        evaluation_report: dict = None,
+                        dicts: dict = None,
+                        run_id: str = None,
+                        async_logger=None):
         """
         Log a training run to MLflow.
         
@@ -53,9 +105,19 @@ class MLflowTracker:
             model_path: Path to save the model
             params: Hyperparameters to log
             tags: Additional tags
+            evaluation_report: Report from StreamingEvaluator.report()
+            dicts: Extra JSON artifacts, keyed by artifact path
+            run_id: Finish this run (from start_run()) instead of creating one
+            async_logger: utils.mlflow_logging.AsyncMLflowLogger of the run; the
+                          per-epoch metrics were already streamed through it, and
+                          the model is uploaded and registered in the background
+                          (call async_logger.close() to wait for it)
+        
+        Returns:
+            The run ID, or None if logging failed
         """
         try:
-            with mlflow.start_run():
+            with mlflow.start_run(run_id=run_id) as run:
                 # Log parameters
                 if params:
                     mlflow.log_params(params)
@@ -64,41 +126,146 @@ class MLflowTracker:
                 if tags:
                     mlflow.set_tags(tags)
                 
-                # Log training metrics
-                if history:
-                    for epoch, (loss, acc) in enumerate(
-                        zip(history.history['loss'], 
-                            history.history['accuracy']), 
-                        start=1
-                    ):
-                        mlflow.log_metric('train_loss', loss, step=epoch)
-                        mlflow.log_metric('train_accuracy', acc, step=epoch)
-                    
-                    if 'val_loss' in history.history:
-                        for epoch, (val_loss, val_acc) in enumerate(
-                            zip(history.history['val_loss'],
-                                history.history['val_accuracy']),
-                            start=1
-                        ):
-                            mlflow.log_metric('val_loss', val_loss, step=epoch)
-                            mlflow.log_metric('val_accuracy', val_acc, step=epoch)
+                # Log training metrics (unless streamed during training)
+                if history and async_logger is None:
+                    series = {}
+                    for name in ('loss', 'accuracy', 'val_loss', 'val_accuracy'):
+                        if name in history.history:
+                            metric_name = name if name.startswith('val_') else f'train_{name}'
+                            series[metric_name] = list(enumerate(history.history[name], start=1))
+                    _log_metric_batch(run.info.run_id, series)
                 
                 # Log test metrics
-                for metric_name, metric_value in test_metrics.items():
-                    mlflow.log_metric(f'test_{metric_name}', metric_value)
+                mlflow.log_metrics({f'test_{name}': value for name, value in test_metrics.items()})
+                
+                if evaluation_report:
+                    self.log_evaluation_report(evaluation_report)
+                
+                for artifact_path, content in (dicts or {}).items():
+                    mlflow.log_dict(content, artifact_path)
                 
                 # Log model
-                if model_path:
+                if async_logger is not None:
+                    async_logger.log_model(model, "AuralGuard" if model_path else None)
+                elif model_path:
                     mlflow.keras.log_model(model, "model", 
                                           registered_model_name="AuralGuard")
                 else:
                     mlflow.keras.log_model(model, "model")
                 
                 print("Training run logged to MLflow successfully")
+                return run.info.run_id
         
         except Exception as e:
             print(f"Warning: Could not log to MLflow: {e}")
+            return None
+    
+    def log_evaluation_report(self, report: dict):
+        """
+        Log a streaming evaluation report to the active run.
+        
+        Args:
+            report: Report from StreamingEvaluator.report()
+        """
+        mlflow.log_dict(report, 'evaluation/report.json')
+        
+        # Per-threshold table, with the threshold (in %) as the step
+        series = {}
+        for row in report.get('thresholds', []):
+            step = int(round(row['threshold'] * 100))
+            for name in ('precision', 'recall', 'fpr', 'f1', 'accuracy'):
+                series.setdefault(f'test_{name}_at_threshold', []).append((step, row[name]))
+        _log_metric_batch(mlflow.active_run().info.run_id, series)
+        
+        mlflow.log_metrics({f'eval_latency_{name}': value
+                            for name, value in report.get('latency', {}).items()})
     
+    def start_sweep_run(self, params: dict = None, tags: dict = None):
+        """
+        Create the parent run of a hyperparameter sweep.
+
+        The run is left open (not active in this process) so trials in other
+        processes can attach to it with log_sweep_trial().
+
+        Args:
+            params: Sweep settings to log
+            tags: Additional tags
+
+        Returns:
+            The parent run ID, or None if MLflow is unavailable
+        """
+        try:
+            with mlflow.start_run(run_name=f"sweep-{datetime.utcnow():%Y%m%d-%H%M%S}") as run:
+                if params:
+                    mlflow.log_params(params)
+                mlflow.set_tags({'sweep': 'true', **(tags or {})})
+            # Reopened by finish_sweep_run; mark it running meanwhile
+            mlflow.tracking.MlflowClient().update_run(run.info.run_id, status='RUNNING')
+            return run.info.run_id
+        except Exception as e:
+            print(f"Warning: Could not start MLflow sweep run: {e}")
+            return None
+
+    def log_sweep_trial(self, parent_run_id: str, trial_id, params: dict, history: dict,
+                        status: str, objective: str, value: float = None,
+                        metrics: dict = None):
+        """
+        Log one sweep trial as a nested run of the sweep's parent run.
+
+        Params, tags and all per-epoch metrics are sent with log_batch (one
+        call per 1000 metrics) rather than one request per value.
+
+        Args:
+            parent_run_id: Run ID from start_sweep_run()
+            trial_id: Trial number
+            params: Trial hyperparameters
+            history: Per-epoch logs ({metric: [values]})
+            status: 'completed', 'pruned' or 'failed'
+            objective: Name of the objective metric
+            value: Best objective value reached
+            metrics: Additional final metrics
+        """
+        try:
+            client = MlflowClient()
+            run = client.create_run(self.experiment_id, run_name=f"trial-{trial_id}",
+                                    tags={'mlflow.parentRunId': parent_run_id, 'trial': str(trial_id),
+                                          'trial_status': status})
+            run_id = run.info.run_id
+            client.log_batch(run_id, params=[Param(name, str(param)) for name, param in params.items()])
+            series = {name: list(enumerate(values, start=1)) for name, values in history.items()}
+            final = {f'best_{objective}': value, **(metrics or {})}
+            series.update({name: [(0, metric_value)] for name, metric_value in final.items()
+                           if metric_value is not None})
+            _log_metric_batch(run_id, series)
+            client.set_terminated(run_id)
+        except Exception as e:
+            print(f"Warning: Could not log sweep trial {trial_id} to MLflow: {e}")
+
+    def finish_sweep_run(self, run_id: str, results: dict = None, status: str = 'FINISHED'):
+        """
+        Log the sweep summary (best trial, all trial results) to the parent run and close it.
+
+        Args:
+            run_id: Run ID from start_sweep_run()
+            results: Sweep summary with 'best' and 'trials' entries
+            status: Final run status ('FINISHED' or 'FAILED')
+        """
+        try:
+            if results is not None:
+                with mlflow.start_run(run_id=run_id):
+                    mlflow.log_dict(results, 'sweep/results.json')
+                    best = results.get('best')
+                    if best:
+                        mlflow.log_params({f"best_{name}": str(param) if isinstance(param, (list, tuple)) else param
+                                           for name, param in best['params'].items()})
+                        mlflow.log_metric(f"best_{results['objective']}", best['value'])
+                    for trial_status in ('completed', 'pruned', 'failed'):
+                        mlflow.log_metric(f'trials_{trial_status}',
+                                          sum(1 for trial in results['trials'] if trial['status'] == trial_status))
+            mlflow.tracking.MlflowClient().set_terminated(run_id, status=status)
+        except Exception as e:
+            print(f"Warning: Could not finish MLflow sweep run: {e}")
+
     def log_model_deployment(self, model_path: str, deployment_info: dict):
         """
         Log model deployment information.
@@ -0,0 +1,201 @@
+"""
+Startup profiler for the AuralGuard API.
+Reports per-module import time and time-to-ready of api/app.py, and fails if
+the time to the first prediction goes over a budget.
+
+Usage:
+    python profile_startup.py                        # uses MODEL_PATH
+    python profile_startup.py --budget 20 --output startup_report.json
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(PROJECT_ROOT)
+
+DEFAULT_BUDGET_SECONDS = float(os.getenv('STARTUP_BUDGET_SECONDS', '30'))
+
+
+def profile_imports(module='api.app', top=15):
+    """
+    Measure per-module import time in a fresh interpreter.
+
+    Args:
+        module: Module to import
+        top: Number of slowest modules to return
+
+    Returns:
+        Dictionary with total import time and the slowest modules
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        # Format: "import time:  self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append({
+            'module': name.strip(),
+            'self_seconds': int(self_us) / 1e6,
+            'cumulative_seconds': int(cumulative_us) / 1e6,
+            'top_level': not name.startswith('  ')
+        })
+
+    total = sum(row['cumulative_seconds'] for row in rows if row['top_level'])
+    rows.sort(key=lambda row: row['cumulative_seconds'], reverse=True)
+    return {
+        'total_import_seconds': round(total, 4),
+        'slowest_modules': rows[:top]
+    }
+
+
+def measure_time_to_ready():
+    """
+    Import the API, load and warm the model and serve one prediction.
+
+    Runs inside the child process started by profile_time_to_ready() so the
+    numbers reflect a cold start.
+
+    Returns:
+        Dictionary of phase timings in seconds
+    """
+    start = time.perf_counter()
+    import api.app as app_module
+    imported = time.perf_counter()
+
+    app_module.initialize_model()
+    model_loaded = time.perf_counter()
+    if not app_module.model_manager.ready:
+        raise RuntimeError(f"Model could not be loaded from {app_module.model_manager.source}")
+
+    from utils.audio_processor import synthesize_wav_bytes
+
+    client = app_module.app.test_client()
+    response = client.post(
+        '/predict',
+        data={'audio': (io.BytesIO(synthesize_wav_bytes()), 'startup_probe.wav')},
+        content_type='multipart/form-data'
+    )
+    first_prediction = time.perf_counter()
+    if response.status_code != 200:
+        raise RuntimeError(f"First prediction failed: {response.get_json()}")
+
+    return {
+        'import_app_seconds': round(imported - start, 4),
+        'load_and_warmup_seconds': round(model_loaded - imported, 4),
+        'first_prediction_seconds': round(first_prediction - model_loaded, 4),
+        'time_to_ready_seconds': round(model_loaded - start, 4),
+        'time_to_first_prediction_seconds': round(first_prediction - start, 4)
+    }
+
+
+def profile_time_to_ready(model_path):
+    """
+    Measure cold-start phases in a fresh interpreter.
+
+    Args:
+        model_path: Model file the API should load
+
+    Returns:
+        Dictionary of phase timings in seconds, including interpreter startup
+    """
+    env = dict(os.environ, MODEL_PATH=model_path, MODEL_POLL_INTERVAL='0')
+    spawned = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--measure-ready'],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    wall = time.perf_counter() - spawned
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup measurement failed:\n{result.stderr}")
+
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['process_wall_seconds'] = round(wall, 4)
+    return timings
+
+
+def _untrained_model_path():
+    """Save an untrained model to a temporary file for profiling without a trained model."""
+    from utils.model_loader import create_model
+
+    path = os.path.join(tempfile.mkdtemp(prefix='auralguard_startup_'), 'model.h5')
+    create_model().save(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile AuralGuard API startup')
+    parser.add_argument('--model-path', type=str,
+                        default=os.getenv('MODEL_PATH', 'models/auralguard_model.h5'),
+                        help='Model file to load (an untrained model is used if missing)')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help='Maximum time to first prediction in seconds')
+    parser.add_argument('--top', type=int, default=15,
+                        help='Number of slowest imports to report')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Write the report as JSON to this path')
+    parser.add_argument('--measure-ready', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure_ready:
+        print(json.dumps(measure_time_to_ready()))
+        return 0
+
+    model_path = args.model_path
+    if not os.path.exists(model_path):
+        print(f"Model not found at {model_path}, profiling with an untrained model")
+        model_path = _untrained_model_path()
+
+    report = {
+        'imports': profile_imports(top=args.top),
+        'startup': profile_time_to_ready(model_path),
+        'budget_seconds': args.budget
+    }
+    ttfp = report['startup']['time_to_first_prediction_seconds']
+    report['within_budget'] = ttfp <= args.budget
+
+    print("=" * 60)
+    print("AuralGuard API Startup Profile")
+    print("=" * 60)
+    print(f"Import api.app (fresh interpreter): {report['imports']['total_import_seconds']:.3f}s")
+    print("Slowest imports (cumulative):")
+    for row in report['imports']['slowest_modules']:
+        print(f"  {row['cumulative_seconds']:8.3f}s  {row['module']}")
+    print()
+    for phase, seconds in report['startup'].items():
+        print(f"  {phase:36s} {seconds:8.3f}s")
+    print()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if not report['within_budget']:
+        print(f"❌ Time to first prediction {ttfp:.3f}s exceeds budget of {args.budget:.3f}s")
+        return 1
+    print(f"✅ Time to first prediction {ttfp:.3f}s within budget of {args.budget:.3f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
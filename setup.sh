@@ -49,7 +49,7 @@ echo "=========================================="
 echo ""
 echo "Next steps:"
 echo "1. Activate virtual environment: source venv/bin/activate"
-echo "2. Train model: python train_and_save_model.py"
+echo "2. Train model: python complete_training.py"
 echo "3. Or use existing model at models/auralguard_model.h5"
 echo "4. Start MongoDB (optional): docker run -d -p 27017:27017 --name mongodb mongo:7.0"
 echo "5. Run API: python api/app.py"
@@ -0,0 +1,10 @@
+"""
+Shared pytest setup: make the project root importable (utils, api, scripts).
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
@@ -0,0 +1,151 @@
+"""
+AdmissionController (utils/admission.py): lanes, priority, 429 and deadlines.
+"""
+
+import threading
+import time
+import types
+
+import pytest
+
+from utils.admission import (DEADLINE_HEADER, PRIORITY_HEADER, AdmissionController,
+                             AdmissionRejected)
+
+
+def far_deadline():
+    return time.monotonic() + 10
+
+
+def admit_in_thread(controller, lane, admitted, deadline=None):
+    """Start a request that waits for a slot; its ticket is appended to admitted."""
+    def run():
+        admitted.append(controller.admit(lane, deadline or far_deadline()))
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_until(condition):
+    for _ in range(400):
+        if condition():
+            return
+        time.sleep(0.005)
+    raise AssertionError("condition not reached")
+
+
+def wait_for_queue(controller, count):
+    wait_until(lambda: controller.queued() == count)
+
+
+def test_unlabelled_requests_keep_full_capacity():
+    controller = AdmissionController(max_concurrency=2)
+    assert controller.lane_for({}) == 'batch'
+    assert controller.lane_concurrency == {'interactive': 2, 'batch': 2}
+
+    tickets = [controller.admit('batch', far_deadline()) for _ in range(2)]
+    assert controller.stats()['running'] == {'interactive': 0, 'batch': 2}
+    for ticket in tickets:
+        controller.release(ticket)
+
+
+def test_headers_are_validated():
+    controller = AdmissionController(default_timeout=5)
+    assert controller.lane_for({PRIORITY_HEADER: ' Interactive '}) == 'interactive'
+    with pytest.raises(ValueError):
+        controller.lane_for({PRIORITY_HEADER: 'urgent'})
+    assert controller.deadline_for({}, arrival=100.0) == 105.0
+    assert controller.deadline_for({DEADLINE_HEADER: '250'}, arrival=100.0) == 100.25
+    for value in ('soon', '0', '-5'):
+        with pytest.raises(ValueError):
+            controller.deadline_for({DEADLINE_HEADER: value})
+
+
+def test_batch_concurrency_reserves_slots_for_interactive():
+    controller = AdmissionController(max_concurrency=2, batch_concurrency=1)
+    batch = controller.admit('batch', far_deadline())
+
+    admitted = []
+    waiting = admit_in_thread(controller, 'batch', admitted)
+    wait_for_queue(controller, 1)
+    # The second slot is free, but only for interactive requests
+    interactive = controller.admit('interactive', far_deadline())
+    assert admitted == []
+
+    controller.release(interactive)
+    controller.release(batch)
+    waiting.join(2)
+    assert [ticket.lane for ticket in admitted] == ['batch']
+    controller.release(admitted[0])
+
+
+def test_interactive_requests_are_admitted_first():
+    controller = AdmissionController(max_concurrency=1)
+    running = controller.admit('batch', far_deadline())
+
+    admitted = []
+    threads = [admit_in_thread(controller, 'batch', admitted)]
+    wait_for_queue(controller, 1)
+    threads.append(admit_in_thread(controller, 'interactive', admitted))
+    wait_for_queue(controller, 2)
+
+    controller.release(running)
+    wait_until(lambda: len(admitted) == 1)
+    controller.release(admitted[0])
+    wait_until(lambda: len(admitted) == 2)
+    controller.release(admitted[1])
+    for thread in threads:
+        thread.join(2)
+    assert [ticket.lane for ticket in admitted] == ['interactive', 'batch']
+
+
+def test_full_queue_is_rejected_with_429():
+    controller = AdmissionController(max_concurrency=1, max_queue={'batch': 1})
+    running = controller.admit('batch', far_deadline())
+    admitted = []
+    waiting = admit_in_thread(controller, 'batch', admitted)
+    wait_for_queue(controller, 1)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit('batch', far_deadline())
+    assert (rejected.value.status, rejected.value.reason) == (429, 'queue_full')
+    assert rejected.value.retry_after >= 1
+    # The interactive lane has its own queue
+    assert controller.stats()['queued'] == {'interactive': 0, 'batch': 1}
+
+    controller.release(running)
+    waiting.join(2)
+    controller.release(admitted[0])
+
+
+def test_request_past_its_deadline_is_dropped_with_503():
+    controller = AdmissionController(max_concurrency=1)
+    running = controller.admit('batch', far_deadline())
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit('interactive', time.monotonic() + 0.05)
+    assert (rejected.value.status, rejected.value.reason) == (503, 'deadline')
+    assert controller.queued() == 0
+
+    controller.release(running)
+    ticket = controller.admit('batch', time.monotonic() + 0.05)
+    time.sleep(0.06)
+    assert ticket.expired()
+    controller.release(ticket)
+
+
+def test_predict_returns_429_with_retry_after(monkeypatch):
+    pytest.importorskip('tensorflow')
+    from api import app as api
+
+    controller = AdmissionController(max_concurrency=1, max_queue={'batch': 0})
+    monkeypatch.setattr(api, 'admission', controller)
+    monkeypatch.setattr(api, 'model_manager', types.SimpleNamespace(ready=True))
+    running = controller.admit('batch', far_deadline())
+    try:
+        response = api.app.test_client().post('/predict', json={'audio_path': 'unused.wav'})
+    finally:
+        controller.release(running)
+
+    assert response.status_code == 429
+    assert response.get_json()['reason'] == 'queue_full'
+    assert int(response.headers['Retry-After']) >= 1
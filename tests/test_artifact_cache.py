@@ -0,0 +1,108 @@
+"""
+RegistryArtifactCache (utils/artifact_cache.py): registry round trip, dedup and eviction.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+mlflow = pytest.importorskip('mlflow')
+
+from utils.artifact_cache import RegistryArtifactCache, _tree_size  # noqa: E402
+from utils.metrics import MODEL_CACHE_LOOKUPS  # noqa: E402
+from utils.mlflow_logging import AsyncMLflowLogger  # noqa: E402
+from utils.model_loader import load_registry_model  # noqa: E402
+
+MODEL_NAME = 'auralguard-cache-test'
+
+
+def small_model(seed, units=64):
+    tf.keras.utils.set_random_seed(seed)
+    return tf.keras.Sequential([
+        tf.keras.Input(shape=(16,)),
+        tf.keras.layers.Dense(units, activation='relu'),
+        tf.keras.layers.Dense(1, activation='sigmoid')
+    ])
+
+
+@pytest.fixture(scope='module')
+def registry(tmp_path_factory):
+    """A sqlite-backed registry with versions 1 and 2 of different models and 3 equal to 1."""
+    root = tmp_path_factory.mktemp('registry')
+    previous_uri = mlflow.get_tracking_uri()
+    with pytest.MonkeyPatch.context() as patch:
+        # Undone at teardown, so later test modules see the original cwd and env
+        patch.chdir(root)
+        patch.setenv('MLFLOW_DISABLE_AGENT_HINT', '1')
+        mlflow.set_tracking_uri(f"sqlite:///{root}/mlflow.db")
+        client = mlflow.tracking.MlflowClient()
+        experiment_id = client.create_experiment('artifact-cache-test')
+
+        models = [small_model(1), small_model(2)]
+        run_ids = []
+        for model in models:
+            run_ids.append(client.create_run(experiment_id).info.run_id)
+            logger = AsyncMLflowLogger(run_ids[-1], client=client)
+            logger.log_model(model, registered_model_name=MODEL_NAME)
+            logger.close()
+            assert logger.errors == 0
+        # The same artifacts registered again (saving a model twice differs in timestamps)
+        mlflow.register_model(f"runs:/{run_ids[0]}/model", MODEL_NAME)
+        try:
+            yield models
+        finally:
+            mlflow.set_tracking_uri(previous_uri)
+
+
+def lookups(result):
+    return MODEL_CACHE_LOOKUPS.labels(result)._value.get()
+
+
+def test_round_trip_downloads_once_and_keeps_only_the_export(registry, tmp_path):
+    cache = RegistryArtifactCache(str(tmp_path), max_bytes=2 ** 30)
+    x = np.random.default_rng(0).random((4, 16), dtype=np.float32)
+
+    misses, hits = lookups('miss'), lookups('hit')
+    model = load_registry_model(f"models:/{MODEL_NAME}/1", cache=cache)
+    np.testing.assert_allclose(model.predict(x, verbose=0), registry[0].predict(x, verbose=0), rtol=1e-6)
+    load_registry_model(f"models:/{MODEL_NAME}/1", cache=cache)
+    assert (lookups('miss') - misses, lookups('hit') - hits) == (1, 1)
+
+    entry = cache.lookup(MODEL_NAME, '1')
+    blob = cache.blob_path(entry['checksum'])
+    assert os.listdir(blob) == ['serving']
+    assert entry['size'] == _tree_size(blob)
+    weights_bytes = sum(w.nbytes for w in registry[0].get_weights())
+    assert weights_bytes <= entry['size'] < 2 * weights_bytes + 64 * 1024
+
+
+def test_identical_versions_share_one_blob(registry, tmp_path):
+    cache = RegistryArtifactCache(str(tmp_path), max_bytes=2 ** 30)
+    for version in ('1', '3'):
+        with cache.open(MODEL_NAME, version):
+            pass
+    assert cache.lookup(MODEL_NAME, '1')['checksum'] == cache.lookup(MODEL_NAME, '3')['checksum']
+    assert len(os.listdir(os.path.join(str(tmp_path), 'blobs'))) == 1
+
+
+def test_least_recently_used_version_is_evicted(registry, tmp_path):
+    cache = RegistryArtifactCache(str(tmp_path), max_bytes=2 ** 30)
+    with cache.open(MODEL_NAME, '1') as entry:
+        one_version = entry['size']
+    # Room for one version only
+    cache.max_bytes = one_version + one_version // 2
+
+    with cache.open(MODEL_NAME, '2'):
+        pass
+    assert cache.lookup(MODEL_NAME, '1') is None
+    assert cache.lookup(MODEL_NAME, '2') is not None
+
+    # A pinned version survives eviction even when over the limit
+    with cache.open(MODEL_NAME, '2'):
+        with cache.open(MODEL_NAME, '1'):
+            assert cache.evict() == 0
+    assert cache.lookup(MODEL_NAME, '2') is not None
+    assert cache.evict() > 0
+    assert len(os.listdir(os.path.join(str(tmp_path), 'blobs'))) == 1
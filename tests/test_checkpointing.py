@@ -0,0 +1,103 @@
+"""
+TrainingCheckpointer (utils/checkpointing.py): resume, completion and run directories.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from utils.checkpointing import TrainingCheckpointer, run_directory  # noqa: E402
+
+
+def small_model(units=4):
+    tf.keras.utils.set_random_seed(0)
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(8,)),
+        tf.keras.layers.Dense(units, activation='relu'),
+        tf.keras.layers.Dense(1, activation='sigmoid')
+    ])
+    model.compile(optimizer=tf.keras.optimizers.Adam(0.01), loss='binary_crossentropy')
+    return model
+
+
+def data():
+    rng = np.random.default_rng(0)
+    x = rng.random((64, 8), dtype=np.float32)
+    return x, (x.sum(axis=1) > 4).astype(np.float32)
+
+
+def fit(model, checkpointer, epochs, initial_epoch=0):
+    x, y = data()
+    return model.fit(x, y, batch_size=16, epochs=epochs, initial_epoch=initial_epoch,
+                     callbacks=[checkpointer], verbose=0)
+
+
+def test_resume_restores_weights_optimizer_and_history(tmp_path):
+    model = small_model()
+    fit(model, TrainingCheckpointer(str(tmp_path), save_every_steps=2), epochs=2)
+
+    resumed = small_model()
+    checkpointer = TrainingCheckpointer(str(tmp_path))
+    assert checkpointer.restore(resumed) == 2
+    for saved, restored in zip(model.get_weights(), resumed.get_weights()):
+        np.testing.assert_array_equal(saved, restored)
+    assert int(resumed.optimizer.iterations.numpy()) == int(model.optimizer.iterations.numpy()) == 8
+    assert len(checkpointer.history()['loss']) == 2
+
+    # Training on continues the epoch count and history
+    fit(resumed, checkpointer, epochs=3, initial_epoch=2)
+    assert len(checkpointer.history()['loss']) == 3
+    assert TrainingCheckpointer(str(tmp_path)).restore(small_model()) == 3
+
+
+def test_clear_after_completion_starts_the_next_run_fresh(tmp_path):
+    directory = str(tmp_path / 'run')
+    checkpointer = TrainingCheckpointer(directory)
+    fit(small_model(), checkpointer, epochs=2)
+    checkpointer.clear()
+
+    assert not os.path.exists(directory)
+    rerun = TrainingCheckpointer(directory)
+    assert rerun.restore(small_model()) == 0
+    assert rerun.history() == {}
+
+
+def test_early_stopping_flag_persists_until_cleared(tmp_path):
+    # Loss falls every epoch, so mode='max' never improves after the first
+    checkpointer = TrainingCheckpointer(str(tmp_path), monitor='loss', mode='max', patience=1)
+    history = fit(small_model(), checkpointer, epochs=5)
+    assert len(history.history['loss']) == 2
+
+    resumed = TrainingCheckpointer(str(tmp_path), monitor='loss', mode='max', patience=1)
+    assert resumed.stopped_early
+    resumed.clear()
+    assert not resumed.stopped_early
+    assert not TrainingCheckpointer(str(tmp_path)).stopped_early
+
+
+def test_checkpoint_of_another_architecture_does_not_load(tmp_path):
+    fit(small_model(units=4), TrainingCheckpointer(str(tmp_path)), epochs=1)
+    with pytest.raises(ValueError):
+        TrainingCheckpointer(str(tmp_path)).restore(small_model(units=6))
+
+
+def test_run_directory_depends_on_data_and_parameters():
+    params = {'filters': 16, 'dense_units': [32, 16], 'learning_rate': 0.001}
+    directory = run_directory('checkpoints', 'a' * 64, params)
+
+    assert directory.startswith(os.path.join('checkpoints', 'a' * 12 + '-'))
+    assert run_directory('checkpoints', 'a' * 64, dict(reversed(list(params.items())))) == directory
+    assert run_directory('checkpoints', 'b' * 64, params) != directory
+    assert run_directory('checkpoints', 'a' * 64, {**params, 'filters': 8}) != directory
+    assert run_directory('checkpoints', 'a' * 64, {**params, 'dense_units': [64]}) != directory
+
+
+def test_early_stopping_requires_held_out_validation(capsys):
+    import complete_training
+
+    # Refused before touching the dataset
+    assert complete_training.main(patience=2, validation_fraction=0.0) is None
+    assert '--validation-fraction' in capsys.readouterr().out
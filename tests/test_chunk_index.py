@@ -0,0 +1,44 @@
+"""
+split_validation (utils/chunk_index.py): holding out training files for validation.
+"""
+
+from utils.chunk_index import split_validation
+
+
+def chunks(label, files, per_file=3):
+    return [{'path': f"{label}/{i}.wav", 'sha256': f"{label}-{i}", 'label': label, 'index': j}
+            for i in range(files) for j in range(per_file)]
+
+
+def files_of(chunk_list):
+    return {(chunk['label'], chunk['path']) for chunk in chunk_list}
+
+
+def test_holds_out_whole_files_per_class():
+    index = chunks('real', 10) + chunks('fake', 5)
+    remaining, validation = split_validation(index, 0.2, seed=1)
+
+    assert not files_of(remaining) & files_of(validation)
+    assert len(remaining) + len(validation) == len(index)
+    held_out = files_of(validation)
+    assert sum(label == 'real' for label, _ in held_out) == 2
+    assert sum(label == 'fake' for label, _ in held_out) == 1
+    # Every chunk of a held-out file goes with it
+    assert len(validation) == 3 * len(held_out)
+
+
+def test_split_is_deterministic_and_seeded():
+    index = chunks('real', 20) + chunks('fake', 20)
+    first = split_validation(index, 0.25, seed=7)
+    assert split_validation(list(reversed(index)), 0.25, seed=7)[1] == \
+        [chunk for chunk in reversed(index) if chunk in first[1]]
+    assert files_of(split_validation(index, 0.25, seed=8)[1]) != files_of(first[1])
+
+
+def test_each_class_keeps_a_training_file():
+    index = chunks('real', 2) + chunks('fake', 1)
+    remaining, validation = split_validation(index, 0.9)
+    assert files_of(validation) <= {('real', 'real/0.wav'), ('real', 'real/1.wav')}
+    assert len(files_of(validation)) == 1
+    assert ('fake', 'fake/0.wav') in files_of(remaining)
+    assert split_validation(index, 0.0) == (index, [])
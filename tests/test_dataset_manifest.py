@@ -0,0 +1,63 @@
+"""
+assign_splits (utils/dataset_manifest.py): stable per-file train/test splits.
+"""
+
+import copy
+
+from utils.dataset_manifest import assign_splits
+
+
+def manifest(files, start=0):
+    sources = {}
+    for i in range(start, start + files):
+        label = 'real' if i % 2 else 'fake'
+        sources[f"{label}/{i}.wav"] = {'label': label, 'sha256': f"hash-{i}"}
+    return {'sources': sources}
+
+
+def splits(manifest):
+    return {path: entry['split'] for path, entry in manifest['sources'].items()}
+
+
+def test_split_is_deterministic_and_independent_of_order():
+    first, second = manifest(40), manifest(40)
+    second['sources'] = dict(reversed(list(second['sources'].items())))
+    counts = assign_splits(first, 0.3, seed=1)
+    assert assign_splits(second, 0.3, seed=1) == counts
+    assert splits(first) == splits(second)
+    assert counts['train'] + counts['test'] == 40
+    assert 0 < counts['test'] < 40
+
+
+def test_adding_files_keeps_existing_assignments():
+    data = manifest(40)
+    assign_splits(data, 0.3, seed=1)
+    before = splits(data)
+
+    data['sources'].update(manifest(20, start=40)['sources'])
+    assign_splits(data, 0.3, seed=1)
+    after = splits(data)
+    assert {path: after[path] for path in before} == before
+    assert all(after[path] in ('train', 'test') for path in after)
+
+
+def test_changed_parameters_reassign_every_file():
+    data = manifest(200)
+    assign_splits(data, 0.3, seed=1)
+    reseeded = copy.deepcopy(data)
+    assign_splits(reseeded, 0.3, seed=2)
+    assert reseeded['split_params'] == {'test_fraction': 0.3, 'seed': 2}
+    assert splits(reseeded) != splits(data)
+
+    fresh = manifest(200)
+    assign_splits(fresh, 0.3, seed=2)
+    assert splits(reseeded) == splits(fresh)
+
+
+def test_each_class_gets_a_train_and_a_test_file():
+    for fraction in (0.01, 0.99):
+        data = manifest(4)
+        assign_splits(data, fraction, seed=3)
+        for label in ('real', 'fake'):
+            assigned = {entry['split'] for entry in data['sources'].values() if entry['label'] == label}
+            assert assigned == {'train', 'test'}
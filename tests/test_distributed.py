@@ -0,0 +1,48 @@
+"""
+shard_chunks (utils/distributed.py): splitting the chunk index across workers.
+"""
+
+from utils.distributed import shard_chunks
+
+
+def chunk_index():
+    index = []
+    for label, files in (('real', 7), ('fake', 4)):
+        for i in range(files):
+            index += [{'path': f"{label}/{i}.wav", 'label': label, 'index': j} for j in range(i % 3 + 1)]
+    return index
+
+
+def keys(chunks):
+    return [(chunk['label'], chunk['path'], chunk['index']) for chunk in chunks]
+
+
+def test_shards_are_disjoint_and_cover_every_chunk():
+    index = chunk_index()
+    for num_shards in (2, 3, 5):
+        shards = [shard_chunks(index, num_shards, i) for i in range(num_shards)]
+        covered = [key for shard in shards for key in keys(shard)]
+        assert sorted(covered) == sorted(keys(index))
+        assert len(covered) == len(set(covered))
+
+
+def test_source_files_stay_whole_and_in_index_order():
+    index = chunk_index()
+    shards = [shard_chunks(index, 3, i) for i in range(3)]
+    owners = {}
+    for i, shard in enumerate(shards):
+        assert shard == [chunk for chunk in index if chunk in shard]
+        for chunk in shard:
+            assert owners.setdefault((chunk['label'], chunk['path']), i) == i
+
+
+def test_every_worker_computes_the_same_assignment():
+    index = chunk_index()
+    reordered = list(reversed(index))
+    for i in range(3):
+        assert sorted(keys(shard_chunks(reordered, 3, i))) == sorted(keys(shard_chunks(index, 3, i)))
+
+
+def test_single_shard_keeps_the_whole_index():
+    index = chunk_index()
+    assert shard_chunks(index, 1, 0) == index
@@ -0,0 +1,80 @@
+"""
+StreamingEvaluator (utils/evaluation.py) against scikit-learn on the full arrays.
+"""
+
+import numpy as np
+import pytest
+
+metrics = pytest.importorskip('sklearn.metrics')
+
+from utils.evaluation import StreamingEvaluator  # noqa: E402
+
+
+@pytest.fixture
+def scored():
+    """Imbalanced labels with overlapping score distributions."""
+    rng = np.random.default_rng(0)
+    y_true = (rng.random(5000) < 0.3).astype(np.int64)
+    y_score = np.clip(rng.normal(0.35 + 0.3 * y_true, 0.2), 0.0, 1.0)
+    return y_true, y_score
+
+
+def stream(y_true, y_score, batch_size=128, **kwargs):
+    evaluator = StreamingEvaluator(**kwargs)
+    for start in range(0, len(y_true), batch_size):
+        evaluator.update(y_true[start:start + batch_size], y_score[start:start + batch_size])
+    return evaluator
+
+
+def test_threshold_metrics_match_sklearn(scored):
+    y_true, y_score = scored
+    evaluator = stream(y_true, y_score)
+    result = evaluator.metrics()
+    y_pred = (y_score >= 0.5).astype(np.int64)
+
+    tn, fp, fn, tp = metrics.confusion_matrix(y_true, y_pred).ravel()
+    assert (evaluator.tp, evaluator.fp, evaluator.tn, evaluator.fn) == (tp, fp, tn, fn)
+    assert result['accuracy'] == pytest.approx(metrics.accuracy_score(y_true, y_pred))
+    assert result['precision'] == pytest.approx(metrics.precision_score(y_true, y_pred))
+    assert result['recall'] == pytest.approx(metrics.recall_score(y_true, y_pred))
+    assert result['loss'] == pytest.approx(metrics.log_loss(y_true, np.clip(y_score, 1e-7, 1 - 1e-7)))
+
+
+def test_auc_matches_sklearn(scored):
+    y_true, y_score = scored
+    evaluator = stream(y_true, y_score)
+
+    # Exact on the binned scores, within bin resolution on the raw ones
+    binned = np.minimum(np.floor(y_score * evaluator.n_bins), evaluator.n_bins - 1)
+    assert evaluator.auc() == pytest.approx(metrics.roc_auc_score(y_true, binned), abs=1e-9)
+    assert evaluator.auc() == pytest.approx(metrics.roc_auc_score(y_true, y_score), abs=1e-3)
+
+
+def test_equal_error_rate_matches_sklearn_roc(scored):
+    y_true, y_score = scored
+    eer, threshold = stream(y_true, y_score).equal_error_rate()
+
+    fpr, tpr, thresholds = metrics.roc_curve(y_true, y_score)
+    i = int(np.argmin(np.abs(fpr - (1 - tpr))))
+    assert eer == pytest.approx(fpr[i], abs=5e-3)
+    assert threshold == pytest.approx(thresholds[i], abs=5e-3)
+
+
+def test_threshold_report_matches_sklearn(scored):
+    y_true, y_score = scored
+    for row in stream(y_true, y_score).threshold_report():
+        y_pred = (y_score >= row['threshold']).astype(np.int64)
+        tn, fp, fn, tp = metrics.confusion_matrix(y_true, y_pred).ravel()
+        assert (row['tp'], row['fp'], row['tn'], row['fn']) == (tp, fp, tn, fn)
+        assert row['precision'] == pytest.approx(metrics.precision_score(y_true, y_pred, zero_division=0))
+        assert row['f1'] == pytest.approx(metrics.f1_score(y_true, y_pred, zero_division=0), abs=1e-6)
+
+
+def test_batching_does_not_change_results(scored):
+    y_true, y_score = scored
+    one_batch = stream(y_true, y_score, batch_size=len(y_true)).report()
+    streamed = stream(y_true, y_score, batch_size=7).report()
+    assert streamed['confusion'] == one_batch['confusion']
+    assert streamed['thresholds'] == one_batch['thresholds']
+    for name, value in one_batch['metrics'].items():
+        assert streamed['metrics'][name] == pytest.approx(value)
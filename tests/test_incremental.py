@@ -0,0 +1,57 @@
+"""
+select_incremental_chunks (complete_training.py): new files plus a replay sample.
+"""
+
+import pytest
+
+pytest.importorskip('tensorflow')
+
+from complete_training import select_incremental_chunks  # noqa: E402
+
+
+def chunk_index():
+    index = []
+    for i in range(10):
+        split = 'test' if i >= 8 else 'train'
+        index += [{'path': f"real/{i}.wav", 'label': 'real', 'split': split, 'index': j} for j in range(3)]
+    return index
+
+
+def test_keeps_new_files_a_replay_sample_and_the_test_split():
+    index = chunk_index()
+    selected, counts = select_incremental_chunks(index, ['real/0.wav', 'real/9.wav'], replay_ratio=1.0, seed=1)
+
+    new = [chunk for chunk in selected if chunk['path'] == 'real/0.wav']
+    test = [chunk for chunk in selected if chunk['split'] == 'test']
+    replay = [chunk for chunk in selected if chunk['split'] == 'train' and chunk['path'] != 'real/0.wav']
+    assert len(new) == 3
+    assert test == [chunk for chunk in index if chunk['split'] == 'test']
+    assert len(replay) == 3
+    assert len(selected) == len(new) + len(replay) + len(test)
+    assert counts == {'new_files': 2, 'new_train_files': 1, 'new_chunks': 3,
+                      'replay_chunks': 3, 'old_chunks': 21}
+
+
+def test_replay_ratio_scales_and_is_capped_by_the_old_data():
+    index = chunk_index()
+    _, counts = select_incremental_chunks(index, ['real/0.wav'], replay_ratio=2.0)
+    assert counts['replay_chunks'] == 6
+    _, counts = select_incremental_chunks(index, ['real/0.wav'], replay_ratio=0.0)
+    assert counts['replay_chunks'] == 0
+    _, counts = select_incremental_chunks(index, ['real/0.wav'], replay_ratio=100.0)
+    assert counts['replay_chunks'] == counts['old_chunks'] == 21
+
+
+def test_replay_sample_is_seeded():
+    index = chunk_index()
+    first, _ = select_incremental_chunks(index, ['real/0.wav'], seed=1)
+    assert select_incremental_chunks(index, ['real/0.wav'], seed=1)[0] == first
+    assert any(select_incremental_chunks(index, ['real/0.wav'], seed=seed)[0] != first
+               for seed in range(2, 6))
+
+
+def test_no_new_training_files_selects_nothing():
+    selected, counts = select_incremental_chunks(chunk_index(), ['real/9.wav', 'real/missing.wav'])
+    assert selected is None
+    assert counts['new_files'] == 2
+    assert counts['new_train_files'] == 0
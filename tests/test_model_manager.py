@@ -0,0 +1,155 @@
+"""
+ModelManager (utils/model_manager.py): content-based hot-swap and draining.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from utils.model_loader import load_model_metadata  # noqa: E402
+from utils.model_manager import ModelManager  # noqa: E402
+from utils.tf_mel import build_waveform_model  # noqa: E402
+from utils.weight_store import export_serving_weights  # noqa: E402
+
+
+def tiny_mel_model(seed=0):
+    tf.keras.utils.set_random_seed(seed)
+    return tf.keras.Sequential([
+        tf.keras.Input(shape=(128, 469, 1)),
+        tf.keras.layers.Conv2D(2, (3, 3), strides=(4, 4), activation='relu'),
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(1, activation='sigmoid')
+    ])
+
+
+def replace(model, path):
+    """Save next to path and move over it, as the README recommends."""
+    tmp_path = path.replace('.h5', '.tmp.h5')
+    model.save(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def test_changed_model_is_swapped_in_even_with_the_same_label(tmp_path, monkeypatch):
+    monkeypatch.setenv('MODEL_VERSION', 'v1')
+    path = str(tmp_path / 'model.h5')
+    replace(tiny_mel_model(seed=0), path)
+    manager = ModelManager(model_path=path, poll_interval=0, warmup=False)
+    assert manager.reload_if_changed()
+    first = manager.current
+
+    replace(tiny_mel_model(seed=1), path)
+    assert manager.reload_if_changed()
+    assert manager.current is not first
+    assert manager.current.version == 'v1'
+    assert manager.current.checksum != first.checksum
+    assert not np.array_equal(manager.current.model.get_weights()[0], first.model.get_weights()[0])
+
+
+def test_touched_identical_model_keeps_the_warm_instance(tmp_path):
+    path = str(tmp_path / 'model.h5')
+    replace(tiny_mel_model(), path)
+    manager = ModelManager(model_path=path, poll_interval=0, warmup=False)
+    assert manager.reload_if_changed()
+    first = manager.current
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert not manager.reload_if_changed()
+    assert manager.current is first
+    assert manager.current.source_key[1] == stat.st_mtime_ns + 10 ** 9
+
+
+def test_frontend_export_over_mel_export_is_swapped_in(tmp_path):
+    path = str(tmp_path / 'serving')
+    model = tiny_mel_model()
+    export_serving_weights(model, path)
+    manager = ModelManager(model_path=path, poll_interval=0, warmup=False)
+    assert manager.reload_if_changed()
+    assert len(manager.current.model.input_shape) == 4
+
+    export_serving_weights(build_waveform_model(model), path)
+    assert manager.reload_if_changed()
+    assert len(manager.current.model.input_shape) == 2
+
+
+def test_directory_changed_in_place_is_detected(tmp_path, monkeypatch):
+    monkeypatch.setenv('MODEL_VERSION', 'fixed')
+    directory = tmp_path / 'saved_model'
+    (directory / 'variables').mkdir(parents=True)
+    (directory / 'saved_model.pb').write_bytes(b'graph')
+    variables = directory / 'variables' / 'variables.data'
+    variables.write_bytes(b'weights v1')
+    manager = ModelManager(model_path=str(directory), poll_interval=0, warmup=False)
+    key, metadata = manager._source_key(), load_model_metadata(str(directory))
+
+    variables.write_bytes(b'weights v2!')
+    assert manager._source_key() != key
+    changed = load_model_metadata(str(directory))
+    assert changed['model_version'] == metadata['model_version'] == 'fixed'
+    assert changed['checksum'] != metadata['checksum']
+
+
+def test_swap_waits_for_requests_on_the_old_version(tmp_path):
+    path = str(tmp_path / 'model.h5')
+    replace(tiny_mel_model(seed=0), path)
+    manager = ModelManager(model_path=path, poll_interval=0, warmup=False, drain_timeout=10)
+    manager.reload_if_changed()
+
+    swapped = threading.Event()
+    with manager.acquire() as old:
+        replace(tiny_mel_model(seed=1), path)
+        reloader = threading.Thread(target=lambda: swapped.set() if manager.reload_if_changed() else None)
+        reloader.start()
+        for _ in range(500):
+            if manager.current is not old:
+                break
+            reloader.join(0.01)
+        # New requests get the new version while this one finishes on the old
+        assert manager.current is not old
+        with manager.acquire() as new:
+            assert new is manager.current
+        assert old.in_flight == 1
+        assert reloader.is_alive()  # still draining
+        assert not old.drain(timeout=0.01)
+    reloader.join(5)
+    assert swapped.is_set()
+    assert old.in_flight == 0
+
+
+def test_predict_keeps_the_input_format_of_the_pinned_version(tmp_path, monkeypatch):
+    from api import app as api
+    from utils.audio_processor import synthesize_wav_bytes
+
+    path = str(tmp_path / 'serving')
+    model = tiny_mel_model()
+    export_serving_weights(model, path, model_version='mel')
+    manager = ModelManager(model_path=path, poll_interval=0, warmup=False, drain_timeout=10)
+    manager.reload_if_changed()
+    monkeypatch.setattr(api, 'model_manager', manager)
+
+    preprocess = api.preprocess_audio_for_prediction
+    reloader = threading.Thread(target=manager.reload_if_changed)
+
+    def preprocess_during_swap(*args, **kwargs):
+        # A frontend export lands after the request picked its input format
+        export_serving_weights(build_waveform_model(model), path, model_version='waveform')
+        reloader.start()
+        for _ in range(500):
+            if manager.current.version == 'waveform':
+                break
+            reloader.join(0.01)
+        return preprocess(*args, **kwargs)
+
+    monkeypatch.setattr(api, 'preprocess_audio_for_prediction', preprocess_during_swap)
+    audio_path = tmp_path / 'clip.wav'
+    audio_path.write_bytes(synthesize_wav_bytes())
+    response = api.app.test_client().post('/predict', json={'audio_path': str(audio_path)})
+    reloader.join(5)
+
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['model_version'] == 'mel'
+    assert manager.current.version == 'waveform'
@@ -0,0 +1,88 @@
+"""
+ShadowEvaluator with shadow models that take a different input than the primary.
+"""
+
+import os
+
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from utils.audio_processor import preprocess_audio_for_prediction, synthesize_wav_bytes  # noqa: E402
+from utils.database import InMemoryPredictionLogger  # noqa: E402
+from utils.model_manager import ModelManager  # noqa: E402
+from utils.shadow import ShadowEvaluator  # noqa: E402
+from utils.tf_mel import build_waveform_model  # noqa: E402
+from utils.weight_store import export_serving_weights  # noqa: E402
+
+
+def tiny_mel_model():
+    tf.keras.utils.set_random_seed(0)
+    return tf.keras.Sequential([
+        tf.keras.Input(shape=(128, 469, 1)),
+        tf.keras.layers.Conv2D(2, (3, 3), strides=(4, 4), activation='relu'),
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(1, activation='sigmoid')
+    ])
+
+
+def load_manager(path):
+    manager = ModelManager(model_path=path, poll_interval=0, warmup=False)
+    manager.reload_if_changed()
+    return manager
+
+
+@pytest.fixture(scope='module')
+def managers(tmp_path_factory):
+    """A mel-spectrogram model and the same model with the in-graph frontend."""
+    directory = tmp_path_factory.mktemp('shadow_models')
+    mel_model = tiny_mel_model()
+    mel_path = os.path.join(directory, 'mel.h5')
+    mel_model.save(mel_path)
+    waveform_path = os.path.join(directory, 'waveform')
+    export_serving_weights(build_waveform_model(mel_model), waveform_path, model_version='waveform')
+    return {'mel': load_manager(mel_path), 'waveform': load_manager(waveform_path)}
+
+
+@pytest.fixture(scope='module')
+def inputs():
+    """(mel batch, waveform batch) for one synthetic clip."""
+    return preprocess_audio_for_prediction(synthesize_wav_bytes(duration=15.0), return_waveform=True)
+
+
+def evaluate(managers, waveform, mel_spectrogram, primary_probability=0.5):
+    db_logger = InMemoryPredictionLogger()
+    prediction_id = db_logger.log_prediction('clip.wav', primary_probability, 'real', 0.1)
+    evaluator = ShadowEvaluator(managers, db_logger=db_logger)
+    assert evaluator.submit(prediction_id, waveform, mel_spectrogram, primary_probability, 'real')
+    evaluator._queue.join()
+    return evaluator.summary(), db_logger.get_recent_predictions(1)[0]
+
+
+def test_mel_primary_with_waveform_shadow(managers, inputs):
+    mel_spectrogram, waveform = inputs
+    summary, document = evaluate({'waveform': managers['waveform']}, waveform, mel_spectrogram)
+
+    stats = summary['shadows']['waveform']
+    assert stats['errors'] == 0
+    assert stats['compared'] == 1
+    assert [shadow['name'] for shadow in document['shadow_predictions']] == ['waveform']
+
+
+def test_waveform_primary_with_mel_shadow(managers, inputs):
+    _, waveform = inputs
+    summary, document = evaluate({'mel': managers['mel']}, waveform, None)
+
+    assert summary['shadows']['mel']['errors'] == 0
+    assert summary['shadows']['mel']['compared'] == 1
+    assert len(document['shadow_predictions']) == 1
+
+
+def test_shadow_inputs_score_alike(managers, inputs):
+    """The TF frontend path and the librosa path give the same model nearly the same score."""
+    mel_spectrogram, waveform = inputs
+    _, document = evaluate(managers, waveform, mel_spectrogram)
+
+    scores = {shadow['name']: shadow['probability'] for shadow in document['shadow_predictions']}
+    assert set(scores) == {'mel', 'waveform'}
+    assert scores['mel'] == pytest.approx(scores['waveform'], abs=0.02)
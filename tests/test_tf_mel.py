@@ -0,0 +1,57 @@
+"""
+The TF mel frontend (utils/tf_mel.py) against librosa, which the API uses.
+"""
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+librosa = pytest.importorskip('librosa')
+
+from utils.tf_mel import (  # noqa: E402
+    WAVEFORM_LENGTH,
+    MelSpectrogram,
+    mel_filterbank,
+    mel_spectrogram,
+)
+
+
+def librosa_mel(wav):
+    return librosa.feature.melspectrogram(y=wav, sr=16000, n_mels=128, fmax=8000)
+
+
+@pytest.fixture(scope='module')
+def waveforms():
+    """A tone plus noise, white noise, and a clip zero-padded to 15 s."""
+    rng = np.random.default_rng(0)
+    t = np.arange(WAVEFORM_LENGTH) / 16000
+    tone = 0.3 * np.sin(2 * np.pi * 440.0 * t) + 0.05 * rng.standard_normal(WAVEFORM_LENGTH)
+    noise = 0.1 * rng.standard_normal(WAVEFORM_LENGTH)
+    padded = np.zeros(WAVEFORM_LENGTH)
+    padded[:16000 * 4] = tone[:16000 * 4]
+    return np.stack([tone, noise, padded]).astype(np.float32)
+
+
+def test_filterbank_matches_librosa():
+    expected = librosa.filters.mel(sr=16000, n_fft=2048, n_mels=128, fmax=8000)
+    np.testing.assert_allclose(mel_filterbank(), expected, rtol=1e-5, atol=1e-8)
+
+
+def test_mel_spectrogram_matches_librosa(waveforms):
+    for wav in waveforms:
+        expected = librosa_mel(wav)
+        actual = mel_spectrogram(wav).numpy()
+        assert actual.shape == expected.shape == (128, 469)
+        # float32 STFT vs librosa's: compare relative to each clip's energy
+        np.testing.assert_allclose(actual, expected, rtol=1e-3, atol=1e-5 * expected.max())
+
+
+def test_batched_matches_single(waveforms):
+    batched = mel_spectrogram(waveforms).numpy()
+    for wav, mel in zip(waveforms, batched):
+        np.testing.assert_allclose(mel, mel_spectrogram(wav).numpy(), rtol=1e-5, atol=1e-6)
+
+
+def test_layer_output_is_model_input(waveforms):
+    outputs = MelSpectrogram()(tf.constant(waveforms))
+    assert tuple(outputs.shape) == (len(waveforms), 128, 469, 1)
@@ -0,0 +1,80 @@
+"""
+Serving weight artifacts (utils/weight_store.py): round trip and checksums.
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from utils.tf_mel import build_waveform_model  # noqa: E402
+from utils.weight_store import (  # noqa: E402
+    ALIGNMENT,
+    export_serving_weights,
+    load_serving_weights,
+    map_weights,
+    read_manifest,
+)
+
+
+def tiny_mel_model(seed=0):
+    tf.keras.utils.set_random_seed(seed)
+    return tf.keras.Sequential([
+        tf.keras.Input(shape=(128, 469, 1)),
+        tf.keras.layers.Conv2D(2, (3, 3), strides=(4, 4), activation='relu'),
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(1, activation='sigmoid')
+    ])
+
+
+def test_round_trip_maps_aligned_read_only_weights(tmp_path):
+    model = tiny_mel_model()
+    manifest = export_serving_weights(model, str(tmp_path))
+
+    weights = map_weights(str(tmp_path))
+    for original, mapped in zip(model.get_weights(), weights):
+        np.testing.assert_array_equal(original, mapped)
+        assert not mapped.flags.writeable
+    assert all(tensor['offset'] % ALIGNMENT == 0 for tensor in manifest['tensors'])
+
+    loaded, loaded_manifest = load_serving_weights(str(tmp_path), verify_checksum=True)
+    x = np.random.default_rng(0).random((2, 128, 469, 1), dtype=np.float32)
+    np.testing.assert_allclose(loaded.predict(x, verbose=0), model.predict(x, verbose=0), rtol=1e-6)
+    assert loaded_manifest['model_version'] == manifest['checksum'].split(':', 1)[1][:12]
+
+
+def test_checksum_detects_changed_weights_and_manifest(tmp_path):
+    export_serving_weights(tiny_mel_model(), str(tmp_path))
+    weights_path = os.path.join(str(tmp_path), 'weights.bin')
+    with open(weights_path, 'r+b') as f:
+        f.write(b'\xff\xff\xff\xff')
+    with pytest.raises(ValueError, match='Checksum mismatch'):
+        load_serving_weights(str(tmp_path), verify_checksum=True)
+
+    export_serving_weights(tiny_mel_model(), str(tmp_path))
+    manifest = read_manifest(str(tmp_path))
+    manifest['tensors'][0]['shape'] = list(reversed(manifest['tensors'][0]['shape']))
+    with open(os.path.join(str(tmp_path), 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+    with pytest.raises(ValueError, match='Checksum mismatch'):
+        load_serving_weights(str(tmp_path), verify_checksum=True)
+
+
+def test_version_follows_architecture_and_weights(tmp_path):
+    model = tiny_mel_model()
+    mel = export_serving_weights(model, str(tmp_path / 'mel'))
+    again = export_serving_weights(model, str(tmp_path / 'again'))
+    assert again['checksum'] == mel['checksum']
+    assert again['model_version'] == mel['model_version']
+
+    # The frontend adds no weights, but the artifact now takes waveforms
+    waveform = export_serving_weights(build_waveform_model(model), str(tmp_path / 'mel'))
+    assert waveform['weights_checksum'] == mel['weights_checksum']
+    assert waveform['checksum'] != mel['checksum']
+    assert waveform['model_version'] != mel['model_version']
+
+    retrained = export_serving_weights(tiny_mel_model(seed=1), str(tmp_path / 'retrained'))
+    assert retrained['checksum'] != mel['checksum']
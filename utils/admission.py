@@ -0,0 +1,208 @@
+"""
+Admission control for /predict.
+
+At most max_concurrency requests run preprocessing and inference at once;
+the rest wait in a bounded queue per priority lane. A request that finds
+its lane's queue full is rejected at once (429 with Retry-After) instead of
+tying up a server thread, and a request whose deadline passes while it
+waits, or before inference starts, is dropped (503): its client has given
+up, so the work would be wasted.
+
+Lanes, in priority order:
+- interactive: uploads from the web UI (X-Request-Priority: interactive).
+  Served first whenever a slot frees up.
+- batch: everything else, including clients that send no priority header
+  (bulk scoring, backfills, existing integrations). Can use every slot by
+  default, so unlabelled traffic keeps the full capacity; set
+  batch_concurrency below max_concurrency to keep slots free for
+  interactive requests even when a backfill keeps the batch queue full.
+"""
+
+import collections
+import math
+import threading
+import time
+from typing import Dict, Optional
+
+from utils.metrics import ADMISSION_QUEUE_DEPTH, ADMISSION_SHED
+
+LANES = ('interactive', 'batch')  # priority order
+DEFAULT_LANE = 'batch'
+PRIORITY_HEADER = 'X-Request-Priority'
+DEADLINE_HEADER = 'X-Request-Deadline-Ms'  # time budget from arrival, in ms
+
+
+class AdmissionRejected(Exception):
+    """A request was not admitted (queue full) or dropped (deadline passed)."""
+
+    def __init__(self, reason: str, status: int, retry_after: int, message: str):
+        super().__init__(message)
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+        self.message = message
+
+
+class Ticket:
+    """An admitted request's slot: lane, deadline and queueing time."""
+
+    def __init__(self, lane: str, arrival: float, deadline: float):
+        self.lane = lane
+        self.arrival = arrival
+        self.deadline = deadline
+        self.admitted = time.monotonic()
+
+    @property
+    def wait(self) -> float:
+        """Seconds spent queued before admission."""
+        return self.admitted - self.arrival
+
+    def expired(self) -> bool:
+        """Whether the client's deadline has passed."""
+        return time.monotonic() >= self.deadline
+
+
+class AdmissionController:
+    """Bounded, prioritized admission of /predict requests (one per process)."""
+
+    def __init__(self,
+                 max_concurrency: int = 2,
+                 max_queue: Optional[Dict[str, int]] = None,
+                 batch_concurrency: Optional[int] = None,
+                 default_timeout: float = 30.0):
+        """
+        Args:
+            max_concurrency: Requests processed at once
+            max_queue: Lane -> requests allowed to wait (default interactive 4, batch 8)
+            batch_concurrency: Slots the batch lane may use (default
+                               max_concurrency)
+            default_timeout: Deadline in seconds for requests without a
+                             deadline header (e.g. the load balancer's timeout)
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = {'interactive': 4, 'batch': 8, **(max_queue or {})}
+        self.lane_concurrency = {
+            'interactive': max_concurrency,
+            'batch': max_concurrency if batch_concurrency is None
+            else max(1, min(max_concurrency, batch_concurrency))
+        }
+        self.default_timeout = default_timeout
+        self._cond = threading.Condition()
+        self._queues = {lane: collections.deque() for lane in LANES}
+        self._running = {lane: 0 for lane in LANES}
+        # Moving average of a request's time in a slot, for Retry-After
+        self._service_time = 1.0
+
+    def lane_for(self, headers) -> str:
+        """Lane requested by the priority header (default batch). Raises ValueError if unknown."""
+        lane = headers.get(PRIORITY_HEADER, DEFAULT_LANE).strip().lower() or DEFAULT_LANE
+        if lane not in LANES:
+            raise ValueError(f"{PRIORITY_HEADER} must be one of {', '.join(LANES)}, got {lane!r}")
+        return lane
+
+    def deadline_for(self, headers, arrival: Optional[float] = None) -> float:
+        """Absolute (monotonic) deadline from the deadline header. Raises ValueError if invalid."""
+        arrival = time.monotonic() if arrival is None else arrival
+        value = headers.get(DEADLINE_HEADER)
+        if value is None:
+            return arrival + self.default_timeout
+        try:
+            budget_ms = float(value)
+        except ValueError:
+            raise ValueError(f"{DEADLINE_HEADER} must be a number of milliseconds, got {value!r}")
+        if not budget_ms > 0:
+            raise ValueError(f"{DEADLINE_HEADER} must be positive, got {value!r}")
+        return arrival + budget_ms / 1000
+
+    def _can_run(self, waiter) -> bool:
+        """Whether waiter is next in line and a slot is free for its lane."""
+        if sum(self._running.values()) >= self.max_concurrency:
+            return False
+        for lane in LANES:
+            waiting = self._queues[lane]
+            if waiting and self._running[lane] < self.lane_concurrency[lane]:
+                return waiting[0] is waiter
+        return False
+
+    def _update_gauge(self, lane: str):
+        ADMISSION_QUEUE_DEPTH.labels(lane).set(len(self._queues[lane]))
+
+    def retry_after(self) -> int:
+        """Seconds after which the backlog should have drained (at least 1)."""
+        backlog = sum(self._running.values()) + sum(len(waiting) for waiting in self._queues.values())
+        return max(1, math.ceil(self._service_time * backlog / self.max_concurrency))
+
+    def _reject(self, lane: str, reason: str) -> AdmissionRejected:
+        ADMISSION_SHED.labels(lane, reason).inc()
+        if reason == 'queue_full':
+            return AdmissionRejected(reason, 429, self.retry_after(),
+                                     f'Server busy: the {lane} queue is full. Please retry later.')
+        return AdmissionRejected(reason, 503, self.retry_after(),
+                                 'Request deadline passed before the prediction could run.')
+
+    def admit(self, lane: str, deadline: float, arrival: Optional[float] = None) -> Ticket:
+        """
+        Wait for a processing slot.
+
+        Args:
+            lane: 'interactive' or 'batch'
+            deadline: Monotonic time after which the request is dropped
+            arrival: Monotonic arrival time (default now)
+
+        Returns:
+            Ticket, to be passed to release() when the request is done
+
+        Raises:
+            AdmissionRejected: The lane's queue is full, or the deadline
+                               passed while waiting
+        """
+        arrival = time.monotonic() if arrival is None else arrival
+        waiter = object()
+        with self._cond:
+            waiting = self._queues[lane]
+            waiting.append(waiter)
+            if not self._can_run(waiter) and len(waiting) > self.max_queue[lane]:
+                waiting.remove(waiter)
+                raise self._reject(lane, 'queue_full')
+            self._update_gauge(lane)
+            while not self._can_run(waiter):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    waiting.remove(waiter)
+                    self._update_gauge(lane)
+                    self._cond.notify_all()  # the head of the line may have changed
+                    raise self._reject(lane, 'deadline')
+                self._cond.wait(remaining)
+            waiting.popleft()
+            self._running[lane] += 1
+            self._update_gauge(lane)
+            self._cond.notify_all()  # another lane may still have a free slot
+        return Ticket(lane, arrival, deadline)
+
+    def expired(self, ticket: Ticket) -> AdmissionRejected:
+        """The rejection for an admitted request whose deadline passed (counts it as shed)."""
+        return self._reject(ticket.lane, 'deadline')
+
+    def release(self, ticket: Ticket):
+        """Free an admitted request's slot."""
+        with self._cond:
+            self._running[ticket.lane] -= 1
+            elapsed = time.monotonic() - ticket.admitted
+            self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+            self._cond.notify_all()
+
+    def queued(self) -> int:
+        """Requests waiting for a slot, across lanes."""
+        with self._cond:
+            return sum(len(waiting) for waiting in self._queues.values())
+
+    def stats(self) -> Dict:
+        """Running and queued requests per lane, and the limits."""
+        with self._cond:
+            return {
+                'running': dict(self._running),
+                'queued': {lane: len(waiting) for lane, waiting in self._queues.items()},
+                'max_concurrency': self.max_concurrency,
+                'lane_concurrency': dict(self.lane_concurrency),
+                'max_queue': dict(self.max_queue)
+            }
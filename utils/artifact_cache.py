@@ -0,0 +1,266 @@
+"""
+Local cache of MLflow registry model artifacts for serving.
+
+Downloaded model versions are stored by content checksum, so identical
+artifacts registered under several versions are kept once. Each
+download is exported as a memory-mappable serving artifact (see
+utils.weight_store) and only that export is kept, so a cached version
+takes about the size of its weights; later loads, from any process on
+the host, map those weights instead of downloading and deserializing the
+model again.
+
+Layout:
+    <root>/refs/<name>/<version>.json   registry version -> checksum
+    <root>/blobs/<hex>/serving/         serving artifact exported from the
+                                        MLflow model (checksum <hex>)
+    <root>/locks/                       download and eviction locks
+
+Downloads of one version are serialized with a file lock, so concurrent
+workers download it once. Blobs are evicted least recently used first
+when the cache grows beyond max_bytes; blobs being loaded hold a shared
+lock and are never evicted.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from utils.metrics import MODEL_CACHE_LOOKUPS
+from utils.weight_store import export_serving_weights
+
+DEFAULT_CACHE_DIR = 'model_cache'
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+CHECKSUM_TAG = 'checksum'
+
+# Added to downloads by MLflow, so not part of the registered content
+_IGNORED_FILES = ('registered_model_meta',)
+
+
+def compute_tree_checksum(directory: str) -> str:
+    """
+    SHA-256 checksum of a directory's relative file paths and contents.
+
+    Returns:
+        checksum: String of the form 'sha256:<hex digest>'
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, directory)
+            if relative in _IGNORED_FILES:
+                continue
+            digest.update(relative.replace(os.sep, '/').encode('utf-8') + b'\0')
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(8 * 1024 * 1024), b''):
+                    digest.update(block)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def _tree_size(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, files in os.walk(directory) for name in files)
+
+
+class RegistryArtifactCache:
+    """Content-addressed, size-bounded cache of registry model versions shared by local processes."""
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            root: Cache directory (default: MODEL_CACHE_DIR or 'model_cache')
+            max_bytes: Size limit for cached blobs (default: MODEL_CACHE_MAX_MB or 2 GiB)
+        """
+        self.root = root or os.getenv('MODEL_CACHE_DIR') or DEFAULT_CACHE_DIR
+        if max_bytes is None:
+            max_mb = os.getenv('MODEL_CACHE_MAX_MB')
+            max_bytes = int(float(max_mb) * 1024 ** 2) if max_mb else DEFAULT_MAX_BYTES
+        self.max_bytes = max_bytes
+        for name in ('refs', 'blobs', 'locks', 'tmp'):
+            os.makedirs(os.path.join(self.root, name), exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Paths and locks
+    # ------------------------------------------------------------------
+
+    def _ref_path(self, name: str, version: str) -> str:
+        return os.path.join(self.root, 'refs', name, f"{version}.json")
+
+    def blob_path(self, checksum: str) -> str:
+        """Blob directory of a checksum."""
+        return os.path.join(self.root, 'blobs', checksum.split(':', 1)[-1])
+
+    @contextmanager
+    def _lock(self, name: str, shared: bool = False, blocking: bool = True):
+        """flock on <root>/locks/<name>.lock; yields False if non-blocking and busy."""
+        with open(os.path.join(self.root, 'locks', f"{name}.lock"), 'w') as lock_file:
+            flags = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            try:
+                fcntl.flock(lock_file, flags if blocking else flags | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def lookup(self, name: str, version: str) -> Optional[Dict]:
+        """The cached entry of a version (checksum, size, paths), or None."""
+        try:
+            with open(self._ref_path(name, version)) as f:
+                ref = json.load(f)
+        except (OSError, ValueError):
+            return None
+        blob = self.blob_path(ref['checksum'])
+        if not os.path.exists(os.path.join(blob, 'serving', 'manifest.json')):
+            return None
+        return {**ref, 'serving_dir': os.path.join(blob, 'serving')}
+
+    def _registry_checksum(self, name: str, version: str) -> Optional[str]:
+        """Checksum tag of a registered version, if the registry is reachable and has one."""
+        from mlflow.tracking import MlflowClient
+
+        try:
+            return MlflowClient().get_model_version(name, version).tags.get(CHECKSUM_TAG)
+        except Exception:
+            return None
+
+    @contextmanager
+    def open(self, name: str, version: str, verify: bool = True):
+        """
+        Pin a cached version for loading, downloading it first if needed.
+
+        While the context is open, the blob holds a shared lock and cannot
+        be evicted by other processes.
+
+        Args:
+            name: Registered model name
+            version: Concrete version number
+            verify: Compare with the registry's checksum tag (when the
+                    registry is reachable) and download again on mismatch
+
+        Yields:
+            Entry dict with checksum and serving_dir
+        """
+        expected = self._registry_checksum(name, version) if verify else None
+        for _attempt in range(3):
+            entry = self.lookup(name, version)
+            if entry is None or (expected and entry['checksum'] != expected):
+                MODEL_CACHE_LOOKUPS.labels('miss').inc()
+                entry = self._download(name, version, expected)
+            else:
+                MODEL_CACHE_LOOKUPS.labels('hit').inc()
+            with self._lock(f"blob-{entry['checksum'].split(':', 1)[-1]}", shared=True):
+                # Otherwise evicted between lookup and lock: try again
+                if os.path.exists(os.path.join(entry['serving_dir'], 'manifest.json')):
+                    self._touch(entry)
+                    yield entry
+                    return
+        raise RuntimeError(f"Could not pin models:/{name}/{version} in the model cache {self.root}")
+
+    def _touch(self, entry: Dict):
+        """Mark a blob as recently used (for LRU eviction)."""
+        os.utime(os.path.dirname(entry['serving_dir']), None)
+
+    # ------------------------------------------------------------------
+    # Download and eviction
+    # ------------------------------------------------------------------
+
+    def _download(self, name: str, version: str, expected: Optional[str] = None) -> Dict:
+        """Download, export and register one version (once across processes)."""
+        import mlflow
+
+        with self._lock(f"ref-{name}-{version}"):
+            # Another process may have finished the download while we waited
+            entry = self.lookup(name, version)
+            if entry is not None and (not expected or entry['checksum'] == expected):
+                return entry
+
+            uri = f"models:/{name}/{version}"
+            print(f"Downloading {uri} into the model cache {self.root}...")
+            start = time.perf_counter()
+            staging = tempfile.mkdtemp(prefix=f"{name}-{version}-", dir=os.path.join(self.root, 'tmp'))
+            try:
+                model_dir = mlflow.artifacts.download_artifacts(artifact_uri=uri,
+                                                                dst_path=os.path.join(staging, 'model'))
+                checksum = compute_tree_checksum(model_dir)
+                if expected and checksum != expected:
+                    raise ValueError(f"Checksum mismatch for {uri}: registry has {expected}, "
+                                     f"downloaded {checksum}")
+
+                blob = self.blob_path(checksum)
+                with self._lock(f"blob-{checksum.split(':', 1)[-1]}"):
+                    if not os.path.exists(os.path.join(blob, 'serving', 'manifest.json')):
+                        import mlflow.keras
+                        import utils.tf_mel  # noqa: F401  registers the MelSpectrogram layer
+
+                        model = mlflow.keras.load_model(model_dir)
+                        export_serving_weights(model, os.path.join(staging, 'serving'),
+                                               model_version=f"{name}:{version}")
+                        # Serving only reads the export; keeping the MLflow
+                        # copy too would double every version's footprint
+                        shutil.rmtree(os.path.join(staging, 'model'))
+                        shutil.rmtree(blob, ignore_errors=True)
+                        os.replace(staging, blob)
+                        staging = None
+
+                ref = {'name': name, 'version': str(version), 'checksum': checksum,
+                       'size': _tree_size(blob), 'cached_at': time.time()}
+                ref_path = self._ref_path(name, version)
+                os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+                tmp_path = f"{ref_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(ref, f, indent=2)
+                os.replace(tmp_path, ref_path)
+            finally:
+                if staging:
+                    shutil.rmtree(staging, ignore_errors=True)
+            print(f"  Cached {uri} ({ref['size'] / 2 ** 20:.1f} MB, {checksum[:19]}) "
+                  f"in {time.perf_counter() - start:.1f}s")
+
+        self.evict(keep=checksum)
+        return self.lookup(name, version)
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Delete least recently used blobs until the cache fits max_bytes.
+
+        Blobs pinned by open() in any process, and `keep`, are skipped.
+
+        Returns:
+            Number of bytes freed
+        """
+        blobs_dir = os.path.join(self.root, 'blobs')
+        keep = keep.split(':', 1)[-1] if keep else None
+        with self._lock('evict'):
+            blobs = []
+            for digest in os.listdir(blobs_dir):
+                path = os.path.join(blobs_dir, digest)
+                blobs.append((os.stat(path).st_mtime, digest, _tree_size(path)))
+            total = sum(size for _, _, size in blobs)
+            freed = 0
+            for _, digest, size in sorted(blobs):
+                if total - freed <= self.max_bytes:
+                    break
+                if digest == keep:
+                    continue
+                with self._lock(f"blob-{digest}", blocking=False) as acquired:
+                    if not acquired:
+                        continue
+                    shutil.rmtree(os.path.join(blobs_dir, digest), ignore_errors=True)
+                    freed += size
+                    print(f"  Evicted cached model blob {digest[:12]} ({size / 2 ** 20:.1f} MB)")
+            # Refs to evicted blobs are dangling; lookup() treats them as misses
+        return freed
@@ -3,53 +3,42 @@ Audio preprocessing utilities for AuralGuard model.
 Extracts mel-spectrograms from audio files for CNN input.
 """
 
-import tensorflow as tf
-import tensorflow_io as tfio
-import librosa
+import io
+import time
+import wave
+
 import numpy as np
 
+# tensorflow and librosa are imported inside the functions that
+# need them so that importing this module (and api/app.py) stays cheap.
 
-def load_wav_16k_mono(filename):
-    """
-    Load audio file and convert to 16kHz mono waveform.
-    
-    Args:
-        filename: Path to audio file (string or tensor)
-    
-    Returns:
-        wav: TensorFlow tensor of audio waveform at 16kHz mono
-    """
-    # Handle both string paths and tensor paths
-    if isinstance(filename, str):
-        wav = tf.io.read_file(filename)
-    else:
-        wav = tf.io.read_file(filename)
-    
-    # Decode waveform from file contents. Channel 1 for mono audio.
-    wav, sr = tf.audio.decode_wav(wav, desired_channels=1)
-    
-    # Remove trailing axis
-    wav = tf.squeeze(wav, axis=1)
-    
-    # Change dtype of sampling rate
-    sr = tf.cast(sr, dtype=tf.int64)
-    
-    # Resample to 16kHz
-    wav = tfio.audio.resample(wav, rate_in=sr, rate_out=16000)
-    
+
+def _decode_16k(path, timings=None):
+    """Decode at the native sample rate, then resample to 16kHz (as librosa.load(sr=16000) does)."""
+    import librosa
+
+    start = time.perf_counter()
+    wav, sample_rate = librosa.load(path, sr=None, mono=True)
+    decoded = time.perf_counter()
+    if sample_rate != 16000:
+        wav = librosa.resample(wav, orig_sr=sample_rate, target_sr=16000)
+    if timings is not None:
+        timings['decode'] = decoded - start
+        timings['resample'] = time.perf_counter() - decoded
     return wav
 
 
-def audio_to_mel_spectrogram(audio_path, max_length=240000):
+def load_audio_16k(audio_path, max_length=240000, timings=None):
     """
-    Convert audio file to mel-spectrogram for model input.
+    Decode audio to a fixed-length 16kHz mono waveform.
     
     Args:
-        audio_path: Path to audio file (string or bytes)
-        max_length: Maximum length of waveform (default: 240000 for 15 seconds at 16kHz)
+        audio_path: Path to audio file (string, tensor or bytes)
+        max_length: Length of the returned waveform (default: 240000 for 15 seconds at 16kHz)
+        timings: Dict to record 'decode' and 'resample' seconds in
     
     Returns:
-        mel_spectrogram: TensorFlow tensor of shape (128, 469, 1)
+        wav: numpy array of shape (max_length,), truncated or zero-padded
     """
     # Handle both string and bytes input (for Flask file uploads)
     if isinstance(audio_path, bytes):
@@ -61,14 +50,14 @@ def audio_to_mel_spectrogram(audio_path, max_length=240000):
             tmp_path = tmp_file.name
         
         try:
-            wav, samp_rate = librosa.load(tmp_path, sr=16000, mono=True)
+            wav = _decode_16k(tmp_path, timings)
         finally:
             os.unlink(tmp_path)
     else:
         # Handle string path
-        if isinstance(audio_path, tf.Tensor):
+        if hasattr(audio_path, 'numpy'):
             audio_path = audio_path.numpy().decode('utf-8')
-        wav, samp_rate = librosa.load(audio_path, sr=16000, mono=True)
+        wav = _decode_16k(audio_path, timings)
     
     # Truncate or pad to max_length
     if len(wav) > max_length:
@@ -78,10 +67,29 @@ def audio_to_mel_spectrogram(audio_path, max_length=240000):
         padding = np.zeros(max_length - len(wav))
         wav = np.concatenate([wav, padding])
     
+    return wav
+
+
+def waveform_to_mel_spectrogram(wav, timings=None):
+    """
+    Compute the model's mel-spectrogram input from a 16kHz waveform.
+    
+    Args:
+        wav: numpy array of shape (240000,), as returned by load_audio_16k
+        timings: Dict to record 'mel' seconds in
+    
+    Returns:
+        mel_spectrogram: TensorFlow tensor of shape (128, 469, 1)
+    """
+    import tensorflow as tf
+    import librosa
+
+    start = time.perf_counter()
+    
     # Generate mel-spectrogram
     mel_spectrogram = librosa.feature.melspectrogram(
         y=wav, 
-        sr=samp_rate, 
+        sr=16000, 
         n_mels=128, 
         fmax=8000
     )
@@ -89,22 +97,123 @@ def audio_to_mel_spectrogram(audio_path, max_length=240000):
     # Convert to tensor and add channel dimension
     mel_spectrogram_tf = tf.convert_to_tensor(mel_spectrogram, dtype=tf.float32)
     mel_spectrogram_tf = tf.expand_dims(mel_spectrogram_tf, axis=2)
+    if timings is not None:
+        timings['mel'] = time.perf_counter() - start
     
     return mel_spectrogram_tf
 
 
-def preprocess_audio_for_prediction(audio_path):
+def audio_to_mel_spectrogram(audio_path, max_length=240000, timings=None):
+    """
+    Convert audio file to mel-spectrogram for model input.
+    
+    Args:
+        audio_path: Path to audio file (string or bytes)
+        max_length: Maximum length of waveform (default: 240000 for 15 seconds at 16kHz)
+        timings: Dict to record 'decode', 'resample' and 'mel' seconds in
+    
+    Returns:
+        mel_spectrogram: TensorFlow tensor of shape (128, 469, 1)
+    """
+    wav = load_audio_16k(audio_path, max_length=max_length, timings=timings)
+    return waveform_to_mel_spectrogram(wav, timings=timings)
+
+
+def preprocess_audio_for_prediction(audio_path, waveform=False, timings=None, return_waveform=False):
     """
     Complete preprocessing pipeline for prediction.
     
     Args:
         audio_path: Path to audio file or bytes
+        waveform: Return the 16kHz waveform instead of the mel-spectrogram,
+                  for models with the in-graph mel frontend (utils.tf_mel)
+        timings: Dict to record stage seconds in ('decode', 'resample' and,
+                 unless waveform=True, 'mel')
+        return_waveform: Also return the waveform batch, e.g. for shadow
+                         models that take a different input than the primary
     
     Returns:
-        mel_spectrogram: Preprocessed mel-spectrogram ready for model input
+        model_input: Batch of one mel-spectrogram (1, 128, 469, 1),
+                     or of one waveform (1, 240000) if waveform=True;
+                     (model_input, waveform batch) if return_waveform=True
+    """
+    import tensorflow as tf
+
+    wav = load_audio_16k(audio_path, timings=timings)
+    wav_batch = tf.expand_dims(tf.convert_to_tensor(wav, dtype=tf.float32), axis=0)
+    if waveform:
+        model_input = wav_batch
+    else:
+        # Add batch dimension for model prediction
+        model_input = tf.expand_dims(waveform_to_mel_spectrogram(wav, timings=timings), axis=0)
+    return (model_input, wav_batch) if return_waveform else model_input
+
+
+def synthesize_wav_bytes(duration=15.0, sample_rate=16000, seed=0, frequency=220.0, noise=0.05):
+    """
+    Generate a synthetic mono 16-bit WAV file in memory.
+
+    Used to exercise the full decode -> mel -> inference path without a
+    real recording (startup profiling, warmup, benchmarks).
+
+    Args:
+        duration: Length of the clip in seconds
+        sample_rate: Sample rate of the generated audio
+        seed: Seed for the noise component
+        frequency: Frequency of the tone in Hz
+        noise: Standard deviation of the added Gaussian noise
+
+    Returns:
+        wav_bytes: Contents of a WAV file
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    signal = 0.3 * np.sin(2 * np.pi * frequency * t) + noise * rng.standard_normal(len(t))
+    pcm = (np.clip(signal, -1.0, 1.0) * 32767).astype('<i2')
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+# soundfile format name per file extension for synthesize_audio_bytes
+AUDIO_FORMATS = {'wav': 'WAV', 'flac': 'FLAC', 'mp3': 'MP3', 'ogg': 'OGG'}
+
+
+def synthesize_audio_bytes(audio_format='wav', duration=15.0, sample_rate=16000, seed=0,
+                           frequency=220.0, noise=0.05):
+    """
+    Generate a synthetic mono clip in memory in one of AUDIO_FORMATS.
+
+    Same signal as synthesize_wav_bytes; compressed formats are encoded with
+    soundfile (MP3 needs libsndfile 1.1 or newer).
+
+    Args:
+        audio_format: File extension: 'wav', 'flac', 'mp3' or 'ogg'
+        duration: Length of the clip in seconds
+        sample_rate: Sample rate of the generated audio
+        seed: Seed for the noise component
+        frequency: Frequency of the tone in Hz
+        noise: Standard deviation of the added Gaussian noise
+
+    Returns:
+        audio_bytes: Contents of an audio file
     """
-    mel_spec = audio_to_mel_spectrogram(audio_path)
-    # Add batch dimension for model prediction
-    mel_spec = tf.expand_dims(mel_spec, axis=0)
-    return mel_spec
+    if audio_format == 'wav':
+        return synthesize_wav_bytes(duration=duration, sample_rate=sample_rate, seed=seed,
+                                    frequency=frequency, noise=noise)
+    if audio_format not in AUDIO_FORMATS:
+        raise ValueError(f"Unsupported audio format '{audio_format}', expected one of {sorted(AUDIO_FORMATS)}")
+    import soundfile as sf
 
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    signal = 0.3 * np.sin(2 * np.pi * frequency * t) + noise * rng.standard_normal(len(t))
+    buffer = io.BytesIO()
+    sf.write(buffer, np.clip(signal, -1.0, 1.0).astype(np.float32), sample_rate,
+             format=AUDIO_FORMATS[audio_format])
+    return buffer.getvalue()
@@ -0,0 +1,333 @@
+"""
+Resumable training checkpoints for AuralGuard.
+
+A checkpoint is one .npz file holding the model weights, the optimizer
+variables (iteration count, Adam moments) and the epoch/step reached.
+Values are copied to host memory on the training thread and written by a
+background thread, so saving does not stall training.
+
+Checkpoints only fit the run that wrote them, so callers keep each run's
+checkpoints in their own directory (see run_directory) and clear() them
+once the trained model has been saved.
+
+Directory layout:
+    state.json          - latest checkpoints, best-k checkpoints, early
+                          stopping counters and the per-epoch history
+    latest/ckpt-<step>  - periodic (step and epoch) checkpoints
+    best/epoch-<epoch>  - the best checkpoints by the monitored metric
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+import tensorflow as tf
+
+STATE_FILE = 'state.json'
+
+
+def run_directory(checkpoint_dir: str, data_version: str, params: Dict) -> str:
+    """
+    Checkpoint directory of one training configuration.
+
+    Args:
+        checkpoint_dir: Root checkpoint directory
+        data_version: Dataset manifest fingerprint
+        params: Model and training parameters that must match to resume
+                (JSON-serializable)
+
+    Returns:
+        checkpoint_dir/<data version>-<parameter hash>
+    """
+    params_hash = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    return os.path.join(checkpoint_dir, f"{data_version[:12]}-{params_hash[:12]}")
+
+
+def _snapshot(model):
+    """Host copies of the model weights and optimizer variables."""
+    return (
+        [np.array(weight) for weight in model.get_weights()],
+        [np.array(variable) for variable in model.optimizer.variables]
+    )
+
+
+def _write_checkpoint(path, model_weights, optimizer_weights, meta):
+    """Write one checkpoint file atomically."""
+    arrays = {f"model_{i}": weight for i, weight in enumerate(model_weights)}
+    arrays.update({f"optimizer_{i}": value for i, value in enumerate(optimizer_weights)})
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, meta=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path, model):
+    """
+    Load a checkpoint into a compiled model and its optimizer.
+
+    Args:
+        path: Checkpoint file
+        model: Model with the same architecture and optimizer
+
+    Returns:
+        The checkpoint's metadata (epoch, step, logs)
+    """
+    with np.load(path) as data:
+        meta = json.loads(str(data['meta']))
+        model.set_weights([data[f"model_{i}"] for i in range(meta['model_tensors'])])
+        if not model.optimizer.built:
+            model.optimizer.build(model.trainable_variables)
+        variables = model.optimizer.variables
+        if len(variables) != meta['optimizer_tensors']:
+            raise ValueError(
+                f"Checkpoint {path} has {meta['optimizer_tensors']} optimizer variables, "
+                f"model optimizer has {len(variables)}"
+            )
+        for i, variable in enumerate(variables):
+            variable.assign(data[f"optimizer_{i}"])
+    return meta
+
+
+class TrainingCheckpointer(tf.keras.callbacks.Callback):
+    """
+    Keras callback for periodic checkpoints, best-k checkpoints and early stopping.
+
+    Call restore() before fit() to continue from the latest checkpoint (pass
+    the returned epoch as initial_epoch), and restore_best() afterwards to
+    load the best weights. The interrupted epoch of a step checkpoint is
+    rerun from its start with the restored weights and optimizer state.
+    """
+
+    def __init__(self, directory: str = 'checkpoints', save_every_steps: Optional[int] = None,
+                 keep_latest: int = 2, keep_best: int = 3, monitor: str = 'val_loss',
+                 mode: str = 'min', patience: Optional[int] = None, min_delta: float = 0.0,
+                 async_save: bool = True, is_chief: bool = True):
+        """
+        Args:
+            directory: Checkpoint directory
+            save_every_steps: Also checkpoint every N training steps (epoch ends only if None)
+            keep_latest: Periodic checkpoints to keep
+            keep_best: Best checkpoints to keep by the monitored metric
+            monitor: Metric for best-k and early stopping
+            mode: 'min' or 'max'
+            patience: Stop after this many epochs without improvement (None disables)
+            min_delta: Minimum change that counts as an improvement
+            async_save: Write checkpoints on a background thread
+            is_chief: Only the chief writes (all workers restore)
+        """
+        super().__init__()
+        if mode not in ('min', 'max'):
+            raise ValueError(f"mode must be 'min' or 'max', got {mode}")
+        self.directory = directory
+        self.save_every_steps = save_every_steps
+        self.keep_latest = keep_latest
+        self.keep_best = keep_best
+        self.monitor = monitor
+        self.mode = mode
+        self.patience = patience
+        self.min_delta = min_delta
+        self.is_chief = is_chief
+        self.state = self._load_state()
+        self._executor = ThreadPoolExecutor(max_workers=1) if async_save else None
+        self._pending = None
+        self._epoch = 0
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> Dict:
+        path = os.path.join(self.directory, STATE_FILE)
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return {'latest': [], 'best': [], 'history': {}, 'step': 0,
+                'early_stopping': {'best': None, 'wait': 0, 'stopped': False}}
+
+    def _save_state(self, state):
+        path = os.path.join(self.directory, STATE_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @property
+    def stopped_early(self) -> bool:
+        """Whether a previous run already stopped early."""
+        return self.state['early_stopping']['stopped']
+
+    def history(self) -> Dict:
+        """Per-epoch logs across all runs, including those before a resume."""
+        return {name: list(values) for name, values in self.state['history'].items()}
+
+    def clear(self):
+        """
+        Delete all checkpoints and state: before training from scratch, and
+        after a finished run so the next run does not resume from it.
+        """
+        self.wait()
+        if self.is_chief:
+            for name in ('latest', 'best', STATE_FILE):
+                path = os.path.join(self.directory, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                elif os.path.exists(path):
+                    os.remove(path)
+            if os.path.isdir(self.directory) and not os.listdir(self.directory):
+                os.rmdir(self.directory)
+        self.state = self._load_state()
+
+    # ------------------------------------------------------------------
+    # Restore
+    # ------------------------------------------------------------------
+
+    def restore(self, model) -> int:
+        """
+        Load the latest checkpoint, if any, into the model and optimizer.
+
+        Returns:
+            Epoch to resume from (0 without a checkpoint)
+        """
+        for entry in reversed(self.state['latest']):
+            path = os.path.join(self.directory, entry['path'])
+            if os.path.exists(path):
+                meta = load_checkpoint(path, model)
+                self.state['step'] = meta['step']
+                self._trim_history(meta['epoch'])
+                print(f"  Resumed from {path} (epoch {meta['epoch']}, step {meta['step']})")
+                return meta['epoch']
+        return 0
+
+    def restore_best(self, model) -> Optional[Dict]:
+        """Load the best checkpoint into the model; returns its entry or None."""
+        self.wait()
+        ranked = sorted(self.state['best'], key=lambda entry: entry['value'],
+                        reverse=self.mode == 'max')
+        for entry in ranked:
+            path = os.path.join(self.directory, entry['path'])
+            if os.path.exists(path):
+                load_checkpoint(path, model)
+                print(f"  Restored best weights from epoch {entry['epoch']} "
+                      f"({self.monitor}={entry['value']:.4f})")
+                return entry
+        return None
+
+    def _trim_history(self, epochs):
+        """Drop logs of epochs after the checkpoint being resumed from."""
+        self.state['history'] = {
+            name: values[:epochs] for name, values in self.state['history'].items()
+        }
+
+    # ------------------------------------------------------------------
+    # Saving
+    # ------------------------------------------------------------------
+
+    def _save(self, subdirectory, name, epoch, logs=None, best_value=None):
+        """Snapshot the model and queue the checkpoint write."""
+        # One write in flight at a time bounds host memory to one snapshot
+        self.wait()
+        model_weights, optimizer_weights = _snapshot(self.model)
+        meta = {
+            'epoch': epoch,
+            'step': self.state['step'],
+            'logs': {key: float(value) for key, value in (logs or {}).items()},
+            'model_tensors': len(model_weights),
+            'optimizer_tensors': len(optimizer_weights)
+        }
+        relative_path = os.path.join(subdirectory, f"{name}.npz")
+        entry = {'path': relative_path, 'epoch': epoch, 'step': self.state['step']}
+
+        if best_value is None:
+            self.state['latest'] = [e for e in self.state['latest'] if e['path'] != relative_path]
+            self.state['latest'].append(entry)
+            evicted = self.state['latest'][:-self.keep_latest] if self.keep_latest else []
+            self.state['latest'] = self.state['latest'][len(evicted):]
+        else:
+            entry['value'] = best_value
+            ranked = sorted(self.state['best'] + [entry], key=lambda e: e['value'],
+                            reverse=self.mode == 'max')
+            self.state['best'] = ranked[:self.keep_best]
+            evicted = ranked[self.keep_best:]
+            if entry in evicted:
+                return
+        state = json.loads(json.dumps(self.state))
+
+        def write():
+            os.makedirs(os.path.join(self.directory, subdirectory), exist_ok=True)
+            _write_checkpoint(os.path.join(self.directory, relative_path),
+                              model_weights, optimizer_weights, meta)
+            # Only reference the new file once it is complete
+            self._save_state(state)
+            for old in evicted:
+                old_path = os.path.join(self.directory, old['path'])
+                if old['path'] != relative_path and os.path.exists(old_path):
+                    os.remove(old_path)
+
+        if self._executor is None:
+            write()
+        else:
+            self._pending = self._executor.submit(write)
+
+    def wait(self):
+        """Block until the queued checkpoint write (if any) has finished."""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            pending.result()
+
+    def _improved(self, value, best):
+        if best is None:
+            return True
+        if self.mode == 'min':
+            return value < best - self.min_delta
+        return value > best + self.min_delta
+
+    def _is_top_k(self, value):
+        if len(self.state['best']) < self.keep_best:
+            return True
+        values = [entry['value'] for entry in self.state['best']]
+        return value < max(values) if self.mode == 'min' else value > min(values)
+
+    # ------------------------------------------------------------------
+    # Keras hooks
+    # ------------------------------------------------------------------
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch = epoch
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.state['step'] += 1
+        if self.is_chief and self.save_every_steps and self.state['step'] % self.save_every_steps == 0:
+            # Mid-epoch: resuming reruns this epoch
+            self._save('latest', f"ckpt-{self.state['step']:08d}", self._epoch, logs)
+
+    def on_epoch_end(self, epoch, logs=None):
+        logs = logs or {}
+        for name, value in logs.items():
+            self.state['history'].setdefault(name, []).append(float(value))
+
+        value = logs.get(self.monitor)
+        early_stopping = self.state['early_stopping']
+        if value is not None:
+            value = float(value)
+            if self._improved(value, early_stopping['best']):
+                early_stopping['best'] = value
+                early_stopping['wait'] = 0
+            else:
+                early_stopping['wait'] += 1
+                if self.patience is not None and early_stopping['wait'] >= self.patience:
+                    early_stopping['stopped'] = True
+                    self.model.stop_training = True
+                    print(f"\n  Early stopping: no {self.monitor} improvement "
+                          f"for {early_stopping['wait']} epochs")
+
+        if not self.is_chief:
+            return
+        self._save('latest', f"ckpt-{self.state['step']:08d}", epoch + 1, logs)
+        if value is not None and self.keep_best and self._is_top_k(value):
+            self._save('best', f"epoch-{epoch + 1:04d}", epoch + 1, logs, best_value=value)
+
+    def on_train_end(self, logs=None):
+        self.wait()
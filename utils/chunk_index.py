@@ -0,0 +1,162 @@
+"""
+Virtual chunk index for AuralGuard training.
+Describes every 15-second training chunk as (source file, sample offset,
+length, label) and decodes it on demand straight from the source file,
+instead of writing chunk WAV files to disk.
+"""
+
+import hashlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+CHUNK_SECONDS = 15
+TARGET_SAMPLE_RATE = 16000
+TARGET_LENGTH = TARGET_SAMPLE_RATE * CHUNK_SECONDS  # 240000 samples
+
+
+def probe_source(path: str) -> Dict[str, int]:
+    """
+    Read a source file's native sample rate and length without decoding it.
+
+    Args:
+        path: Path to the audio file
+
+    Returns:
+        Dict with 'sample_rate' and 'frames' (samples per channel)
+    """
+    import soundfile as sf
+
+    try:
+        info = sf.info(path)
+        return {'sample_rate': int(info.samplerate), 'frames': int(info.frames)}
+    except Exception:
+        # Formats libsndfile cannot read (e.g. MP3 with old libsndfile)
+        import librosa
+        sample_rate = librosa.get_samplerate(path)
+        duration = librosa.get_duration(path=path)
+        return {'sample_rate': int(sample_rate), 'frames': int(round(duration * sample_rate))}
+
+
+def source_chunks(source: Dict) -> List[Dict]:
+    """
+    Split one probed source into chunk descriptors.
+
+    Mirrors the original chunking: 15 s windows at the native sample rate,
+    with the last (or only) window zero-padded when read.
+
+    Args:
+        source: Manifest entry with path, label, sha256, sample_rate, frames
+                and optionally split
+
+    Returns:
+        List of chunk dicts (path, sha256, label, split, sample_rate, offset,
+        length, index)
+    """
+    chunk_samples = source['sample_rate'] * CHUNK_SECONDS
+    offsets = range(0, source['frames'], chunk_samples) if source['frames'] else [0]
+    return [
+        {
+            'path': source['path'],
+            'sha256': source['sha256'],
+            'label': source['label'],
+            'split': source.get('split'),
+            'sample_rate': source['sample_rate'],
+            'offset': offset,
+            'length': min(chunk_samples, source['frames'] - offset),
+            'index': i
+        }
+        for i, offset in enumerate(offsets)
+    ]
+
+
+def build_chunk_index(sources: List[Dict]) -> List[Dict]:
+    """
+    Build the chunk index for a list of probed sources.
+
+    Args:
+        sources: Manifest entries (see source_chunks)
+
+    Returns:
+        Flat list of chunk dicts, ordered by source path then chunk number
+    """
+    index = []
+    for source in sorted(sources, key=lambda s: s['path']):
+        index.extend(source_chunks(source))
+    return index
+
+
+def split_validation(chunks: List[Dict], fraction: float,
+                     seed: int = 42) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Hold out a fraction of the source files of a chunk list for validation.
+
+    Like the train/test split, whole source files are held out, so chunks of
+    one recording never end up on both sides. Files are picked per class by
+    hashing their content with the seed; every class with at least two
+    files keeps at least one file on each side.
+
+    Args:
+        chunks: Chunk dicts (see source_chunks), e.g. the training split
+        fraction: Fraction of each class's source files to hold out
+        seed: Seed mixed into the selection hash
+
+    Returns:
+        (remaining chunks, held-out chunks), each in index order
+    """
+    files = {}
+    for chunk in chunks:
+        files.setdefault(chunk['label'], set()).add(chunk['sha256'])
+
+    held_out = set()
+    for label, hashes in files.items():
+        if fraction <= 0 or len(hashes) < 2:
+            continue
+        count = min(len(hashes) - 1, max(1, round(fraction * len(hashes))))
+        ranked = sorted(hashes, key=lambda sha: hashlib.sha256(
+            f"{seed}:validation:{sha}".encode('utf-8')).hexdigest())
+        held_out.update((label, sha) for sha in ranked[:count])
+
+    remaining = [chunk for chunk in chunks if (chunk['label'], chunk['sha256']) not in held_out]
+    validation = [chunk for chunk in chunks if (chunk['label'], chunk['sha256']) in held_out]
+    return remaining, validation
+
+
+def read_chunk(path: str, offset: int, length: int, sample_rate: int,
+               target_sample_rate: int = TARGET_SAMPLE_RATE,
+               target_length: int = TARGET_LENGTH) -> np.ndarray:
+    """
+    Decode one chunk from its source file, resampled and padded.
+
+    Only the chunk's frames are read (seek-based decoding), then the audio is
+    mixed down to mono, resampled and zero-padded/truncated in memory.
+
+    Args:
+        path: Source audio file
+        offset: First sample of the chunk at the native sample rate
+        length: Number of native samples in the chunk
+        sample_rate: Native sample rate of the source
+        target_sample_rate: Output sample rate
+        target_length: Output length in samples
+
+    Returns:
+        wav: float32 array of shape (target_length,)
+    """
+    import librosa
+    import soundfile as sf
+
+    try:
+        wav, _ = sf.read(path, start=offset, frames=length, dtype='float32', always_2d=True)
+        wav = wav.mean(axis=1)
+    except Exception:
+        wav, _ = librosa.load(path, sr=None, mono=True,
+                              offset=offset / sample_rate, duration=length / sample_rate)
+
+    if sample_rate != target_sample_rate:
+        wav = librosa.resample(wav, orig_sr=sample_rate, target_sr=target_sample_rate)
+
+    if len(wav) >= target_length:
+        return np.ascontiguousarray(wav[:target_length], dtype=np.float32)
+    padded = np.zeros(target_length, dtype=np.float32)
+    padded[:len(wav)] = wav
+    return padded
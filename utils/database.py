@@ -4,8 +4,30 @@ MongoDB integration for logging predictions and requests.
 
 from pymongo import MongoClient
 from datetime import datetime
+import itertools
 import os
-from typing import Dict, Optional
+import threading
+from typing import Dict, List, Optional
+
+# MONGODB_URI value selecting the in-process stand-in (local load tests)
+MEMORY_URI = 'memory://'
+
+
+def create_prediction_logger(connection_string: Optional[str] = None):
+    """
+    Create the prediction logger for a connection string.
+    
+    Args:
+        connection_string: MongoDB connection string, or 'memory://' for an
+                          InMemoryPredictionLogger. If None, uses MONGODB_URI.
+    
+    Returns:
+        PredictionLogger or InMemoryPredictionLogger
+    """
+    connection_string = connection_string or os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
+    if connection_string.startswith(MEMORY_URI):
+        return InMemoryPredictionLogger()
+    return PredictionLogger(connection_string)
 
 
 class PredictionLogger:
@@ -43,7 +65,8 @@ class PredictionLogger:
                       prediction: float,
                       label: str,
                       processing_time: float,
-                      metadata: Optional[Dict] = None):
+                      metadata: Optional[Dict] = None,
+                      model_version: Optional[str] = None):
         """
         Log a prediction to MongoDB.
         
@@ -53,9 +76,13 @@ class PredictionLogger:
             label: Predicted label ('real' or 'fake')
             processing_time: Time taken to process (seconds)
             metadata: Additional metadata to store
+            model_version: Version of the model that made the prediction
+        
+        Returns:
+            Id of the inserted document, or None if not logged
         """
         if self.collection is None:
-            return
+            return None
         
         document = {
             'timestamp': datetime.utcnow(),
@@ -63,13 +90,35 @@ class PredictionLogger:
             'prediction_probability': prediction,
             'predicted_label': label,
             'processing_time_seconds': processing_time,
+            'model_version': model_version,
             'metadata': metadata or {}
         }
         
         try:
-            self.collection.insert_one(document)
+            return self.collection.insert_one(document).inserted_id
+        except Exception as e:
+            print(f"Error logging prediction to MongoDB (model {model_version}): {e}")
+            return None
+    
+    def log_shadow_predictions(self, prediction_id, shadow_results: List[Dict]):
+        """
+        Attach shadow model scores to a logged primary prediction.
+        
+        Args:
+            prediction_id: Id returned by log_prediction
+            shadow_results: List of dicts with name, model_version, probability,
+                            label, agrees and probability_delta
+        """
+        if self.collection is None:
+            return
+        
+        try:
+            self.collection.update_one(
+                {'_id': prediction_id},
+                {'$set': {'shadow_predictions': shadow_results}}
+            )
         except Exception as e:
-            print(f"Error logging prediction to MongoDB: {e}")
+            print(f"Error logging shadow predictions to MongoDB: {e}")
     
     def get_recent_predictions(self, limit: int = 10):
         """
@@ -125,5 +174,133 @@ class PredictionLogger:
         except Exception as e:
             print(f"Error retrieving statistics: {e}")
             return {}
+    
+    def get_shadow_agreement(self):
+        """
+        Summarize how often each shadow model agreed with the primary model.
+        
+        Returns:
+            Dictionary mapping shadow model version to compared count,
+            agreed count and agreement rate
+        """
+        if self.collection is None:
+            return {}
+        
+        try:
+            rows = self.collection.aggregate([
+                {'$match': {'shadow_predictions': {'$exists': True}}},
+                {'$unwind': '$shadow_predictions'},
+                {'$group': {
+                    '_id': '$shadow_predictions.model_version',
+                    'compared': {'$sum': 1},
+                    'agreed': {'$sum': {'$cond': ['$shadow_predictions.agrees', 1, 0]}},
+                    'mean_probability_delta': {'$avg': '$shadow_predictions.probability_delta'}
+                }}
+            ])
+            return {
+                row['_id']: {
+                    'compared': row['compared'],
+                    'agreed': row['agreed'],
+                    'agreement_rate': row['agreed'] / row['compared'],
+                    'mean_probability_delta': row['mean_probability_delta']
+                }
+                for row in rows
+            }
+        except Exception as e:
+            print(f"Error retrieving shadow agreement: {e}")
+            return {}
 
 
+class InMemoryPredictionLogger:
+    """
+    Stand-in for PredictionLogger that keeps predictions in process memory.
+    
+    Same interface as PredictionLogger, for running the API without MongoDB
+    (local load tests, development). Only the most recent max_documents
+    predictions are kept.
+    """
+    
+    def __init__(self, max_documents: int = 10000):
+        """
+        Args:
+            max_documents: Number of most recent predictions kept
+        """
+        self.connection_string = MEMORY_URI
+        self.client = self  # health checks treat a non-None client as connected
+        self.max_documents = max_documents
+        self._documents = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+    
+    def log_prediction(self,
+                      audio_filename: str,
+                      prediction: float,
+                      label: str,
+                      processing_time: float,
+                      metadata: Optional[Dict] = None,
+                      model_version: Optional[str] = None):
+        """Store a prediction; see PredictionLogger.log_prediction."""
+        with self._lock:
+            prediction_id = next(self._ids)
+            self._documents[prediction_id] = {
+                '_id': prediction_id,
+                'timestamp': datetime.utcnow(),
+                'audio_filename': audio_filename,
+                'prediction_probability': prediction,
+                'predicted_label': label,
+                'processing_time_seconds': processing_time,
+                'model_version': model_version,
+                'metadata': metadata or {}
+            }
+            # Dicts keep insertion order, so the first key is the oldest
+            while len(self._documents) > self.max_documents:
+                del self._documents[next(iter(self._documents))]
+        return prediction_id
+    
+    def log_shadow_predictions(self, prediction_id, shadow_results: List[Dict]):
+        """Attach shadow model scores; see PredictionLogger.log_shadow_predictions."""
+        with self._lock:
+            if prediction_id in self._documents:
+                self._documents[prediction_id]['shadow_predictions'] = shadow_results
+    
+    def get_recent_predictions(self, limit: int = 10):
+        """Most recent predictions first; see PredictionLogger.get_recent_predictions."""
+        with self._lock:
+            recent = list(self._documents.values())[-limit:] if limit > 0 else []
+        return [{**document, '_id': str(document['_id']), 'timestamp': document['timestamp'].isoformat()}
+                for document in reversed(recent)]
+    
+    def get_statistics(self):
+        """Prediction counts; see PredictionLogger.get_statistics."""
+        with self._lock:
+            labels = [document['predicted_label'] for document in self._documents.values()]
+        total = len(labels)
+        real_count = labels.count('real')
+        fake_count = labels.count('fake')
+        return {
+            'total_predictions': total,
+            'real_predictions': real_count,
+            'fake_predictions': fake_count,
+            'real_percentage': (real_count / total * 100) if total > 0 else 0,
+            'fake_percentage': (fake_count / total * 100) if total > 0 else 0
+        }
+    
+    def get_shadow_agreement(self):
+        """Shadow agreement per model version; see PredictionLogger.get_shadow_agreement."""
+        groups = {}
+        with self._lock:
+            for document in self._documents.values():
+                for shadow in document.get('shadow_predictions', []):
+                    group = groups.setdefault(shadow['model_version'], {'compared': 0, 'agreed': 0, 'deltas': []})
+                    group['compared'] += 1
+                    group['agreed'] += 1 if shadow['agrees'] else 0
+                    group['deltas'].append(shadow['probability_delta'])
+        return {
+            version: {
+                'compared': group['compared'],
+                'agreed': group['agreed'],
+                'agreement_rate': group['agreed'] / group['compared'],
+                'mean_probability_delta': sum(group['deltas']) / len(group['deltas'])
+            }
+            for version, group in groups.items()
+        }
@@ -0,0 +1,233 @@
+"""
+Dataset manifest utilities for AuralGuard training.
+Tracks every source audio file (path, size, mtime, content hash, label) so
+pipeline stages can skip work for files that have not changed.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.flac')
+MANIFEST_VERSION = 1
+
+
+def hash_file(path: str, chunk_size: int = 4 * 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 hex digest of a file's contents.
+
+    Args:
+        path: Path to the file
+        chunk_size: Bytes read per iteration
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_sources(class_dirs: Dict[str, str]) -> List[Dict]:
+    """
+    List source audio files with their size and modification time.
+
+    Args:
+        class_dirs: Mapping of label name ('real'/'fake') to directory
+
+    Returns:
+        List of dicts with path, label, size and mtime_ns, sorted by path
+    """
+    sources = []
+    for label, directory in class_dirs.items():
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(AUDIO_EXTENSIONS):
+                continue
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            sources.append({
+                'path': path,
+                'label': label,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns
+            })
+    sources.sort(key=lambda source: source['path'])
+    return sources
+
+
+def load_manifest(manifest_path: str) -> Dict:
+    """
+    Load a manifest, returning an empty one if it does not exist.
+
+    Args:
+        manifest_path: Path to the manifest JSON file
+
+    Returns:
+        Manifest dict with a 'sources' mapping keyed by source path
+    """
+    if not os.path.exists(manifest_path):
+        return {'version': MANIFEST_VERSION, 'sources': {}}
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        print(f"Warning: ignoring manifest {manifest_path} with unsupported version")
+        return {'version': MANIFEST_VERSION, 'sources': {}}
+    return manifest
+
+
+def save_manifest(manifest: Dict, manifest_path: str):
+    """Write a manifest atomically (safe with concurrent writers)."""
+    manifest['version'] = MANIFEST_VERSION
+    manifest['updated_at'] = datetime.utcnow().isoformat()
+    directory = os.path.dirname(manifest_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def diff_sources(scanned: List[Dict], manifest: Dict) -> Dict[str, List]:
+    """
+    Compare scanned sources against a manifest.
+
+    Files whose size and mtime match the manifest are unchanged without being
+    read. Otherwise the content is hashed, so a touched but identical file is
+    still reported as unchanged (with refreshed stat fields).
+
+    Args:
+        scanned: Output of scan_sources()
+        manifest: Manifest from load_manifest()
+
+    Returns:
+        Dict with 'unchanged', 'changed' and 'added' (lists of source dicts
+        including 'sha256') and 'removed' (list of manifest paths)
+    """
+    known = manifest.get('sources', {})
+    result = {'unchanged': [], 'changed': [], 'added': [], 'removed': []}
+
+    for source in scanned:
+        entry = known.get(source['path'])
+        if entry and entry['size'] == source['size'] and entry['mtime_ns'] == source['mtime_ns'] \
+                and entry['label'] == source['label']:
+            result['unchanged'].append({**entry, **source})
+            continue
+
+        source = {**source, 'sha256': hash_file(source['path'])}
+        if entry is None:
+            result['added'].append(source)
+        elif entry['sha256'] == source['sha256'] and entry['label'] == source['label']:
+            result['unchanged'].append({**entry, **source})
+        else:
+            result['changed'].append(source)
+
+    scanned_paths = {source['path'] for source in scanned}
+    result['removed'] = [path for path in known if path not in scanned_paths]
+    return result
+
+
+def manifest_fingerprint(manifest: Dict) -> Optional[str]:
+    """
+    Content fingerprint of a manifest's source set (a data version id).
+
+    Returns:
+        Hex digest over sorted (path, sha256, label), or None if empty
+    """
+    sources = manifest.get('sources', {})
+    if not sources:
+        return None
+    digest = hashlib.sha256()
+    for path in sorted(sources):
+        entry = sources[path]
+        digest.update(f"{path}\0{entry['sha256']}\0{entry['label']}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def assign_splits(manifest: Dict, test_fraction: float = 0.3, seed: int = 42) -> Dict[str, int]:
+    """
+    Assign every source file in a manifest to 'train' or 'test'.
+
+    The split is decided per source file, so chunks of one recording never
+    end up on both sides. Assignment hashes the file content with the seed,
+    which makes it deterministic and stable as files are added; it is only
+    recomputed for all files when test_fraction or seed change.
+
+    Args:
+        manifest: Manifest whose 'sources' entries get a 'split' field
+        test_fraction: Target fraction of source files in the test split
+        seed: Seed mixed into the assignment hash
+
+    Returns:
+        Count of source files per split
+    """
+    params = {'test_fraction': test_fraction, 'seed': seed}
+    reassign = manifest.get('split_params') != params
+    manifest['split_params'] = params
+
+    for entry in manifest.get('sources', {}).values():
+        if reassign or entry.get('split') not in ('train', 'test'):
+            score = int(hashlib.sha256(f"{seed}:{entry['sha256']}".encode('utf-8')).hexdigest()[:8], 16)
+            entry['split'] = 'test' if score / 0xFFFFFFFF < test_fraction else 'train'
+
+    # Every class with at least two files needs both a train and a test file
+    for label in {entry['label'] for entry in manifest.get('sources', {}).values()}:
+        entries = sorted(
+            (entry for entry in manifest['sources'].values() if entry['label'] == label),
+            key=lambda entry: entry['sha256']
+        )
+        if len(entries) < 2 or test_fraction <= 0:
+            continue
+        for split in ('test', 'train'):
+            if not any(entry['split'] == split for entry in entries):
+                entries[0 if split == 'test' else -1]['split'] = split
+
+    counts = {'train': 0, 'test': 0}
+    for entry in manifest.get('sources', {}).values():
+        counts[entry['split']] += 1
+    return counts
+
+
+def record_training(manifest: Dict, **lineage) -> Dict:
+    """
+    Record the manifest's current source set as trained on.
+
+    The next incremental run treats every source not in this record (new,
+    or with changed content) as new data.
+
+    Args:
+        manifest: Manifest the model was trained from
+        **lineage: Extra fields to store (e.g. run_id, model_version, mode)
+
+    Returns:
+        The stored record (also saved under manifest['last_training'])
+    """
+    record = {
+        **lineage,
+        'fingerprint': manifest_fingerprint(manifest),
+        'trained_at': datetime.utcnow().isoformat(),
+        'sources': {path: entry['sha256'] for path, entry in manifest.get('sources', {}).items()}
+    }
+    manifest['last_training'] = record
+    return record
+
+
+def untrained_sources(manifest: Dict) -> Optional[List[str]]:
+    """
+    Sources added or changed since the last recorded training run.
+
+    Returns:
+        Sorted source paths, or None if no training run has been recorded
+    """
+    last_training = manifest.get('last_training')
+    if not last_training:
+        return None
+    trained = last_training['sources']
+    return sorted(
+        path for path, entry in manifest.get('sources', {}).items()
+        if trained.get(path) != entry['sha256']
+    )
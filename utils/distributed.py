@@ -0,0 +1,308 @@
+"""
+Multi-worker data-parallel training helpers for AuralGuard.
+
+Workers are configured through TF_CONFIG (as for
+tf.distribute.MultiWorkerMirroredStrategy); worker 0 is the chief. For
+testing on one machine, launch_local_workers() starts every worker as a
+local process with its own TF_CONFIG.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+
+def cluster_from_env() -> Dict:
+    """
+    Describe this process's place in the cluster from TF_CONFIG.
+
+    Returns:
+        Dict with num_workers, worker_index and is_chief (a single worker
+        when TF_CONFIG is not set)
+    """
+    tf_config = json.loads(os.getenv('TF_CONFIG', '{}') or '{}')
+    workers = tf_config.get('cluster', {}).get('worker', [])
+    task = tf_config.get('task', {})
+    if task.get('type', 'worker') != 'worker':
+        raise ValueError(f"Unsupported task type in TF_CONFIG: {task.get('type')}")
+    index = int(task.get('index', 0))
+    return {
+        'num_workers': max(len(workers), 1),
+        'worker_index': index,
+        'is_chief': index == 0
+    }
+
+
+def shard_chunks(chunks: List[Dict], num_shards: int, shard_index: int) -> List[Dict]:
+    """
+    Select one worker's share of a chunk index, by source file.
+
+    Whole source files are assigned to shards, per class and largest first,
+    each to the shard with the fewest chunks so far. Every worker computes
+    the same assignment from the same manifest, so shards are disjoint and
+    cover the index without any coordination.
+
+    Args:
+        chunks: Chunk dicts (see utils.chunk_index)
+        num_shards: Number of workers
+        shard_index: This worker's index
+
+    Returns:
+        The chunks of this shard, in index order
+    """
+    if num_shards <= 1:
+        return list(chunks)
+
+    by_source = {}
+    for chunk in chunks:
+        by_source.setdefault((chunk['label'], chunk['path']), []).append(chunk)
+
+    selected = set()
+    for label in sorted({label for label, _ in by_source}):
+        sources = sorted(
+            (key for key in by_source if key[0] == label),
+            key=lambda key: (-len(by_source[key]), key[1])
+        )
+        loads = [0] * num_shards
+        for key in sources:
+            shard = loads.index(min(loads))
+            loads[shard] += len(by_source[key])
+            if shard == shard_index:
+                selected.add(key)
+
+    return [chunk for chunk in chunks if (chunk['label'], chunk['path']) in selected]
+
+
+def free_ports(count: int) -> List[int]:
+    """Reserve `count` free localhost TCP ports (released before returning)."""
+    sockets = []
+    try:
+        for _ in range(count):
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.bind(('localhost', 0))
+            sockets.append(s)
+        return [s.getsockname()[1] for s in sockets]
+    finally:
+        for s in sockets:
+            s.close()
+
+
+def local_tf_config(ports: List[int], index: int) -> str:
+    """TF_CONFIG for worker `index` of a cluster running on localhost."""
+    return json.dumps({
+        'cluster': {'worker': [f"localhost:{port}" for port in ports]},
+        'task': {'type': 'worker', 'index': index}
+    })
+
+
+def _stop(processes, grace_seconds=10.0):
+    """Terminate processes, killing any still running after the grace period."""
+    processes = [process for process in processes if process.poll() is None]
+    for process in processes:
+        process.terminate()
+    deadline = time.monotonic() + grace_seconds
+    for process in processes:
+        try:
+            process.wait(timeout=max(deadline - time.monotonic(), 0.0))
+        except subprocess.TimeoutExpired:
+            # TensorFlow's preemption handler catches SIGTERM
+            process.kill()
+
+
+def launch_local_workers(num_workers: int, argv: List[str], log_dir: Optional[str] = None,
+                         threads_per_worker: Optional[int] = None) -> int:
+    """
+    Run a training script as `num_workers` cooperating local processes.
+
+    The chief (worker 0) writes to this process's stdout; other workers
+    write to log_dir/worker_<i>.log.
+
+    Args:
+        num_workers: Number of worker processes
+        argv: Script and arguments each worker runs with the Python interpreter
+        log_dir: Directory for non-chief worker logs
+        threads_per_worker: TensorFlow intra-op threads per worker
+                            (default: CPU cores divided evenly)
+
+    Returns:
+        Exit code: 0 if every worker succeeded, else the first failing code
+    """
+    log_dir = log_dir or 'distributed_logs'
+    os.makedirs(log_dir, exist_ok=True)
+    threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+    ports = free_ports(num_workers)
+
+    processes = []
+    log_files = []
+    try:
+        for index in range(num_workers):
+            env = dict(os.environ)
+            env['TF_CONFIG'] = local_tf_config(ports, index)
+            env['TF_NUM_INTRAOP_THREADS'] = str(threads_per_worker)
+            env['TF_NUM_INTEROP_THREADS'] = str(max(1, min(threads_per_worker, 2)))
+            output = None
+            if index > 0:
+                output = open(os.path.join(log_dir, f"worker_{index}.log"), 'w')
+                log_files.append(output)
+            processes.append(subprocess.Popen(
+                [sys.executable] + list(argv),
+                env=env,
+                stdout=output,
+                stderr=subprocess.STDOUT if output else None
+            ))
+
+        exit_code = 0
+        running = set(range(num_workers))
+        while running:
+            for index in sorted(running):
+                code = processes[index].poll()
+                if code is None:
+                    continue
+                running.discard(index)
+                if code != 0 and exit_code == 0:
+                    print(f"Worker {index} exited with code {code}"
+                          + (f" (see {log_dir}/worker_{index}.log)" if index else ""))
+                    exit_code = code
+                    # The remaining workers would block forever in collective ops
+                    _stop(processes[other] for other in running)
+            time.sleep(0.2)
+        return exit_code
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+        for output in log_files:
+            output.close()
+
+
+def _batch_statistics(y, y_pred):
+    """Per-example binary cross-entropy and summed confusion counts for one batch."""
+    import tensorflow as tf
+
+    y = tf.reshape(tf.cast(y, tf.float32), (-1,))
+    y_pred = tf.reshape(tf.cast(y_pred, tf.float32), (-1,))
+    clipped = tf.clip_by_value(y_pred, 1e-7, 1 - 1e-7)
+    per_example = -(y * tf.math.log(clipped) + (1 - y) * tf.math.log(1 - clipped))
+    predicted = tf.cast(y_pred >= 0.5, tf.float32)
+    return per_example, {
+        'loss': tf.reduce_sum(per_example),
+        'correct': tf.reduce_sum(tf.cast(tf.equal(predicted, y), tf.float32)),
+        'tp': tf.reduce_sum(predicted * y),
+        'fp': tf.reduce_sum(predicted * (1 - y)),
+        'fn': tf.reduce_sum((1 - predicted) * y),
+        'count': tf.cast(tf.size(y), tf.float32)
+    }
+
+
+def _epoch_logs(totals, prefix=''):
+    """Keras-style metric logs (loss, accuracy, precision, recall) from summed counts."""
+    count = max(totals['count'], 1.0)
+    return {
+        f'{prefix}loss': totals['loss'] / count,
+        f'{prefix}accuracy': totals['correct'] / count,
+        f'{prefix}precision': totals['tp'] / max(totals['tp'] + totals['fp'], 1.0),
+        f'{prefix}recall': totals['tp'] / max(totals['tp'] + totals['fn'], 1.0)
+    }
+
+
+def fit_distributed(model, strategy, train, epochs, steps_per_epoch, validation=None,
+                    validation_steps=None, callbacks=None, verbose=1, initial_epoch=0):
+    """
+    Data-parallel training loop for a compiled binary classifier.
+
+    Equivalent to model.fit() for the AuralGuard CNN (binary cross-entropy,
+    accuracy, precision, recall), run with strategy.run so gradients are
+    all-reduced across workers by the optimizer. Keras 3's fit() cannot be
+    used with MultiWorkerMirroredStrategy: its symbolic build reduces a
+    nested data batch, which collective ops reject. Keras callbacks still
+    receive the usual train/epoch hooks and logs.
+
+    Args:
+        model: Compiled Keras model created in strategy.scope()
+        strategy: tf.distribute strategy
+        train: Repeating dataset of global batches, already sharded per worker
+        epochs: Number of epochs
+        steps_per_epoch: Global steps per epoch
+        validation: Repeating validation dataset (optional)
+        validation_steps: Global validation steps per epoch
+        callbacks: Keras callbacks
+        verbose: Show a progress bar
+        initial_epoch: Epoch to start from (when resuming)
+
+    Returns:
+        keras History object
+    """
+    import tensorflow as tf
+
+    history = tf.keras.callbacks.History()
+    callback_list = tf.keras.callbacks.CallbackList(
+        list(callbacks or []) + [history],
+        add_progbar=bool(verbose),
+        model=model,
+        verbose=verbose,
+        epochs=epochs,
+        steps=steps_per_epoch
+    )
+
+    if not model.optimizer.built:
+        with strategy.scope():
+            model.optimizer.build(model.trainable_variables)
+
+    def reduce_sum(values):
+        return {name: strategy.reduce('SUM', value, axis=None) for name, value in values.items()}
+
+    @tf.function
+    def train_step(iterator):
+        def replica_step(x, y):
+            with tf.GradientTape() as tape:
+                per_example, statistics = _batch_statistics(y, model(x, training=True))
+                loss = tf.nn.compute_average_loss(per_example)
+            gradients = tape.gradient(loss, model.trainable_variables)
+            model.optimizer.apply_gradients(zip(gradients, model.trainable_variables))
+            return statistics
+        return reduce_sum(strategy.run(replica_step, args=next(iterator)))
+
+    @tf.function
+    def test_step(iterator):
+        def replica_step(x, y):
+            return _batch_statistics(y, model(x, training=False))[1]
+        return reduce_sum(strategy.run(replica_step, args=next(iterator)))
+
+    train_iterator = iter(strategy.experimental_distribute_dataset(train))
+    validation_iterator = None
+    if validation is not None and validation_steps:
+        validation_iterator = iter(strategy.experimental_distribute_dataset(validation))
+
+    model.stop_training = False
+    logs = None
+    callback_list.on_train_begin()
+    for epoch in range(initial_epoch, epochs):
+        callback_list.on_epoch_begin(epoch)
+        totals = None
+        for step in range(steps_per_epoch):
+            callback_list.on_train_batch_begin(step)
+            statistics = {name: float(value) for name, value in train_step(train_iterator).items()}
+            totals = statistics if totals is None else {
+                name: totals[name] + statistics[name] for name in totals
+            }
+            callback_list.on_train_batch_end(step, _epoch_logs(totals))
+        logs = _epoch_logs(totals)
+
+        if validation_iterator is not None:
+            validation_totals = None
+            for _ in range(validation_steps):
+                statistics = {name: float(value) for name, value in test_step(validation_iterator).items()}
+                validation_totals = statistics if validation_totals is None else {
+                    name: validation_totals[name] + statistics[name] for name in validation_totals
+                }
+            logs.update(_epoch_logs(validation_totals, prefix='val_'))
+
+        callback_list.on_epoch_end(epoch, logs)
+        if model.stop_training:
+            break
+    callback_list.on_train_end(logs)
+    return history
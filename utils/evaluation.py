@@ -0,0 +1,203 @@
+"""
+Streaming model evaluation for AuralGuard.
+Accumulates confusion counts, score histograms and latency batch by batch,
+so evaluating any test set size needs constant memory.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_REPORT_THRESHOLDS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+_EPSILON = 1e-7
+
+
+class StreamingEvaluator:
+    """
+    Binary classification metrics accumulated one batch at a time.
+
+    Scores are binned into fixed histograms per class, from which ROC/AUC,
+    equal-error rate and per-threshold confusion counts are derived. Exact
+    confusion counts and loss are kept for the decision threshold.
+    """
+
+    def __init__(self, n_bins: int = 1000, threshold: float = 0.5,
+                 report_thresholds=DEFAULT_REPORT_THRESHOLDS):
+        """
+        Args:
+            n_bins: Number of score histogram bins over [0, 1]
+            threshold: Decision threshold for the headline metrics
+            report_thresholds: Thresholds included in threshold_report()
+        """
+        self.n_bins = n_bins
+        self.threshold = threshold
+        self.report_thresholds = tuple(report_thresholds)
+        self.edges = np.linspace(0.0, 1.0, n_bins + 1)
+        self.positive_hist = np.zeros(n_bins, dtype=np.int64)
+        self.negative_hist = np.zeros(n_bins, dtype=np.int64)
+        self.tp = self.fp = self.tn = self.fn = 0
+        self.loss_sum = 0.0
+        self.examples = 0
+        # Latency: log-spaced histogram of per-batch inference time (0.1 ms - 100 s)
+        self.latency_edges = np.logspace(-4, 2, 121)
+        self.latency_hist = np.zeros(len(self.latency_edges) + 1, dtype=np.int64)
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.batches = 0
+
+    def update(self, y_true, y_score, batch_seconds: Optional[float] = None):
+        """
+        Add one batch of labels and predicted probabilities.
+
+        Args:
+            y_true: Labels (1 = real, 0 = fake)
+            y_score: Predicted probability of 'real'
+            batch_seconds: Inference time of the batch, if measured
+        """
+        y_true = np.asarray(y_true).reshape(-1) >= 0.5
+        y_score = np.clip(np.asarray(y_score, dtype=np.float64).reshape(-1), 0.0, 1.0)
+
+        bins = np.minimum((y_score * self.n_bins).astype(np.int64), self.n_bins - 1)
+        self.positive_hist += np.bincount(bins[y_true], minlength=self.n_bins)
+        self.negative_hist += np.bincount(bins[~y_true], minlength=self.n_bins)
+
+        predicted = y_score >= self.threshold
+        self.tp += int(np.sum(predicted & y_true))
+        self.fp += int(np.sum(predicted & ~y_true))
+        self.tn += int(np.sum(~predicted & ~y_true))
+        self.fn += int(np.sum(~predicted & y_true))
+
+        clipped = np.clip(y_score, _EPSILON, 1 - _EPSILON)
+        self.loss_sum += float(-np.sum(np.where(y_true, np.log(clipped), np.log(1 - clipped))))
+        self.examples += len(y_score)
+
+        if batch_seconds is not None:
+            self.latency_hist[np.searchsorted(self.latency_edges, batch_seconds)] += 1
+            self.latency_sum += batch_seconds
+            self.latency_max = max(self.latency_max, batch_seconds)
+            self.batches += 1
+
+    def _roc(self):
+        """TPR and FPR at every bin edge, from threshold 1 down to 0."""
+        positives = max(int(self.positive_hist.sum()), 1)
+        negatives = max(int(self.negative_hist.sum()), 1)
+        # Scores >= edge[i] are predicted positive; cumulate from the top bin down
+        tp = np.concatenate([[0], np.cumsum(self.positive_hist[::-1])])
+        fp = np.concatenate([[0], np.cumsum(self.negative_hist[::-1])])
+        return tp / positives, fp / negatives, self.edges[::-1]
+
+    def auc(self) -> float:
+        """Area under the ROC curve."""
+        tpr, fpr, _ = self._roc()
+        # Trapezoidal rule over the ROC points
+        return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+    def equal_error_rate(self):
+        """
+        Equal-error rate, where false positive rate equals false negative rate.
+
+        Returns:
+            (eer, threshold)
+        """
+        tpr, fpr, thresholds = self._roc()
+        fnr = 1 - tpr
+        diff = fpr - fnr
+        i = int(np.argmax(diff >= 0))  # first edge where FPR >= FNR
+        if i == 0:
+            return float(fpr[0]), float(thresholds[0])
+        # Linear interpolation between edges i-1 and i
+        w = diff[i] / (diff[i] - diff[i - 1]) if diff[i] != diff[i - 1] else 0.0
+        eer = fpr[i] - w * (fpr[i] - fpr[i - 1])
+        threshold = thresholds[i] - w * (thresholds[i] - thresholds[i - 1])
+        return float(eer), float(threshold)
+
+    def metrics(self) -> Dict[str, float]:
+        """Headline metrics at the decision threshold (same names as model.evaluate)."""
+        eer, eer_threshold = self.equal_error_rate()
+        return {
+            'loss': self.loss_sum / max(self.examples, 1),
+            'accuracy': (self.tp + self.tn) / max(self.examples, 1),
+            'precision': self.tp / max(self.tp + self.fp, 1),
+            'recall': self.tp / max(self.tp + self.fn, 1),
+            'auc': self.auc(),
+            'eer': eer,
+            'eer_threshold': eer_threshold
+        }
+
+    def threshold_report(self) -> List[Dict[str, float]]:
+        """Confusion counts and rates at each report threshold (bin resolution)."""
+        rows = []
+        positives = int(self.positive_hist.sum())
+        negatives = int(self.negative_hist.sum())
+        for threshold in self.report_thresholds:
+            start = int(round(threshold * self.n_bins))
+            tp = int(self.positive_hist[start:].sum())
+            fp = int(self.negative_hist[start:].sum())
+            fn = positives - tp
+            tn = negatives - fp
+            precision = tp / max(tp + fp, 1)
+            recall = tp / max(positives, 1)
+            rows.append({
+                'threshold': threshold,
+                'tp': tp, 'fp': fp, 'tn': tn, 'fn': fn,
+                'precision': precision,
+                'recall': recall,
+                'fpr': fp / max(negatives, 1),
+                'f1': 2 * precision * recall / max(precision + recall, _EPSILON),
+                'accuracy': (tp + tn) / max(positives + negatives, 1)
+            })
+        return rows
+
+    def latency_profile(self) -> Dict[str, float]:
+        """Per-batch inference latency summary (percentiles at histogram resolution)."""
+        if self.batches == 0:
+            return {}
+        cumulative = np.cumsum(self.latency_hist)
+        upper_edges = np.append(self.latency_edges, self.latency_max)
+
+        def percentile(q):
+            index = int(np.searchsorted(cumulative, q * self.batches))
+            return float(min(upper_edges[min(index, len(upper_edges) - 1)], self.latency_max))
+
+        return {
+            'batches': self.batches,
+            'mean_batch_ms': 1000 * self.latency_sum / self.batches,
+            'p50_batch_ms': 1000 * percentile(0.50),
+            'p95_batch_ms': 1000 * percentile(0.95),
+            'p99_batch_ms': 1000 * percentile(0.99),
+            'max_batch_ms': 1000 * self.latency_max,
+            'mean_example_ms': 1000 * self.latency_sum / max(self.examples, 1),
+            'examples_per_second': self.examples / self.latency_sum if self.latency_sum else 0.0
+        }
+
+    def report(self) -> Dict:
+        """Full evaluation report: metrics, confusion, per-threshold table and latency."""
+        return {
+            'examples': self.examples,
+            'threshold': self.threshold,
+            'metrics': self.metrics(),
+            'confusion': {'tp': self.tp, 'fp': self.fp, 'tn': self.tn, 'fn': self.fn},
+            'thresholds': self.threshold_report(),
+            'latency': self.latency_profile()
+        }
+
+
+def evaluate_streaming(model, dataset, evaluator: Optional[StreamingEvaluator] = None) -> StreamingEvaluator:
+    """
+    Evaluate a model over a batched dataset without materializing it.
+
+    Args:
+        model: Keras model producing probabilities
+        dataset: Dataset of (inputs, labels) batches
+        evaluator: Evaluator to accumulate into (a new one if None)
+
+    Returns:
+        The evaluator with all batches accumulated
+    """
+    evaluator = evaluator or StreamingEvaluator()
+    for x_batch, y_batch in dataset:
+        start = time.perf_counter()
+        scores = np.asarray(model(x_batch, training=False))
+        evaluator.update(np.asarray(y_batch), scores, batch_seconds=time.perf_counter() - start)
+    return evaluator
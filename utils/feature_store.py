@@ -0,0 +1,283 @@
+"""
+Persistent mel-spectrogram feature store for AuralGuard training.
+
+Spectrograms are computed once and written into fixed-size shards of
+memory-mapped .npy arrays. Each row is keyed by the chunk's content (source
+hash, offset, length) and the store directory by the feature parameters, so
+later runs and sweeps with the same parameters skip audio decoding.
+
+Layout:
+    <root>/<params_hash>/params.json          feature parameters
+    <root>/<params_hash>/index.json           chunk key -> [shard, row]
+    <root>/<params_hash>/shard_00000.npy      (shard_size, n_mels, frames)
+    <root>/<params_hash>/shard_00000.scale.npy  per-row scale (float16 only)
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from utils.chunk_index import TARGET_LENGTH, TARGET_SAMPLE_RATE, read_chunk
+
+DEFAULT_FEATURE_PARAMS = {
+    'frontend': 'librosa',
+    'sample_rate': TARGET_SAMPLE_RATE,
+    'length': TARGET_LENGTH,
+    'n_mels': 128,
+    'fmax': 8000,
+    'n_fft': 2048,
+    'hop_length': 512,
+}
+FEATURE_SHAPE = (128, 469)
+
+
+def chunk_key(chunk: Dict) -> str:
+    """
+    Content key of one chunk: identical audio gives an identical key.
+
+    Args:
+        chunk: Chunk dict from utils.chunk_index
+
+    Returns:
+        Hex digest string
+    """
+    raw = f"{chunk['sha256']}:{chunk['offset']}:{chunk['length']}:{chunk['sample_rate']}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def compute_mel_spectrogram(wav: np.ndarray, params: Dict = DEFAULT_FEATURE_PARAMS) -> np.ndarray:
+    """Compute the training mel-spectrogram of a 16kHz waveform with librosa."""
+    import librosa
+
+    return librosa.feature.melspectrogram(
+        y=wav, sr=params['sample_rate'], n_mels=params['n_mels'], fmax=params['fmax'],
+        n_fft=params['n_fft'], hop_length=params['hop_length']
+    ).astype(np.float32)
+
+
+def _featurize_chunk(job):
+    """Process-pool worker: decode one chunk and compute its mel-spectrogram."""
+    key, chunk, params = job
+    wav = read_chunk(chunk['path'], chunk['offset'], chunk['length'], chunk['sample_rate'],
+                     target_sample_rate=params['sample_rate'], target_length=params['length'])
+    return key, compute_mel_spectrogram(wav, params)
+
+
+class FeatureStore:
+    """Sharded, memory-mapped store of mel-spectrograms keyed by chunk content."""
+
+    def __init__(self, root: str = 'feature_store',
+                 params: Optional[Dict] = None,
+                 dtype: str = 'float32',
+                 shard_size: int = 1024):
+        """
+        Args:
+            root: Root directory shared by all parameter sets
+            params: Feature parameters (defaults to DEFAULT_FEATURE_PARAMS)
+            dtype: 'float32' or 'float16' storage
+            shard_size: Rows per shard file
+        """
+        if dtype not in ('float32', 'float16'):
+            raise ValueError(f"Unsupported feature dtype: {dtype}")
+        self.params = dict(params or DEFAULT_FEATURE_PARAMS)
+        self.dtype = dtype
+        self.shard_size = shard_size
+        params_id = json.dumps({**self.params, 'dtype': dtype}, sort_keys=True)
+        self.params_hash = hashlib.sha256(params_id.encode('utf-8')).hexdigest()[:16]
+        self.directory = os.path.join(root, self.params_hash)
+        self._index = None
+        self._shards = {}
+
+    # ------------------------------------------------------------------
+    # Index handling
+    # ------------------------------------------------------------------
+
+    @property
+    def index(self) -> Dict:
+        if self._index is None:
+            self._index = self._read_index()
+        return self._index
+
+    def _read_index(self) -> Dict:
+        path = os.path.join(self.directory, 'index.json')
+        if not os.path.exists(path):
+            return {'rows': {}, 'shard_rows': []}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_index(self):
+        path = os.path.join(self.directory, 'index.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self._index, f)
+        os.replace(path + '.tmp', path)
+
+    @contextmanager
+    def _write_lock(self):
+        """Exclusive lock so concurrent runs never write the same shard."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, '.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Another process may have added rows while we waited
+                self._index = self._read_index()
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _shard_path(self, shard_id: int, suffix: str = '') -> str:
+        return os.path.join(self.directory, f"shard_{shard_id:05d}{suffix}.npy")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index['rows']
+
+    def __len__(self) -> int:
+        return len(self.index['rows'])
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _open_for_write(self, shard_id: int):
+        path = self._shard_path(shard_id)
+        shape = (self.shard_size,) + FEATURE_SHAPE
+        if os.path.exists(path):
+            data = np.load(path, mmap_mode='r+')
+        else:
+            data = np.lib.format.open_memmap(path, mode='w+', dtype=self.dtype, shape=shape)
+        scales = None
+        if self.dtype == 'float16':
+            scale_path = self._shard_path(shard_id, '.scale')
+            if os.path.exists(scale_path):
+                scales = np.load(scale_path, mmap_mode='r+')
+            else:
+                scales = np.lib.format.open_memmap(scale_path, mode='w+', dtype='float32',
+                                                   shape=(self.shard_size,))
+        return data, scales
+
+    def featurize(self, chunks: Iterable[Dict], workers: Optional[int] = None) -> int:
+        """
+        Compute and store features for every chunk not already in the store.
+
+        Args:
+            chunks: Chunk dicts from utils.chunk_index
+            workers: Decoding processes (default: all CPU cores)
+
+        Returns:
+            Number of chunks featurized
+        """
+        with self._write_lock():
+            rows = self.index['rows']
+            pending = {}
+            for chunk in chunks:
+                key = chunk_key(chunk)
+                if key not in rows and key not in pending:
+                    pending[key] = chunk
+            if not pending:
+                return 0
+
+            print(f"  Featurizing {len(pending)} chunks "
+                  f"({len(rows)} already in {self.directory})...")
+            jobs = [(key, chunk, self.params) for key, chunk in pending.items()]
+            shard_rows = self.index['shard_rows']
+            shard_id = len(shard_rows) - 1
+            if shard_id < 0 or shard_rows[shard_id] >= self.shard_size:
+                shard_rows.append(0)
+                shard_id += 1
+            data, scales = self._open_for_write(shard_id)
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for done, (key, mel) in enumerate(
+                        executor.map(_featurize_chunk, jobs, chunksize=4), start=1):
+                    if shard_rows[shard_id] >= self.shard_size:
+                        data.flush()
+                        self._write_index()
+                        shard_rows.append(0)
+                        shard_id += 1
+                        data, scales = self._open_for_write(shard_id)
+
+                    row = shard_rows[shard_id]
+                    if scales is not None:
+                        # Per-row scaling keeps mel power values inside float16 range
+                        scale = float(mel.max()) or 1.0
+                        data[row] = (mel / scale).astype(np.float16)
+                        scales[row] = scale
+                    else:
+                        data[row] = mel
+                    rows[key] = [shard_id, row]
+                    shard_rows[shard_id] += 1
+
+                    if done % 500 == 0 or done == len(jobs):
+                        print(f"    {done}/{len(jobs)} chunks featurized")
+
+            data.flush()
+            if scales is not None:
+                scales.flush()
+            with open(os.path.join(self.directory, 'params.json'), 'w') as f:
+                json.dump({**self.params, 'dtype': self.dtype}, f, indent=2)
+            self._write_index()
+            self._shards.clear()
+            return len(jobs)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _open_for_read(self, shard_id: int):
+        if shard_id not in self._shards:
+            data = np.load(self._shard_path(shard_id), mmap_mode='r')
+            scales = None
+            if self.dtype == 'float16':
+                scales = np.load(self._shard_path(shard_id, '.scale'), mmap_mode='r')
+            self._shards[shard_id] = (data, scales)
+        return self._shards[shard_id]
+
+    def locate(self, chunks: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Shard ids and row numbers of chunks already in the store.
+
+        Raises:
+            KeyError: If a chunk has not been featurized
+        """
+        rows = self.index['rows']
+        positions = np.array([rows[chunk_key(chunk)] for chunk in chunks], dtype=np.int64)
+        positions = positions.reshape(-1, 2)
+        return positions[:, 0], positions[:, 1]
+
+    def read(self, shard_id: int, row: int) -> np.ndarray:
+        """Read one mel-spectrogram as float32 with shape FEATURE_SHAPE."""
+        data, scales = self._open_for_read(int(shard_id))
+        mel = np.asarray(data[int(row)], dtype=np.float32)
+        if scales is not None:
+            mel = mel * scales[int(row)]
+        return mel
+
+    def as_dataset(self, chunks: List[Dict], labels):
+        """
+        tf.data pipeline streaming (mel_spectrogram, label) pairs from the shards.
+
+        Args:
+            chunks: Chunk dicts (must already be featurized)
+            labels: Label per chunk
+
+        Returns:
+            Dataset of ((128, 469, 1) float32, label) in the given order
+        """
+        import tensorflow as tf
+
+        shard_ids, rows = self.locate(chunks)
+
+        def read_row(shard_id, row, label):
+            mel = tf.numpy_function(self.read, [shard_id, row], tf.float32)
+            mel.set_shape(FEATURE_SHAPE)
+            return tf.expand_dims(mel, axis=2), label
+
+        data = tf.data.Dataset.from_tensor_slices(
+            (shard_ids, rows, np.asarray(labels, dtype=np.float32))
+        )
+        return data.map(read_row)
@@ -0,0 +1,142 @@
+"""
+Prometheus metrics for the AuralGuard API.
+
+/predict records a histogram per request stage (queue, upload, decode,
+resample, mel, inference, log), end-to-end latency, request, error and
+load-shedding counters, and in-flight and queue-depth gauges;
+render_metrics() returns them in the Prometheus text format for the
+/metrics endpoint.
+
+With several worker processes (gunicorn), set PROMETHEUS_MULTIPROC_DIR to an
+empty directory before the workers start (gunicorn.conf.py does this):
+each process then writes its metrics to memory-mapped files there and
+/metrics aggregates all of them, whichever worker answers the scrape.
+"""
+
+import functools
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# 1 ms to 30 s: stages range from sub-millisecond logging to multi-second decodes
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3,
+                   0.5, 0.75, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PREDICT_STAGE_SECONDS = Histogram(
+    'auralguard_predict_stage_seconds', 'Duration of each /predict stage',
+    ['stage'], buckets=LATENCY_BUCKETS
+)
+PREDICT_LATENCY_SECONDS = Histogram(
+    'auralguard_predict_latency_seconds', 'End-to-end /predict latency',
+    buckets=LATENCY_BUCKETS
+)
+PREDICT_REQUESTS = Counter(
+    'auralguard_predict_requests', 'Finished /predict requests by HTTP status', ['status']
+)
+PREDICT_ERRORS = Counter(
+    'auralguard_predict_errors', 'Failed /predict requests by the stage that failed', ['stage']
+)
+MODEL_CACHE_LOOKUPS = Counter(
+    'auralguard_model_cache_lookups', 'Registry artifact cache lookups by result (hit or miss)', ['result']
+)
+PREDICT_IN_FLIGHT = Gauge(
+    'auralguard_predict_in_flight', '/predict requests being processed', multiprocess_mode='livesum'
+)
+SHADOW_QUEUE_DEPTH = Gauge(
+    'auralguard_shadow_queue_depth', 'Shadow evaluations waiting to run', multiprocess_mode='livesum'
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    'auralguard_admission_queue_depth', '/predict requests waiting for admission by lane', ['lane'],
+    multiprocess_mode='livesum'
+)
+ADMISSION_SHED = Counter(
+    'auralguard_admission_shed', '/predict requests rejected (queue_full) or dropped (deadline) by lane',
+    ['lane', 'reason']
+)
+
+
+class StageTimer:
+    """
+    Times the consecutive stages of one request.
+
+    Stage durations (seconds) collect in `stages`; nested code can add its
+    own entries to the same dict (see preprocess_audio_for_prediction's
+    timings argument). `current` is the stage in progress, if any.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.current: Optional[str] = None
+        self._start = 0.0
+
+    def start(self, name: str):
+        """Start timing a stage."""
+        self.current = name
+        self._start = time.perf_counter()
+
+    def stop(self):
+        """Record the stage in progress."""
+        self.stages[self.current] = time.perf_counter() - self._start
+        self.current = None
+
+
+def observe_stages(stages: Dict[str, float]):
+    """Add one request's stage durations to the stage histogram."""
+    for name, seconds in stages.items():
+        PREDICT_STAGE_SECONDS.labels(name).observe(seconds)
+
+
+def instrument_view(view):
+    """
+    Flask view decorator: in-flight gauge, request counter by status and latency histogram.
+    """
+    from flask import make_response
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        PREDICT_IN_FLIGHT.inc()
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            PREDICT_REQUESTS.labels('500').inc()
+            raise
+        finally:
+            PREDICT_IN_FLIGHT.dec()
+        PREDICT_REQUESTS.labels(str(response.status_code)).inc()
+        PREDICT_LATENCY_SECONDS.observe(time.perf_counter() - start)
+        return response
+
+    return wrapper
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Current metrics in the Prometheus text format.
+
+    Returns:
+        (body, content type)
+    """
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """Drop the live gauges of an exited worker process (multiprocess mode)."""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,274 @@
+"""
+Asynchronous MLflow logging for AuralGuard training.
+
+AsyncMLflowLogger queues metrics and sends them to one run in batches
+with MlflowClient.log_batch from a background thread, so training never
+waits on the tracking server. MLflowMetricsCallback streams per-epoch
+training metrics, throughput (examples/sec, step time, input-pipeline
+wait) and host/GPU utilization through it while fit() runs.
+"""
+
+import os
+import queue
+import resource
+import shutil
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import tensorflow as tf
+
+from utils.pipeline_profiler import InputWaitProbe
+
+try:
+    import psutil
+except ImportError:  # optional: fall back to /proc and getrusage
+    psutil = None
+
+# MlflowClient.log_batch accepts at most 1000 metrics per call
+MAX_BATCH_METRICS = 1000
+
+
+class AsyncMLflowLogger:
+    """
+    Background sender for one MLflow run.
+
+    Metrics are buffered and sent with log_batch when the buffer is full or
+    flush_interval seconds have passed. Other work (artifact uploads, model
+    registration) is queued with submit() and runs on the same thread, in
+    order. Failures are printed, never raised into the training loop.
+    """
+
+    def __init__(self, run_id: str, client=None, flush_interval: float = 5.0):
+        """
+        Args:
+            run_id: Run to log to
+            client: MlflowClient (default: for the current tracking URI)
+            flush_interval: Maximum seconds a metric waits in the buffer
+        """
+        from mlflow.tracking import MlflowClient
+
+        self.run_id = run_id
+        self.client = client or MlflowClient()
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._pending = []
+        self._errors = 0
+        self._thread = threading.Thread(target=self._run, name='mlflow-logger', daemon=True)
+        self._thread.start()
+
+    def log_metrics(self, metrics: Dict[str, float], step: int = 0):
+        """Queue metrics for the run (non-finite values are dropped)."""
+        from mlflow.entities import Metric
+
+        timestamp = int(time.time() * 1000)
+        batch = [Metric(name, float(value), timestamp, step) for name, value in metrics.items()
+                 if value is not None and np.isfinite(value)]
+        if batch:
+            self._queue.put(('metrics', batch))
+
+    def submit(self, fn: Callable, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the logging thread after everything queued before it."""
+        self._queue.put(('call', (fn, args, kwargs)))
+
+    def log_model(self, model, registered_model_name: Optional[str] = None,
+                  artifact_path: str = 'model'):
+        """
+        Save a Keras model in MLflow format now, then upload and register it in the background.
+
+        Args:
+            model: Keras model
+            registered_model_name: Register the upload as a new version of this model
+            artifact_path: Artifact directory in the run
+        """
+        import mlflow.keras
+
+        directory = tempfile.mkdtemp(prefix='auralguard_mlflow_model_')
+        local_path = os.path.join(directory, artifact_path)
+        mlflow.keras.save_model(model, local_path)
+
+        def upload():
+            try:
+                self.client.log_artifacts(self.run_id, local_path, artifact_path)
+                if registered_model_name:
+                    import mlflow
+                    from utils.artifact_cache import CHECKSUM_TAG, compute_tree_checksum
+
+                    version = mlflow.register_model(f"runs:/{self.run_id}/{artifact_path}",
+                                                    registered_model_name)
+                    # Lets serving caches verify their copy of this version
+                    self.client.set_model_version_tag(registered_model_name, version.version,
+                                                      CHECKSUM_TAG, compute_tree_checksum(local_path))
+                    print(f"Registered {registered_model_name} version {version.version}")
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+
+        self.submit(upload)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far has been sent; returns False on timeout."""
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Send everything queued and stop the thread."""
+        self._queue.put(('stop', None))
+        self._thread.join(timeout)
+
+    @property
+    def errors(self) -> int:
+        """Number of failed sends or tasks."""
+        return self._errors
+
+    def _send(self):
+        while self._pending:
+            batch, self._pending = self._pending[:MAX_BATCH_METRICS], self._pending[MAX_BATCH_METRICS:]
+            try:
+                self.client.log_batch(self.run_id, metrics=batch)
+            except Exception as e:
+                self._errors += 1
+                print(f"Warning: Could not log {len(batch)} metrics to MLflow: {e}")
+
+    def _run(self):
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            try:
+                kind, payload = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._send()
+                deadline = None
+                continue
+
+            if kind == 'metrics':
+                self._pending.extend(payload)
+                if len(self._pending) >= MAX_BATCH_METRICS:
+                    self._send()
+                if self._pending and deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                continue
+
+            # Everything below keeps queue order, so send buffered metrics first
+            self._send()
+            deadline = None
+            if kind == 'call':
+                fn, args, kwargs = payload
+                try:
+                    fn(*args, **kwargs)
+                except Exception as e:
+                    self._errors += 1
+                    print(f"Warning: MLflow background task failed: {e}")
+            elif kind == 'flush':
+                payload.set()
+            elif kind == 'stop':
+                return
+
+
+def hardware_metrics() -> Dict[str, float]:
+    """Host CPU and memory utilization, process memory and GPU memory in use."""
+    metrics = {}
+    if psutil is not None:
+        metrics['system_cpu_percent'] = psutil.cpu_percent(interval=None)
+        metrics['system_memory_percent'] = psutil.virtual_memory().percent
+        metrics['process_rss_mb'] = psutil.Process().memory_info().rss / 2 ** 20
+    else:
+        metrics['system_load_1m'] = os.getloadavg()[0]
+        try:
+            with open('/proc/self/statm') as f:
+                metrics['process_rss_mb'] = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+        except (OSError, ValueError):
+            # ru_maxrss is the peak, in KiB on Linux
+            metrics['process_peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    for index, device in enumerate(tf.config.list_physical_devices('GPU')):
+        try:
+            info = tf.config.experimental.get_memory_info(f'GPU:{index}')
+        except (ValueError, RuntimeError):
+            continue
+        metrics[f'gpu{index}_memory_mb'] = info['current'] / 2 ** 20
+        metrics[f'gpu{index}_peak_memory_mb'] = info['peak'] / 2 ** 20
+    return metrics
+
+
+class MLflowMetricsCallback(tf.keras.callbacks.Callback):
+    """
+    Streams training metrics to MLflow while fit() runs.
+
+    Per epoch (step = epoch number): Keras logs as train_<metric> and
+    val_<metric>, examples_per_second, step_time_ms, input_wait_ms and
+    input_wait_fraction, plus hardware metrics. Every log_every_steps steps
+    (step = global step): batch_loss and step_time_ms_batch.
+
+    Input-pipeline wait is the time between a step starting and its batch
+    leaving the input pipeline, measured by a probe appended to the training
+    dataset with wrap_dataset(). Without the probe, input wait is not logged.
+    """
+
+    def __init__(self, logger: AsyncMLflowLogger, batch_size: Optional[int] = None,
+                 log_every_steps: Optional[int] = None):
+        """
+        Args:
+            logger: AsyncMLflowLogger of the training run
+            batch_size: Global batch size, for examples/sec
+            log_every_steps: Also log batch-level metrics every N steps
+        """
+        super().__init__()
+        self.logger = logger
+        self.batch_size = batch_size
+        self.log_every_steps = log_every_steps
+        self.probe = InputWaitProbe()
+        self._global_step = 0
+
+    def wrap_dataset(self, dataset):
+        """Append the input-wait probe to a training dataset (after its prefetch)."""
+        return self.probe.wrap(dataset)
+
+    def on_train_begin(self, logs=None):
+        if psutil is not None:
+            psutil.cpu_percent(interval=None)  # start the utilization interval
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_start = time.perf_counter()
+        self._step_seconds = []
+        self._wait_seconds = []
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._step_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        end = time.perf_counter()
+        self._step_seconds.append(end - self._step_start)
+        self._global_step += 1
+        if self.probe.attached:
+            wait = self.probe.wait_since(self._step_start)
+            if wait is not None:
+                self._wait_seconds.append(wait)
+        if self.log_every_steps and self._global_step % self.log_every_steps == 0:
+            self.logger.log_metrics({
+                'batch_loss': (logs or {}).get('loss'),
+                'step_time_ms_batch': self._step_seconds[-1] * 1000
+            }, step=self._global_step)
+
+    def on_epoch_end(self, epoch, logs=None):
+        seconds = time.perf_counter() - self._epoch_start
+        metrics = {}
+        for name, value in (logs or {}).items():
+            if name == 'epoch_seconds':
+                metrics[name] = value
+            else:
+                metrics[name if name.startswith('val_') else f'train_{name}'] = value
+
+        steps = len(self._step_seconds)
+        if steps:
+            train_seconds = sum(self._step_seconds)
+            metrics['step_time_ms'] = train_seconds / steps * 1000
+            if self.batch_size:
+                metrics['examples_per_second'] = steps * self.batch_size / train_seconds
+        if self._wait_seconds:
+            metrics['input_wait_ms'] = float(np.mean(self._wait_seconds)) * 1000
+            metrics['input_wait_fraction'] = sum(self._wait_seconds) / max(sum(self._step_seconds), 1e-9)
+        metrics['epoch_wall_seconds'] = seconds
+        metrics.update(hardware_metrics())
+        self.logger.log_metrics(metrics, step=epoch + 1)
@@ -3,11 +3,20 @@ Model loading utilities for AuralGuard.
 Handles loading saved models and creating model architecture.
 """
 
-import tensorflow as tf
-from keras import Sequential
-from keras.layers import Dense, Conv2D, Flatten
 import os
 
+from utils.weight_store import (
+    compute_checksum,
+    is_serving_artifact,
+    load_serving_weights,
+    read_manifest,
+)
+
+# tensorflow and keras are imported lazily: loading them dominates API cold
+# start, so they are only pulled in once a model is built or loaded.
+
+REGISTRY_SCHEME = 'models:/'
+
 
 def create_model(input_shape=(128, 469, 1)):
     """
@@ -19,6 +28,10 @@ def create_model(input_shape=(128, 469, 1)):
     Returns:
         model: Compiled Keras model
     """
+    import tensorflow as tf
+    from keras import Sequential
+    from keras.layers import Dense, Conv2D, Flatten
+
     model = Sequential([
         Conv2D(filters=16, kernel_size=(3, 3), strides=(1, 1), 
                padding='same', activation='relu', 
@@ -49,33 +62,136 @@ def load_model(model_path):
     Load a saved model from file.
     
     Args:
-        model_path: Path to saved model (h5 or SavedModel format)
+        model_path: Path to saved model (h5, SavedModel, or a serving
+                    artifact directory from utils.weight_store), or an
+                    MLflow registry URI such as models:/AuralGuard/3,
+                    loaded through the local artifact cache
     
     Returns:
         model: Loaded Keras model
     """
+    if model_path.startswith(REGISTRY_SCHEME):
+        return load_registry_model(model_path)
+    
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"Model file not found: {model_path}")
     
+    import tensorflow as tf
+    import utils.tf_mel  # noqa: F401  registers the MelSpectrogram layer
+
     try:
+        if is_serving_artifact(model_path):
+            model, _ = load_serving_weights(model_path)
+            return model
         model = tf.keras.models.load_model(model_path)
         return model
     except Exception as e:
         raise Exception(f"Error loading model: {str(e)}")
 
 
+def load_registry_model(uri, cache=None):
+    """
+    Load a registered model version through the local artifact cache.
+    
+    The first load of a version on a host downloads it and exports a
+    serving artifact; later loads (from any process) map its weights.
+    
+    Args:
+        uri: Registry URI (see utils.model_manager.parse_registry_uri)
+        cache: RegistryArtifactCache (default: configured from the environment)
+    
+    Returns:
+        model: Loaded Keras model
+    """
+    from utils.artifact_cache import RegistryArtifactCache
+    from utils.model_manager import parse_registry_uri, resolve_registry_version
+    
+    name, _ = parse_registry_uri(uri)
+    version = resolve_registry_version(uri)
+    cache = cache or RegistryArtifactCache()
+    with cache.open(name, version) as entry:
+        model, _ = load_serving_weights(entry['serving_dir'])
+    return model
+
+
+def load_model_metadata(model_path):
+    """
+    Describe the model stored at a path for caching and logging.
+    
+    Args:
+        model_path: Path to saved model or serving artifact directory, or
+                    a registry URI
+    
+    Returns:
+        metadata: Dictionary with 'model_version' (a display label; the
+                  MODEL_VERSION environment variable overrides it for model
+                  files and SavedModel directories), 'checksum' (identifies
+                  the content) and 'format'
+    """
+    if model_path.startswith(REGISTRY_SCHEME):
+        from utils.artifact_cache import RegistryArtifactCache
+        from utils.model_manager import parse_registry_uri, resolve_registry_version
+        
+        name, _ = parse_registry_uri(model_path)
+        version = resolve_registry_version(model_path)
+        entry = RegistryArtifactCache().lookup(name, version)
+        return {
+            'model_version': f"{name}:{version}",
+            'checksum': entry['checksum'] if entry else None,
+            'format': 'mlflow_registry'
+        }
+    
+    if is_serving_artifact(model_path):
+        manifest = read_manifest(model_path)
+        return {
+            'model_version': manifest['model_version'],
+            'checksum': manifest['checksum'],
+            'format': 'serving_artifact'
+        }
+    
+    if os.path.isdir(model_path):
+        # SavedModel directories have no single file to hash
+        from utils.artifact_cache import compute_tree_checksum
+        return {
+            'model_version': os.getenv('MODEL_VERSION', os.path.basename(os.path.normpath(model_path))),
+            'checksum': compute_tree_checksum(model_path),
+            'format': 'saved_model'
+        }
+    
+    checksum = compute_checksum(model_path)
+    return {
+        'model_version': os.getenv('MODEL_VERSION', checksum.split(':', 1)[1][:12]),
+        'checksum': checksum,
+        'format': os.path.splitext(model_path)[1].lstrip('.') or 'keras'
+    }
+
+
+def model_expects_waveform(model):
+    """Whether a model takes raw (batch, 240000) waveforms (in-graph mel frontend)."""
+    return len(model.input_shape) == 2
+
+
 def predict_audio(model, mel_spectrogram):
     """
     Make prediction on preprocessed audio.
     
     Args:
         model: Loaded Keras model
-        mel_spectrogram: Preprocessed mel-spectrogram tensor
+        mel_spectrogram: Preprocessed mel-spectrogram tensor, or a
+                         (batch, 240000) waveform batch
     
     Returns:
         prediction: Probability score (0-1), where 1 = real, 0 = fake
         label: String label ('real' or 'fake')
     """
+    if len(mel_spectrogram.shape) == 2 and not model_expects_waveform(model):
+        # Waveform input for a mel-spectrogram model: apply the TF frontend
+        import tensorflow as tf
+        from utils.tf_mel import mel_spectrogram as tf_mel_spectrogram
+        mel_spectrogram = tf.expand_dims(tf_mel_spectrogram(mel_spectrogram), axis=-1)
+    elif len(mel_spectrogram.shape) == 4 and model_expects_waveform(model):
+        raise ValueError("Model expects a waveform but was given a mel-spectrogram")
+    
     prediction = model.predict(mel_spectrogram, verbose=0)
     probability = float(prediction[0][0])
     label = 'real' if probability >= 0.5 else 'fake'
@@ -83,3 +199,43 @@ def predict_audio(model, mel_spectrogram):
     return probability, label
 
 
+def warmup_model(model, batch_sizes=(1,), audio_bytes=None):
+    """
+    Run synthetic audio through decode -> mel -> inference before serving.
+    
+    The first calls after loading are much slower than steady state (Keras
+    builds its predict function per input shape, TF starts thread pools,
+    librosa loads resampler and FFT plans), so this pays that cost up front.
+    
+    Args:
+        model: Loaded Keras model
+        batch_sizes: Batch sizes to run inference at
+        audio_bytes: Audio file contents to use (synthetic WAV if None)
+    
+    Returns:
+        timings: Dictionary mapping stage name to seconds taken
+    """
+    import time
+    import numpy as np
+    from utils.audio_processor import preprocess_audio_for_prediction, synthesize_wav_bytes
+    
+    if audio_bytes is None:
+        # Use a non-16kHz rate so the resampler is exercised too
+        audio_bytes = synthesize_wav_bytes(sample_rate=22050)
+    
+    timings = {}
+    start = time.perf_counter()
+    model_input = preprocess_audio_for_prediction(audio_bytes, waveform=model_expects_waveform(model))
+    timings['preprocess'] = time.perf_counter() - start
+    
+    for batch_size in batch_sizes:
+        batch = np.repeat(np.asarray(model_input), batch_size, axis=0)
+        start = time.perf_counter()
+        if batch_size == 1:
+            predict_audio(model, batch)
+        else:
+            model.predict(batch, verbose=0)
+        timings[f'predict_batch_{batch_size}'] = time.perf_counter() - start
+    
+    return timings
+
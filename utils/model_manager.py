@@ -0,0 +1,288 @@
+"""
+Model lifecycle management for the AuralGuard API.
+Loads the serving model from MODEL_PATH or the MLflow model registry,
+watches the source for new versions and hot-swaps them without downtime.
+"""
+
+import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from utils.model_loader import REGISTRY_SCHEME, load_model, load_model_metadata, warmup_model
+
+
+def parse_registry_uri(uri: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a registry URI into model name and version selector.
+
+    Args:
+        uri: URI such as 'models:/AuralGuard', 'models:/AuralGuard/3',
+             'models:/AuralGuard/latest', 'models:/AuralGuard/Production'
+             or 'models:/AuralGuard@champion'
+
+    Returns:
+        (name, selector): selector is None for the latest version
+    """
+    if not uri.startswith(REGISTRY_SCHEME):
+        raise ValueError(f"Not a model registry URI: {uri}")
+    path = uri[len(REGISTRY_SCHEME):].strip('/')
+    if '@' in path:
+        name, alias = path.split('@', 1)
+        return name, f"@{alias}"
+    name, _, selector = path.partition('/')
+    if selector in ('', 'latest'):
+        selector = None
+    return name, selector
+
+
+def resolve_registry_version(uri: str) -> str:
+    """
+    Resolve a registry URI to a concrete model version number.
+
+    Args:
+        uri: Registry URI (see parse_registry_uri)
+
+    Returns:
+        version: Registered model version as a string
+    """
+    from mlflow.tracking import MlflowClient
+
+    name, selector = parse_registry_uri(uri)
+    client = MlflowClient()
+    if selector is None:
+        versions = client.search_model_versions(f"name='{name}'")
+        if not versions:
+            raise LookupError(f"No versions registered for model '{name}'")
+        return str(max(int(v.version) for v in versions))
+    if selector.startswith('@'):
+        return str(client.get_model_version_by_alias(name, selector[1:]).version)
+    if selector.isdigit():
+        return selector
+    versions = client.get_latest_versions(name, stages=[selector])
+    if not versions:
+        raise LookupError(f"No version of '{name}' in stage '{selector}'")
+    return str(versions[0].version)
+
+
+class ModelHandle:
+    """
+    One loaded model version plus the number of requests using it.
+
+    `checksum` identifies the content; `version` is only a display label
+    (it may come from MODEL_VERSION or a directory name).
+    """
+
+    def __init__(self, model, metadata: Dict, source_key):
+        self.model = model
+        self.metadata = metadata
+        self.version = metadata['model_version']
+        self.checksum = metadata.get('checksum')
+        self.source_key = source_key
+        self.loaded_at = time.time()
+        self._in_flight = 0
+        self._idle = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _enter(self):
+        with self._idle:
+            self._in_flight += 1
+
+    def _exit(self):
+        with self._idle:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._idle.notify_all()
+
+    def drain(self, timeout: float) -> bool:
+        """
+        Wait for in-flight requests on this version to finish.
+
+        Returns:
+            True if drained, False if the timeout expired first
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._in_flight == 0, timeout=timeout)
+
+
+class ModelManager:
+    """
+    Owns the serving model and swaps in new versions atomically.
+
+    Requests use `with manager.acquire() as handle:` and keep using the
+    version they acquired even if a swap happens mid-request; the old
+    version is released once its in-flight requests have drained.
+    """
+
+    def __init__(self,
+                 model_path: Optional[str] = None,
+                 registry_uri: Optional[str] = None,
+                 poll_interval: float = 30.0,
+                 warmup: bool = True,
+                 warmup_batch_sizes=(1,),
+                 drain_timeout: float = 60.0):
+        """
+        Args:
+            model_path: Local model file or serving artifact directory
+            registry_uri: MLflow registry URI; takes precedence over model_path
+            poll_interval: Seconds between checks for a new version (0 disables)
+            warmup: Run warmup_model() on each version before it serves traffic
+            warmup_batch_sizes: Batch sizes passed to warmup_model()
+            drain_timeout: Seconds to wait for in-flight requests on a replaced version
+        """
+        if not model_path and not registry_uri:
+            raise ValueError("Either model_path or registry_uri is required")
+        self.model_path = model_path
+        self.registry_uri = registry_uri
+        self.poll_interval = poll_interval
+        self.warmup = warmup
+        self.warmup_batch_sizes = tuple(warmup_batch_sizes)
+        self.drain_timeout = drain_timeout
+
+        self._current: Optional[ModelHandle] = None
+        self._swap_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def source(self) -> str:
+        return self.registry_uri or self.model_path
+
+    @property
+    def current(self) -> Optional[ModelHandle]:
+        return self._current
+
+    @property
+    def ready(self) -> bool:
+        return self._current is not None
+
+    def source_available(self) -> bool:
+        """Whether the configured source can supply a model at all."""
+        return bool(self.registry_uri) or os.path.exists(self.model_path)
+
+    @contextmanager
+    def acquire(self):
+        """
+        Pin the current model version for the duration of a request.
+
+        Yields:
+            ModelHandle for the current version
+
+        Raises:
+            RuntimeError: If no model has been loaded yet
+        """
+        with self._swap_lock:
+            handle = self._current
+            if handle is None:
+                raise RuntimeError("No model loaded")
+            handle._enter()
+        try:
+            yield handle
+        finally:
+            handle._exit()
+
+    def _source_key(self):
+        """Cheap fingerprint of the source used to detect new versions."""
+        if self.registry_uri:
+            return ('registry', resolve_registry_version(self.registry_uri))
+
+        path = self.model_path
+        if os.path.isdir(path):
+            # Serving artifacts publish manifest.json last, so it marks a
+            # complete write
+            manifest = os.path.join(path, 'manifest.json')
+            if not os.path.exists(manifest):
+                # SavedModel dirs: files can change in place without
+                # touching the directory's own mtime
+                stats = [os.stat(os.path.join(root, name))
+                         for root, _, files in os.walk(path) for name in files]
+                return ('tree', len(stats), max((stat.st_mtime_ns for stat in stats), default=0),
+                        sum(stat.st_size for stat in stats))
+            path = manifest
+        stat = os.stat(path)
+        return ('file', stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, source_key) -> ModelHandle:
+        """Load and warm up the version identified by source_key."""
+        if source_key[0] == 'registry':
+            # Resolved through the local artifact cache
+            name, _ = parse_registry_uri(self.registry_uri)
+            path = f"{REGISTRY_SCHEME}{name}/{source_key[1]}"
+        else:
+            path = self.model_path
+        model = load_model(path)
+        metadata = load_model_metadata(path)
+
+        if self.warmup:
+            timings = warmup_model(model, batch_sizes=self.warmup_batch_sizes)
+            print(f"[model {metadata['model_version']}] warmup complete: " + ", ".join(
+                f"{stage}={seconds:.3f}s" for stage, seconds in timings.items()))
+        return ModelHandle(model, metadata, source_key)
+
+    def reload_if_changed(self) -> bool:
+        """
+        Load, warm and swap in a new version if the source has changed.
+
+        Returns:
+            True if a new version was swapped in
+        """
+        with self._reload_lock:
+            source_key = self._source_key()
+            current = self._current
+            if current is not None and current.source_key == source_key:
+                return False
+
+            handle = self._load(source_key)
+            if current is not None and handle.checksum and handle.checksum == current.checksum:
+                # Touched but identical content: keep the warm instance
+                # (under the new label, e.g. another registry version)
+                current.source_key = source_key
+                current.version = handle.version
+                return False
+
+            with self._swap_lock:
+                previous, self._current = self._current, handle
+            print(f"[model {handle.version}] now serving from {self.source}")
+
+            if previous is not None:
+                if previous.drain(self.drain_timeout):
+                    print(f"[model {previous.version}] drained and retired")
+                else:
+                    print(f"[model {previous.version}] retired with "
+                          f"{previous.in_flight} requests still in flight")
+            self.last_error = None
+            return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            if not self.source_available():
+                continue
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                # Keep serving the current version if the new one is broken
+                self.last_error = str(e)
+                print(f"Warning: model reload from {self.source} failed: {e}")
+                traceback.print_exc()
+
+    def start(self):
+        """Start watching the source for new versions in the background."""
+        if self.poll_interval <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name='model-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        """Stop the background watcher."""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
@@ -0,0 +1,272 @@
+"""
+Training input pipeline profiler for AuralGuard.
+
+Two measurements answer "what limits training throughput":
+
+- Input stages in isolation: each prefix of the input pipeline (e.g.
+  decode, decode + mel-spectrogram, full shuffled/batched pipeline) is
+  iterated on its own, and the difference between consecutive prefixes
+  is the per-example cost of the stage.
+- Training steps: StepProfiler times every step of the real training
+  loop and how long it waited for its batch (InputWaitProbe), so model
+  compute is step time minus input wait. It also records TF profiler
+  traces for a window of steps (view with TensorBoard's profile plugin).
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import tensorflow as tf
+
+# Input-wait fractions above which a run counts as (partly) input-bound
+INPUT_BOUND_FRACTION = 0.5
+PARTLY_INPUT_BOUND_FRACTION = 0.1
+
+
+class InputWaitProbe:
+    """
+    Measures how long each training step waits for its batch.
+
+    wrap() appends a pass-through map to the end of a dataset (after its
+    prefetch) that records when each batch leaves the pipeline; wait_since()
+    returns the delay between a step starting and its batch arriving.
+    """
+
+    def __init__(self):
+        self._delivered = []
+        self._lock = threading.Lock()
+        self.attached = False
+
+    def wrap(self, dataset):
+        """Return the dataset with the probe appended."""
+        def record():
+            with self._lock:
+                self._delivered.append(time.perf_counter())
+            return np.int64(0)
+
+        def probe(*batch):
+            token = tf.py_function(record, [], tf.int64)
+            with tf.control_dependencies([token]):
+                return tf.nest.map_structure(tf.identity, batch)
+
+        self.attached = True
+        return dataset.map(probe)
+
+    def wait_since(self, step_start: float) -> Optional[float]:
+        """Seconds between step_start and the latest delivered batch (None if none)."""
+        with self._lock:
+            delivered, self._delivered = self._delivered, []
+        if not delivered:
+            return None
+        return max(delivered[-1] - step_start, 0.0)
+
+
+def benchmark_dataset(dataset, max_elements: int, warmup_elements: int = 1) -> Dict:
+    """
+    Iterate a dataset and time it.
+
+    Args:
+        dataset: tf.data.Dataset
+        max_elements: Elements to time (after warmup)
+        warmup_elements: Elements consumed first and not timed (pipeline start-up)
+
+    Returns:
+        Dict with elements, seconds and ms_per_element
+    """
+    iterator = iter(dataset)
+    for _ in range(warmup_elements):
+        if next(iterator, None) is None:
+            break
+    elements = 0
+    start = time.perf_counter()
+    for _ in range(max_elements):
+        if next(iterator, None) is None:
+            break
+        elements += 1
+    seconds = time.perf_counter() - start
+    return {
+        'elements': elements,
+        'seconds': seconds,
+        'ms_per_element': seconds / elements * 1000 if elements else None
+    }
+
+
+def profile_input_stages(stages: Sequence[Tuple[str, object, int]], max_examples: int = 64) -> List[Dict]:
+    """
+    Time cumulative prefixes of an input pipeline.
+
+    Args:
+        stages: (name, dataset, examples_per_element) for each prefix, in
+                pipeline order; each dataset includes all earlier stages
+        max_examples: Examples timed per prefix
+
+    Returns:
+        One dict per stage with the cumulative and incremental
+        ms_per_example (the incremental cost is the stage's own)
+    """
+    results = []
+    previous = 0.0
+    for name, dataset, examples_per_element in stages:
+        elements = max(1, max_examples // examples_per_element)
+        timing = benchmark_dataset(dataset, elements)
+        if timing['elements']:
+            cumulative = timing['ms_per_element'] / examples_per_element
+        else:
+            cumulative = None
+        results.append({
+            'stage': name,
+            'examples': timing['elements'] * examples_per_element,
+            'cumulative_ms_per_example': cumulative,
+            'stage_ms_per_example': None if cumulative is None else max(cumulative - previous, 0.0)
+        })
+        if cumulative is not None:
+            previous = cumulative
+        print(f"  {name}: {cumulative or 0.0:.2f} ms/example cumulative")
+    return results
+
+
+class StepProfiler(tf.keras.callbacks.Callback):
+    """
+    Per-step timing of the training loop, with a TF profiler trace window.
+
+    Steps are timed from on_train_batch_begin to on_train_batch_end; with
+    the probe attached to the training dataset (wrap_dataset), each step's
+    input wait is recorded too.
+    """
+
+    def __init__(self, trace_dir: Optional[str] = None, trace_start_step: int = 5,
+                 trace_steps: int = 10, skip_steps: int = 1):
+        """
+        Args:
+            trace_dir: Directory for TF profiler traces (None disables tracing)
+            trace_start_step: Global step at which the trace starts
+            trace_steps: Steps to trace
+            skip_steps: First steps left out of the summary (tracing and
+                        graph building make them unrepresentative)
+        """
+        super().__init__()
+        self.probe = InputWaitProbe()
+        self.trace_dir = trace_dir
+        self.trace_start_step = trace_start_step
+        self.trace_steps = trace_steps
+        self.skip_steps = skip_steps
+        self.steps = []
+        self._global_step = 0
+        self._tracing = False
+        self.traced_steps = 0
+
+    def wrap_dataset(self, dataset):
+        """Attach the input-wait probe to the training dataset."""
+        return self.probe.wrap(dataset)
+
+    def on_train_batch_begin(self, batch, logs=None):
+        if self.trace_dir and not self._tracing and self._global_step == self.trace_start_step:
+            tf.profiler.experimental.start(self.trace_dir)
+            self._tracing = True
+        self._step_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        seconds = time.perf_counter() - self._step_start
+        wait = self.probe.wait_since(self._step_start) if self.probe.attached else None
+        self.steps.append({'step': self._global_step, 'seconds': seconds, 'input_wait': wait})
+        self._global_step += 1
+        if self._tracing and self._global_step >= self.trace_start_step + self.trace_steps:
+            self._stop_trace()
+
+    def on_train_end(self, logs=None):
+        if self._tracing:
+            self._stop_trace()
+
+    def _stop_trace(self):
+        tf.profiler.experimental.stop()
+        self._tracing = False
+        self.traced_steps = self._global_step - self.trace_start_step
+
+    def summary(self) -> Dict:
+        """Step time, input wait and compute time statistics (in ms)."""
+        steps = self.steps[self.skip_steps:] or self.steps
+        if not steps:
+            return {'steps': 0}
+        seconds = np.array([step['seconds'] for step in steps])
+        summary = {
+            'steps': len(steps),
+            'step_ms_mean': float(seconds.mean() * 1000),
+            'step_ms_p50': float(np.percentile(seconds, 50) * 1000),
+            'step_ms_p95': float(np.percentile(seconds, 95) * 1000),
+            'step_ms_max': float(seconds.max() * 1000)
+        }
+        waits = [step['input_wait'] for step in steps if step['input_wait'] is not None]
+        if waits:
+            waits = np.array(waits)
+            total = float(seconds.sum())
+            summary.update({
+                'input_wait_ms_mean': float(waits.mean() * 1000),
+                'input_wait_ms_p95': float(np.percentile(waits, 95) * 1000),
+                'compute_ms_mean': float((seconds.mean() - waits.mean()) * 1000),
+                'input_wait_fraction': float(waits.sum() / total) if total else 0.0
+            })
+        summary['traced_steps'] = self.traced_steps
+        return summary
+
+
+def bottleneck_report(stages: List[Dict], steps: Dict, batch_size: int) -> Dict:
+    """
+    Combine stage and step timings into a bottleneck verdict.
+
+    Args:
+        stages: Output of profile_input_stages()
+        steps: StepProfiler.summary()
+        batch_size: Examples per training step
+
+    Returns:
+        Report dict with 'stages', 'steps', 'verdict' and 'slowest_stage'
+    """
+    report = {'batch_size': batch_size, 'stages': stages, 'steps': steps}
+    timed = [stage for stage in stages if stage['stage_ms_per_example'] is not None]
+    if timed:
+        slowest = max(timed, key=lambda stage: stage['stage_ms_per_example'])
+        report['slowest_stage'] = slowest['stage']
+        # What the input pipeline alone could sustain vs what the model consumed
+        pipeline_ms = timed[-1]['cumulative_ms_per_example']
+        report['input_examples_per_second'] = 1000.0 / pipeline_ms if pipeline_ms else None
+    if steps.get('steps'):
+        report['training_examples_per_second'] = batch_size * 1000.0 / steps['step_ms_mean']
+
+    fraction = steps.get('input_wait_fraction')
+    if fraction is None:
+        report['verdict'] = 'unknown (input wait not measured)'
+    elif fraction >= INPUT_BOUND_FRACTION:
+        report['verdict'] = 'input-bound'
+    elif fraction >= PARTLY_INPUT_BOUND_FRACTION:
+        report['verdict'] = 'partly input-bound'
+    else:
+        report['verdict'] = 'compute-bound'
+    return report
+
+
+def format_report(report: Dict) -> str:
+    """Human-readable bottleneck report."""
+    lines = ["Input pipeline stages (per example):"]
+    for stage in report['stages']:
+        if stage['stage_ms_per_example'] is None:
+            lines.append(f"  {stage['stage']:<32s} (no data)")
+            continue
+        lines.append(f"  {stage['stage']:<32s} {stage['stage_ms_per_example']:8.2f} ms "
+                     f"(cumulative {stage['cumulative_ms_per_example']:.2f} ms)")
+    steps = report['steps']
+    if steps.get('steps'):
+        lines.append(f"Training steps ({steps['steps']} timed, batch {report['batch_size']}):")
+        lines.append(f"  step time      {steps['step_ms_mean']:8.1f} ms mean, "
+                     f"{steps['step_ms_p95']:.1f} ms p95")
+        if 'input_wait_fraction' in steps:
+            lines.append(f"  input wait     {steps['input_wait_ms_mean']:8.1f} ms mean "
+                         f"({steps['input_wait_fraction']:.0%} of step time)")
+            lines.append(f"  model compute  {steps['compute_ms_mean']:8.1f} ms mean")
+    if report.get('input_examples_per_second') and report.get('training_examples_per_second'):
+        lines.append(f"Input pipeline alone: {report['input_examples_per_second']:.1f} examples/sec; "
+                     f"training: {report['training_examples_per_second']:.1f} examples/sec")
+    lines.append(f"Verdict: {report['verdict']}"
+                 + (f"; slowest input stage: {report['slowest_stage']}" if report.get('slowest_stage') else ""))
+    return "\n".join(lines)
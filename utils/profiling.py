@@ -0,0 +1,346 @@
+"""
+On-demand profiling of a running AuralGuard API process.
+
+- SamplingProfiler: wall-clock sampling profile of one thread (one /predict
+  call), aggregated per function and as collapsed stacks (flame graph input).
+- MemorySnapshots: tracemalloc snapshots of the process, with the top
+  allocation sites and the difference between two snapshots.
+- ProfilingGate: the opt-in switch and token check guarding both.
+
+Everything here is stdlib only. tracemalloc sees allocations made through
+Python's allocators (Python objects, NumPy arrays), not memory allocated
+inside TensorFlow kernels; the snapshot's RSS shows the process total.
+"""
+
+import collections
+import functools
+import hmac
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+PROFILE_HEADER = 'X-Profile'
+TOKEN_HEADER = 'X-Profiling-Token'
+KEY_TYPES = ('lineno', 'filename', 'traceback')
+
+# Frames of the profiling machinery itself, left out of memory statistics
+_IGNORED_FILES = (tracemalloc.__file__, '<frozen importlib._bootstrap>',
+                  '<frozen importlib._bootstrap_external>', '<unknown>')
+
+
+def _short_path(filename: str) -> str:
+    """Filename relative to the sys.path entry it was imported from."""
+    for prefix in sorted((path for path in sys.path if path), key=len, reverse=True):
+        if filename.startswith(prefix + os.sep):
+            return filename[len(prefix) + 1:]
+    return filename
+
+
+def rss_mb() -> Optional[float]:
+    """Resident set size of this process in MiB (None where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of the thread that enters it, from a background thread.
+
+    Samples are wall-clock: time a call spends in C code (TensorFlow, audio
+    decoding) or waiting on I/O is attributed to the Python frame that made
+    the call. Use as a context manager around the code to profile.
+    """
+
+    def __init__(self, interval: float = 0.005, max_samples: int = 20000):
+        """
+        Args:
+            interval: Seconds between samples
+            max_samples: Stop sampling after this many samples
+        """
+        self.interval = interval
+        self.max_samples = max_samples
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+        self._start = 0.0
+
+    def __enter__(self):
+        self._thread_id = threading.get_ident()
+        self._start = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._sampler.join()
+        self.duration = time.perf_counter() - self._start
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval) and self.samples < self.max_samples:
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if stack:
+                # Root first, as in collapsed-stack files
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def report(self, limit: int = 30, stack_limit: int = 20) -> Dict:
+        """
+        Summarize the samples.
+
+        Args:
+            limit: Functions listed, by total samples
+            stack_limit: Collapsed stacks listed, by samples
+
+        Returns:
+            Dict with samples, interval_ms and duration_ms; functions (self and
+            total ms and fraction per function, where self counts samples in
+            which the function itself was running; the frames common to all
+            samples are left out); and stacks ("a;b;c count"
+            lines, the input format of flamegraph.pl and speedscope)
+        """
+        self_samples = collections.Counter()
+        total_samples = collections.Counter()
+        for stack, count in self.stacks.items():
+            self_samples[stack[-1]] += count
+            for frame in set(stack):  # once per sample, even when recursive
+                total_samples[frame] += count
+
+        def label(frame):
+            filename, lineno, name = frame
+            return f"{name} ({_short_path(filename)}:{lineno})"
+
+        ms_per_sample = self.duration * 1000 / self.samples if self.samples else 0.0
+        # Frames in every sample (thread start, server, Flask dispatch) only
+        # repeat the duration, unless they are where the time went
+        ranked = [(frame, count) for frame, count in total_samples.most_common()
+                  if count < self.samples or self_samples[frame]]
+        functions = [{
+            'function': label(frame),
+            'self_ms': self_samples[frame] * ms_per_sample,
+            'total_ms': count * ms_per_sample,
+            'self_fraction': self_samples[frame] / self.samples,
+            'total_fraction': count / self.samples
+        } for frame, count in ranked[:limit]]
+        stacks = [f"{';'.join(label(frame) for frame in stack)} {count}"
+                  for stack, count in self.stacks.most_common(stack_limit)]
+        return {
+            'samples': self.samples,
+            'interval_ms': self.interval * 1000,
+            'duration_ms': self.duration * 1000,
+            'functions': functions,
+            'stacks': stacks
+        }
+
+
+class MemorySnapshots:
+    """
+    tracemalloc snapshots of this process, kept for comparison.
+
+    Tracing starts with the first snapshot, so allocations made before it
+    are not attributed; take a first snapshot, run the suspect traffic, then
+    take a second and diff them. Tracing slows allocation-heavy code down
+    (typically 1.5-2x) until clear() stops it.
+    """
+
+    def __init__(self, max_snapshots: int = 4, nframes: int = 10):
+        """
+        Args:
+            max_snapshots: Snapshots kept (oldest dropped first; each holds
+                           every live traced allocation)
+            nframes: Stack frames recorded per allocation
+        """
+        self.max_snapshots = max_snapshots
+        self.nframes = nframes
+        self._snapshots = collections.OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def take(self) -> Dict:
+        """
+        Take a snapshot, starting tracing first if needed.
+
+        Returns:
+            Dict with id, pid, started_tracing (True if this call started
+            tracing), traced_mb, traced_peak_mb and rss_mb
+        """
+        with self._lock:
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start(self.nframes)
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+            )
+            traced, peak = tracemalloc.get_traced_memory()
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return {
+            'id': snapshot_id,
+            'pid': os.getpid(),
+            'timestamp': time.time(),
+            'started_tracing': started,
+            'traced_mb': traced / 2 ** 20,
+            'traced_peak_mb': peak / 2 ** 20,
+            'rss_mb': rss_mb()
+        }
+
+    def _get(self, snapshot_id: int) -> tracemalloc.Snapshot:
+        with self._lock:
+            if snapshot_id not in self._snapshots:
+                raise KeyError(f"No snapshot {snapshot_id} (kept: {list(self._snapshots)})")
+            return self._snapshots[snapshot_id]
+
+    @staticmethod
+    def _check_key_type(key_type: str):
+        if key_type not in KEY_TYPES:
+            raise ValueError(f"key_type must be one of {', '.join(KEY_TYPES)}, got {key_type!r}")
+
+    @staticmethod
+    def _site(statistic, key_type: str) -> Dict:
+        frame = statistic.traceback[0]
+        site = {'site': _short_path(frame.filename) if key_type == 'filename'
+                else f"{_short_path(frame.filename)}:{frame.lineno}"}
+        if key_type == 'traceback':
+            site['traceback'] = [f"{_short_path(f.filename)}:{f.lineno}" for f in statistic.traceback]
+        return site
+
+    @staticmethod
+    def _filtered(snapshot: tracemalloc.Snapshot, include: Optional[str]) -> tracemalloc.Snapshot:
+        """Only allocations with a frame in a file whose path contains include (e.g. 'librosa')."""
+        if not include:
+            return snapshot
+        return snapshot.filter_traces([tracemalloc.Filter(True, f"*{include}*", all_frames=True)])
+
+    def top(self, snapshot_id: int, key_type: str = 'lineno', limit: int = 25,
+            include: Optional[str] = None) -> List[Dict]:
+        """
+        Largest allocation sites of a snapshot.
+
+        Args:
+            snapshot_id: Id returned by take()
+            key_type: Group by 'lineno', 'filename' or 'traceback'
+            limit: Sites returned
+            include: Only count allocations with a frame in a matching file path
+
+        Returns:
+            List of dicts with site, size_kb and count, largest first
+        """
+        self._check_key_type(key_type)
+        statistics = self._filtered(self._get(snapshot_id), include).statistics(key_type)
+        return [{**self._site(statistic, key_type),
+                 'size_kb': statistic.size / 1024,
+                 'count': statistic.count}
+                for statistic in statistics[:limit]]
+
+    def diff(self, from_id: int, to_id: int, key_type: str = 'lineno', limit: int = 25,
+             include: Optional[str] = None) -> List[Dict]:
+        """
+        Allocation sites that grew or shrank the most between two snapshots.
+
+        Returns:
+            List of dicts with site, size_diff_kb, count_diff, size_kb and
+            count (in the later snapshot), largest change first
+        """
+        self._check_key_type(key_type)
+        old = self._filtered(self._get(from_id), include)
+        new = self._filtered(self._get(to_id), include)
+        return [{**self._site(statistic, key_type),
+                 'size_diff_kb': statistic.size_diff / 1024,
+                 'count_diff': statistic.count_diff,
+                 'size_kb': statistic.size / 1024,
+                 'count': statistic.count}
+                for statistic in new.compare_to(old, key_type)[:limit]]
+
+    def clear(self):
+        """Stop tracing and drop all snapshots."""
+        with self._lock:
+            self._snapshots.clear()
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+class ProfilingGate:
+    """
+    Opt-in switch and access check for the profiling endpoints.
+
+    Profiling is only available when enabled and a token is configured;
+    callers send the token in the X-Profiling-Token header.
+    """
+
+    def __init__(self, enabled: bool, token: Optional[str], interval: float = 0.005):
+        """
+        Args:
+            enabled: Profiling switched on (PROFILING_ENABLED)
+            token: Shared secret callers must send (PROFILING_TOKEN)
+            interval: Sampling interval of request profiles, in seconds
+        """
+        self.enabled = bool(enabled and token)
+        self.token = token
+        self.interval = interval
+        if enabled and not token:
+            print("Warning: PROFILING_ENABLED is set without PROFILING_TOKEN; profiling stays disabled")
+
+    def authorized(self, headers) -> bool:
+        """Whether request headers carry the profiling token."""
+        supplied = headers.get(TOKEN_HEADER, '')
+        return self.enabled and hmac.compare_digest(supplied.encode(), self.token.encode())
+
+    def protect(self, view):
+        """
+        Flask view decorator for profiling endpoints: 404 while profiling is
+        disabled (the endpoints do not exist), 403 without a valid token.
+        """
+        from flask import jsonify, request
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return jsonify({'error': 'Not found'}), 404
+            if not self.authorized(request.headers):
+                return jsonify({'error': f'Missing or invalid {TOKEN_HEADER} header'}), 403
+            return view(*args, **kwargs)
+
+        return wrapper
+
+    def profile_requests(self, view):
+        """
+        Flask view decorator: profile the call when the request has an
+        `X-Profile: cpu` header, adding the report to the JSON response as
+        'profile'. The header is ignored while profiling is disabled.
+        """
+        from flask import json, jsonify, make_response, request
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.enabled or request.headers.get(PROFILE_HEADER, '').lower() != 'cpu':
+                return view(*args, **kwargs)
+            if not self.authorized(request.headers):
+                return jsonify({'error': f'Missing or invalid {TOKEN_HEADER} header'}), 403
+            with SamplingProfiler(self.interval) as profiler:
+                response = make_response(view(*args, **kwargs))
+            body = response.get_json(silent=True)
+            if isinstance(body, dict):
+                body['profile'] = profiler.report()
+                response.set_data(json.dumps(body))
+            return response
+
+        return wrapper
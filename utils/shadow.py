@@ -0,0 +1,161 @@
+"""
+Shadow model evaluation for AuralGuard.
+Runs candidate models on the same decoded audio as the primary model, off
+the request path, and tracks how often they agree. Each shadow gets the
+input it was built for: the primary's mel-spectrogram, or the waveform for
+models with the in-graph mel frontend.
+"""
+
+import queue
+import threading
+import traceback
+from typing import Callable, Dict, Optional
+
+from utils.metrics import SHADOW_QUEUE_DEPTH
+from utils.model_loader import model_expects_waveform, predict_audio
+
+
+class ShadowEvaluator:
+    """
+    Scores primary predictions with one or more shadow models in the background.
+
+    Work is queued by submit() and processed by daemon worker threads. When the
+    queue is full or the instance reports overload, new work is shed instead of
+    competing with primary traffic.
+    """
+
+    def __init__(self,
+                 managers: Dict[str, 'ModelManager'],
+                 db_logger=None,
+                 max_queue: int = 16,
+                 workers: int = 1,
+                 is_overloaded: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            managers: Shadow name -> ModelManager serving that shadow model
+            db_logger: PredictionLogger used to attach shadow scores to documents
+            max_queue: Maximum pending shadow jobs before new ones are shed
+            workers: Number of background worker threads
+            is_overloaded: Callable returning True when shadow work should be shed
+        """
+        self.managers = managers
+        self.db_logger = db_logger
+        self.is_overloaded = is_overloaded or (lambda: False)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._stats = {name: {'compared': 0, 'agreed': 0, 'errors': 0} for name in managers}
+        self._shed = 0
+        self._workers = [
+            threading.Thread(target=self._run, name=f'shadow-worker-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, prediction_id, waveform, mel_spectrogram, primary_probability: float,
+               primary_label: str, primary_version: Optional[str] = None) -> bool:
+        """
+        Queue a primary prediction for shadow scoring.
+
+        Args:
+            prediction_id: Database id of the primary prediction (may be None)
+            waveform: Decoded (1, 240000) waveform batch
+            mel_spectrogram: (1, 128, 469, 1) mel-spectrogram batch already
+                             computed for the primary model, or None if the
+                             primary takes waveforms (mel shadows then use
+                             the TF frontend)
+            primary_probability: Primary model probability
+            primary_label: Primary model label
+            primary_version: Primary model version
+
+        Returns:
+            True if queued, False if shed
+        """
+        if not self.managers:
+            return False
+        if self.is_overloaded():
+            self._record_shed()
+            return False
+        try:
+            self._queue.put_nowait((prediction_id, waveform, mel_spectrogram, primary_probability,
+                                    primary_label, primary_version))
+            SHADOW_QUEUE_DEPTH.inc()
+            return True
+        except queue.Full:
+            self._record_shed()
+            return False
+
+    def _record_shed(self):
+        with self._lock:
+            self._shed += 1
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            SHADOW_QUEUE_DEPTH.dec()
+            try:
+                self._evaluate(*job)
+            except Exception as e:
+                print(f"Error in shadow evaluation: {e}")
+                traceback.print_exc()
+            finally:
+                self._queue.task_done()
+
+    def _evaluate(self, prediction_id, waveform, mel_spectrogram, primary_probability,
+                  primary_label, primary_version):
+        results = []
+        for name, manager in self.managers.items():
+            if not manager.ready:
+                continue
+            try:
+                with manager.acquire() as handle:
+                    if model_expects_waveform(handle.model) or mel_spectrogram is None:
+                        model_input = waveform
+                    else:
+                        model_input = mel_spectrogram
+                    probability, label = predict_audio(handle.model, model_input)
+                    version = handle.version
+            except Exception as e:
+                with self._lock:
+                    self._stats[name]['errors'] += 1
+                print(f"Error in shadow model {name}: {e}")
+                continue
+
+            agrees = label == primary_label
+            with self._lock:
+                self._stats[name]['compared'] += 1
+                self._stats[name]['agreed'] += int(agrees)
+            results.append({
+                'name': name,
+                'model_version': version,
+                'probability': probability,
+                'label': label,
+                'agrees': agrees,
+                'probability_delta': probability - primary_probability
+            })
+
+        if results and self.db_logger is not None and prediction_id is not None:
+            self.db_logger.log_shadow_predictions(prediction_id, results)
+
+    def summary(self) -> Dict:
+        """
+        Agreement statistics since startup.
+
+        Returns:
+            Dictionary with per-shadow counts and agreement_rate, plus shed/queued counts
+        """
+        with self._lock:
+            shadows = {}
+            for name, stats in self._stats.items():
+                manager = self.managers[name]
+                shadows[name] = {
+                    **stats,
+                    'model_version': manager.current.version if manager.ready else None,
+                    'agreement_rate': (stats['agreed'] / stats['compared']
+                                       if stats['compared'] else None)
+                }
+            return {
+                'shadows': shadows,
+                'shed': self._shed,
+                'queued': self._queue.qsize()
+            }
@@ -0,0 +1,169 @@
+"""
+Hyperparameter search helpers for AuralGuard.
+
+A search space maps each parameter to a spec:
+    {'type': 'choice', 'values': [...]}
+    {'type': 'uniform', 'low': ..., 'high': ...}
+    {'type': 'loguniform', 'low': ..., 'high': ...}
+    {'type': 'int', 'low': ..., 'high': ...}
+
+Trials run in separate processes, so the median pruner shares intermediate
+results through a directory: each trial writes its own JSON file of
+per-epoch values and reads everybody else's.
+"""
+
+import glob
+import json
+import math
+import os
+import random
+from typing import Dict, List, Optional
+
+import tensorflow as tf
+
+DEFAULT_SEARCH_SPACE = {
+    'filters': {'type': 'choice', 'values': [8, 16, 32]},
+    'dense_units': {'type': 'choice', 'values': [[16, 8], [32, 16], [64, 32]]},
+    'batch_size': {'type': 'choice', 'values': [4, 8, 16]},
+    'learning_rate': {'type': 'loguniform', 'low': 1e-4, 'high': 3e-3}
+}
+
+
+def sample_value(spec: Dict, rng: random.Random):
+    """Draw one value from a parameter spec."""
+    kind = spec.get('type', 'choice')
+    if kind == 'choice':
+        return rng.choice(spec['values'])
+    if kind == 'uniform':
+        return rng.uniform(spec['low'], spec['high'])
+    if kind == 'loguniform':
+        return math.exp(rng.uniform(math.log(spec['low']), math.log(spec['high'])))
+    if kind == 'int':
+        return rng.randint(spec['low'], spec['high'])
+    raise ValueError(f"Unknown parameter type: {kind}")
+
+
+def sample_trials(space: Dict, num_trials: int, seed: int = 0) -> List[Dict]:
+    """
+    Random-search trial configurations.
+
+    Args:
+        space: Search space (see module docstring)
+        num_trials: Number of configurations
+        seed: Random seed
+
+    Returns:
+        List of parameter dicts; duplicates are resampled where the space allows
+    """
+    rng = random.Random(seed)
+    trials = []
+    seen = set()
+    for _ in range(num_trials):
+        for _attempt in range(100):
+            params = {name: sample_value(spec, rng) for name, spec in sorted(space.items())}
+            key = json.dumps(params, sort_keys=True)
+            if key not in seen:
+                break
+        seen.add(key)
+        trials.append(params)
+    return trials
+
+
+class MedianPruner:
+    """
+    Stop trials whose intermediate value is worse than the median of other trials.
+
+    At each epoch, a trial's best value so far is compared with the best
+    values other trials had reached by the same epoch. Nothing is pruned
+    before `warmup_epochs` or until `min_trials` other trials have reported
+    that epoch.
+    """
+
+    def __init__(self, directory: str, warmup_epochs: int = 1, min_trials: int = 2,
+                 mode: str = 'min'):
+        """
+        Args:
+            directory: Directory shared by all trials of a sweep
+            warmup_epochs: Epochs every trial runs before it can be pruned
+            min_trials: Other trials needed at an epoch before pruning there
+            mode: 'min' or 'max'
+        """
+        if mode not in ('min', 'max'):
+            raise ValueError(f"mode must be 'min' or 'max', got {mode}")
+        self.directory = directory
+        self.warmup_epochs = warmup_epochs
+        self.min_trials = min_trials
+        self.mode = mode
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, trial_id) -> str:
+        return os.path.join(self.directory, f"trial-{trial_id}.json")
+
+    def _best(self, values: List[float]) -> float:
+        return min(values) if self.mode == 'min' else max(values)
+
+    def _read(self, path) -> List[float]:
+        try:
+            with open(path) as f:
+                return json.load(f)['values']
+        except (OSError, ValueError):
+            # Being replaced by its trial
+            return []
+
+    def report(self, trial_id, epoch: int, value: float):
+        """Record a trial's value for an epoch (0-based)."""
+        values = self._read(self._path(trial_id))[:epoch]
+        values.append(float(value))
+        path = self._path(trial_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'trial': trial_id, 'values': values}, f)
+        os.replace(tmp_path, path)
+
+    def should_prune(self, trial_id, epoch: int) -> bool:
+        """Whether the trial should stop after the given epoch."""
+        if epoch + 1 < self.warmup_epochs:
+            return False
+        own = self._read(self._path(trial_id))[:epoch + 1]
+        if len(own) <= epoch:
+            return False
+        others = []
+        for path in glob.glob(os.path.join(self.directory, 'trial-*.json')):
+            if path == self._path(trial_id):
+                continue
+            values = self._read(path)[:epoch + 1]
+            if len(values) > epoch:
+                others.append(self._best(values))
+        if len(others) < self.min_trials:
+            return False
+        others.sort()
+        middle = len(others) // 2
+        median = others[middle] if len(others) % 2 else (others[middle - 1] + others[middle]) / 2
+        best = self._best(own)
+        return best > median if self.mode == 'min' else best < median
+
+
+class PruningCallback(tf.keras.callbacks.Callback):
+    """Reports a monitored metric to a MedianPruner each epoch and stops pruned trials."""
+
+    def __init__(self, pruner: MedianPruner, trial_id, monitor: str = 'val_loss'):
+        super().__init__()
+        self.pruner = pruner
+        self.trial_id = trial_id
+        self.monitor = monitor
+        self.pruned_at: Optional[int] = None
+
+    @property
+    def pruned(self) -> bool:
+        return self.pruned_at is not None
+
+    def on_epoch_end(self, epoch, logs=None):
+        value = (logs or {}).get(self.monitor)
+        if value is None:
+            return
+        self.pruner.report(self.trial_id, epoch, value)
+        if self.pruner.should_prune(self.trial_id, epoch):
+            self.pruned_at = epoch + 1
+            self.model.stop_training = True
+            print(f"  Trial {self.trial_id} pruned after epoch {epoch + 1} "
+                  f"({self.monitor}={float(value):.4f})")
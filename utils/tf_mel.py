@@ -0,0 +1,135 @@
+"""
+In-graph TensorFlow mel-spectrogram frontend for AuralGuard.
+
+Computes the same 128-band, fmax=8000 power mel-spectrogram as
+librosa.feature.melspectrogram (Slaney mel scale and normalization, centered
+Hann-windowed STFT with n_fft=2048, hop=512) using native TF ops, so it runs
+in parallel tf.data maps and can be baked into a saved model.
+"""
+
+import numpy as np
+import tensorflow as tf
+
+SAMPLE_RATE = 16000
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+FMIN = 0.0
+FMAX = 8000.0
+WAVEFORM_LENGTH = 240000  # 15 seconds at 16kHz
+
+# Slaney mel scale constants (librosa.hz_to_mel with htk=False)
+_F_SP = 200.0 / 3
+_MIN_LOG_HZ = 1000.0
+_MIN_LOG_MEL = _MIN_LOG_HZ / _F_SP
+_LOGSTEP = np.log(6.4) / 27.0
+
+
+def _hz_to_mel(frequencies):
+    frequencies = np.asanyarray(frequencies, dtype=np.float64)
+    mels = frequencies / _F_SP
+    log_region = frequencies >= _MIN_LOG_HZ
+    mels = np.where(
+        log_region,
+        _MIN_LOG_MEL + np.log(np.maximum(frequencies, _MIN_LOG_HZ) / _MIN_LOG_HZ) / _LOGSTEP,
+        mels
+    )
+    return mels
+
+
+def _mel_to_hz(mels):
+    mels = np.asanyarray(mels, dtype=np.float64)
+    frequencies = _F_SP * mels
+    log_region = mels >= _MIN_LOG_MEL
+    return np.where(
+        log_region,
+        _MIN_LOG_HZ * np.exp(_LOGSTEP * (mels - _MIN_LOG_MEL)),
+        frequencies
+    )
+
+
+def mel_filterbank(sample_rate=SAMPLE_RATE, n_fft=N_FFT, n_mels=N_MELS, fmin=FMIN, fmax=FMAX):
+    """
+    Slaney-normalized mel filterbank, identical to librosa.filters.mel defaults.
+
+    Args:
+        sample_rate: Audio sample rate
+        n_fft: FFT size
+        n_mels: Number of mel bands
+        fmin: Lowest band edge in Hz
+        fmax: Highest band edge in Hz
+
+    Returns:
+        weights: float32 array of shape (n_mels, 1 + n_fft // 2)
+    """
+    fft_frequencies = np.fft.rfftfreq(n=n_fft, d=1.0 / sample_rate)
+    mel_frequencies = _mel_to_hz(np.linspace(_hz_to_mel(fmin), _hz_to_mel(fmax), n_mels + 2))
+
+    band_widths = np.diff(mel_frequencies)
+    ramps = np.subtract.outer(mel_frequencies, fft_frequencies)
+    weights = np.zeros((n_mels, len(fft_frequencies)))
+    for i in range(n_mels):
+        lower = -ramps[i] / band_widths[i]
+        upper = ramps[i + 2] / band_widths[i + 1]
+        weights[i] = np.maximum(0, np.minimum(lower, upper))
+
+    # Slaney normalization: constant energy per band
+    weights *= (2.0 / (mel_frequencies[2:n_mels + 2] - mel_frequencies[:n_mels]))[:, np.newaxis]
+    return weights.astype(np.float32)
+
+
+def mel_spectrogram(waveform):
+    """
+    Power mel-spectrogram of 16kHz audio with native TF ops.
+
+    Args:
+        waveform: float32 tensor of shape (samples,) or (batch, samples)
+
+    Returns:
+        mel: float32 tensor of shape (n_mels, frames) or (batch, n_mels, frames)
+    """
+    waveform = tf.convert_to_tensor(waveform, dtype=tf.float32)
+    # center=True with librosa's default constant (zero) padding
+    paddings = [[0, 0]] * (waveform.shape.rank - 1) + [[N_FFT // 2, N_FFT // 2]]
+    padded = tf.pad(waveform, paddings)
+    stft = tf.signal.stft(
+        padded,
+        frame_length=N_FFT,
+        frame_step=HOP_LENGTH,
+        fft_length=N_FFT,
+        window_fn=tf.signal.hann_window,  # periodic, as scipy's get_window('hann')
+        pad_end=False
+    )
+    power = tf.math.square(tf.math.abs(stft))  # (..., frames, 1 + n_fft // 2)
+    weights = tf.constant(mel_filterbank().T)   # (1 + n_fft // 2, n_mels)
+    mel = tf.tensordot(power, weights, axes=1)  # (..., frames, n_mels)
+    return tf.linalg.matrix_transpose(mel)
+
+
+@tf.keras.utils.register_keras_serializable(package='auralguard')
+class MelSpectrogram(tf.keras.layers.Layer):
+    """Keras layer mapping (batch, 240000) waveforms to (batch, 128, 469, 1) model input."""
+
+    def call(self, inputs):
+        return tf.expand_dims(mel_spectrogram(inputs), axis=-1)
+
+    def compute_output_shape(self, input_shape):
+        frames = 1 + input_shape[-1] // HOP_LENGTH
+        return (input_shape[0], N_MELS, frames, 1)
+
+
+def build_waveform_model(model):
+    """
+    Wrap a mel-spectrogram model so it takes raw 16kHz waveforms.
+
+    Serving can then run decode -> a single graph call.
+
+    Args:
+        model: Keras model taking (batch, 128, 469, 1) input
+
+    Returns:
+        Keras model taking (batch, 240000) input
+    """
+    inputs = tf.keras.Input(shape=(WAVEFORM_LENGTH,), name='waveform')
+    outputs = model(MelSpectrogram(name='mel_spectrogram')(inputs))
+    return tf.keras.Model(inputs, outputs, name=f"{model.name}_waveform")
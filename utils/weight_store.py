@@ -0,0 +1,231 @@
+"""
+Memory-mappable serving weight artifacts for AuralGuard.
+
+An exported artifact is a directory containing:
+    manifest.json - Keras architecture, tensor table, checksums and model version
+    weights.bin   - every weight tensor, raw little-endian, 64-byte aligned
+
+Loading maps weights.bin read-only and hands the tensors to Keras without
+parsing an HDF5 file, so models load faster. Keras copies them into its own
+weight variables, so each worker process still holds a full copy of the
+weights in memory; only the file's pages in the OS page cache are shared.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+MANIFEST_FILE = 'manifest.json'
+WEIGHTS_FILE = 'weights.bin'
+FORMAT_NAME = 'auralguard-weights'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+
+def compute_checksum(path, chunk_size=8 * 1024 * 1024):
+    """
+    Compute the SHA-256 checksum of a file.
+
+    Args:
+        path: Path to the file
+        chunk_size: Bytes read per iteration
+
+    Returns:
+        checksum: String of the form 'sha256:<hex digest>'
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def artifact_checksum(architecture, tensors, weights_checksum):
+    """
+    Checksum of a whole serving artifact: architecture, tensor table and weights.
+
+    Two models with identical weights but different architectures (e.g. with
+    and without the weightless MelSpectrogram frontend) get different
+    checksums, and so different default versions.
+
+    Args:
+        architecture: Keras architecture JSON string
+        tensors: Tensor table (dtype, shape, offset, nbytes per weight)
+        weights_checksum: Checksum of weights.bin
+
+    Returns:
+        checksum: String of the form 'sha256:<hex digest>'
+    """
+    digest = hashlib.sha256()
+    # Canonical JSON, so key order in Keras' output does not matter
+    digest.update(json.dumps(json.loads(architecture), sort_keys=True).encode('utf-8') + b'\0')
+    digest.update(json.dumps(tensors, sort_keys=True).encode('utf-8') + b'\0')
+    digest.update(weights_checksum.encode('utf-8'))
+    return f"sha256:{digest.hexdigest()}"
+
+
+def is_serving_artifact(path):
+    """Check whether a path is an exported serving weight artifact."""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+
+def read_manifest(artifact_dir):
+    """
+    Read the manifest of a serving artifact.
+
+    Args:
+        artifact_dir: Directory produced by export_serving_weights()
+
+    Returns:
+        manifest: Dictionary with architecture, tensors, checksum,
+                  weights_checksum and model_version
+    """
+    with open(os.path.join(artifact_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_NAME:
+        raise ValueError(f"Not an AuralGuard weight artifact: {artifact_dir}")
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported artifact format version {manifest.get('format_version')} "
+            f"(expected {FORMAT_VERSION})"
+        )
+    return manifest
+
+
+def export_serving_weights(model, output_dir, model_version=None):
+    """
+    Export a Keras model as a memory-mappable serving artifact.
+
+    Args:
+        model: Keras model to export
+        output_dir: Directory to write manifest.json and weights.bin into
+        model_version: Version label stored in the manifest.
+                       Defaults to the first 12 hex digits of the checksum,
+                       which covers the architecture as well as the weights.
+
+    Returns:
+        manifest: The manifest that was written
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    weights_path = os.path.join(output_dir, WEIGHTS_FILE)
+    tmp_weights_path = weights_path + '.tmp'
+
+    digest = hashlib.sha256()
+    tensors = []
+    offset = 0
+    with open(tmp_weights_path, 'wb') as f:
+        for weight in model.get_weights():
+            array = np.ascontiguousarray(weight)
+            array = array.astype(array.dtype.newbyteorder('<'), copy=False)
+
+            padding = (-offset) % ALIGNMENT
+            if padding:
+                f.write(b'\0' * padding)
+                digest.update(b'\0' * padding)
+                offset += padding
+
+            data = array.tobytes()
+            f.write(data)
+            digest.update(data)
+            tensors.append({
+                'dtype': array.dtype.str,
+                'shape': list(array.shape),
+                'offset': offset,
+                'nbytes': len(data)
+            })
+            offset += len(data)
+
+    weights_checksum = f"sha256:{digest.hexdigest()}"
+    architecture = model.to_json()
+    checksum = artifact_checksum(architecture, tensors, weights_checksum)
+    manifest = {
+        'format': FORMAT_NAME,
+        'format_version': FORMAT_VERSION,
+        'model_version': model_version or checksum.split(':', 1)[1][:12],
+        'checksum': checksum,
+        'weights_checksum': weights_checksum,
+        'weights_file': WEIGHTS_FILE,
+        'total_bytes': offset,
+        'alignment': ALIGNMENT,
+        'created_at': datetime.utcnow().isoformat(),
+        'architecture': architecture,
+        'tensors': tensors
+    }
+
+    # Write the weights before the manifest so a reader never sees a
+    # manifest pointing at a partially written weights file.
+    os.replace(tmp_weights_path, weights_path)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    return manifest
+
+
+def map_weights(artifact_dir, manifest=None):
+    """
+    Memory-map the weights of a serving artifact read-only.
+
+    Args:
+        artifact_dir: Directory produced by export_serving_weights()
+        manifest: Already-read manifest (read from disk if None)
+
+    Returns:
+        weights: List of read-only numpy arrays backed by the mapped file
+    """
+    manifest = manifest or read_manifest(artifact_dir)
+    weights_path = os.path.join(artifact_dir, manifest['weights_file'])
+    if os.path.getsize(weights_path) != manifest['total_bytes']:
+        raise ValueError(f"Weights file size does not match manifest: {weights_path}")
+    if manifest['total_bytes'] == 0:
+        return []
+
+    buffer = np.memmap(weights_path, dtype=np.uint8, mode='r')
+    return [
+        np.ndarray(
+            shape=tuple(tensor['shape']),
+            dtype=np.dtype(tensor['dtype']),
+            buffer=buffer,
+            offset=tensor['offset']
+        )
+        for tensor in manifest['tensors']
+    ]
+
+
+def load_serving_weights(artifact_dir, verify_checksum=False):
+    """
+    Build a Keras model from a serving artifact.
+
+    Args:
+        artifact_dir: Directory produced by export_serving_weights()
+        verify_checksum: Re-hash weights.bin, architecture and tensor table
+                         and compare with the manifest
+
+    Returns:
+        model: Keras model with weights loaded
+        manifest: The artifact manifest
+    """
+    import tensorflow as tf
+    import utils.tf_mel  # noqa: F401  registers the MelSpectrogram layer
+
+    manifest = read_manifest(artifact_dir)
+    if verify_checksum:
+        weights_checksum = compute_checksum(os.path.join(artifact_dir, manifest['weights_file']))
+        if 'weights_checksum' in manifest:
+            checksum = artifact_checksum(manifest['architecture'], manifest['tensors'], weights_checksum)
+        else:
+            checksum = weights_checksum  # older artifacts hashed weights.bin only
+        if checksum != manifest['checksum']:
+            raise ValueError(
+                f"Checksum mismatch for {artifact_dir}: "
+                f"expected {manifest['checksum']}, got {checksum}"
+            )
+
+    model = tf.keras.models.model_from_json(manifest['architecture'])
+    # Copies the mapped tensors into the model's variables
+    model.set_weights(map_weights(artifact_dir, manifest))
+    return model, manifest